@@ -0,0 +1,263 @@
+"""
+Doradca decyzji hit/stand.
+
+Liczy oczekiwaną wartość (EV) dobrania i pasowania dla bieżącej ręki
+gracza. Rozwiązanie zależy od składu kart niewidocznych dla gracza
+(talia oraz zakryta karta krupiera), sprowadzonego do przedziału
+prawdziwej liczby Hi-Lo (``true_count``): każdy przedział ma skład
+wzorcowy sabotu ``config.SHOE_DECKS`` talii o tej liczbie
+(``bucket_composition``). Rozkład wyniku krupiera pochodzi
+z ``dealer_odds``, a dobierane przez gracza karty są usuwane ze składu
+(``EXACT_DRAWS``) - po każdej z nich EV pasowania pochodzi z przedziału
+pozostałych kart.
+
+Liczba stanów (wynik gracza, as, odkryta karta, przedział) jest skończona,
+więc ``precompute_common_states`` przy starcie liczy je wszystkie, a każde
+zapytanie korzysta z pamięci podręcznej.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from . import config
+from .dealer_odds import (
+    Composition, FULL_DECK, composition_from_cards, dealer_outcome_vector, hard_value
+)
+from .game_logic import CARDS, Card, Hand, best_score
+
+MAX_TRUE_COUNT: int = 6
+"""Skrajny przedział prawdziwej liczby - większe (co do modułu) liczby trafiają do niego."""
+
+EXACT_DRAWS: int = 3
+"""
+Liczba kolejnych kart gracza usuwanych ze składu - dalsze dobrania korzystają
+ze składu po tych kartach (różnica EV rzędu 1e-4 przy sabocie kilku talii).
+"""
+
+_LOW: Tuple[int, ...] = (1, 2, 3, 4, 5)
+"""Indeksy składu kart 2-6."""
+
+_HIGH: Tuple[int, ...] = (0, 9)
+"""Indeksy składu asów i kart o wartości 10."""
+
+_HI_LO: Tuple[int, ...] = (1, -1, -1, -1, -1, -1, 0, 0, 0, 1)
+"""Wartość Hi-Lo karty niewidocznej według indeksu składu (dodatnia dla asów i kart 10)."""
+
+PLAYER_STATES: Tuple[Tuple[int, bool], ...] = tuple(
+    [(hard, False) for hard in range(4, 22)] + [(hard, True) for hard in range(2, 22)]
+)
+"""Ręce gracza z co najmniej dwiema kartami: (suma z asami liczonymi jako 1, czy jest as)."""
+
+
+# Jedna karta dla każdej wartości 1-10 - klucz pamięci podręcznej
+# nie zależy od koloru ani od tego, która figura leży na stole.
+_CANONICAL: Dict[int, Card] = {hard_value(card): card for card in CARDS}
+
+
+def _canonical(card: Card) -> Card:
+    """Zwraca kartę reprezentującą wartość danej karty."""
+    return _CANONICAL[hard_value(card)]
+
+
+@dataclass
+class Advice:
+    """
+    Rekomendacja dla bieżącej ręki gracza.
+
+    Attributes:
+        player_score: Wynik ręki gracza.
+        stand_ev: Oczekiwana wartość pasowania (na jednostkę zakładu).
+        hit_ev: Oczekiwana wartość dobrania przy dalszej optymalnej grze.
+    """
+    player_score: int
+    stand_ev: float
+    hit_ev: float
+
+    @property
+    def recommendation(self) -> str:
+        """Akcja o wyższej oczekiwanej wartości ('hit' lub 'stand')."""
+        return "hit" if self.hit_ev > self.stand_ev else "stand"
+
+
+def _stand_values(dealer_vector: Tuple[float, ...]) -> List[float]:
+    """Oczekiwana wartość pasowania dla każdego wyniku gracza 0-21."""
+    dealer_bust = dealer_vector[22]
+    values = []
+    below = 0.0
+    above = sum(dealer_vector[:22])
+    for score in range(22):
+        above -= dealer_vector[score]
+        values.append(dealer_bust + below - above)
+        below += dealer_vector[score]
+    return values
+
+
+def true_count(composition: Composition) -> int:
+    """
+    Zwraca przedział prawdziwej liczby Hi-Lo kart niewidocznych dla gracza.
+
+    Args:
+        composition: Skład kart niewidocznych dla gracza.
+
+    Returns:
+        int: Zaokrąglona liczba Hi-Lo kart już rozdanych na talię
+        pozostałych kart, ograniczona do ``MAX_TRUE_COUNT``.
+    """
+    running = sum(number * _HI_LO[index] for index, number in enumerate(composition))
+    return _bucket(running, sum(composition))
+
+
+def _bucket(running: int, total: int) -> int:
+    """Przedział prawdziwej liczby dla sumy Hi-Lo ``running`` z ``total`` kart."""
+    if not total:
+        return 0
+    return max(-MAX_TRUE_COUNT, min(MAX_TRUE_COUNT, round(running * 52 / total)))
+
+
+@lru_cache(maxsize=4 * MAX_TRUE_COUNT + 2)
+def bucket_composition(count: int) -> Composition:
+    """
+    Zwraca skład wzorcowy przedziału prawdziwej liczby.
+
+    Z sabotu ``config.SHOE_DECKS`` talii usuwane są karty niskie (liczba
+    dodatnia) lub wysokie (ujemna) - równomiernie między ich wartości - tak,
+    aby prawdziwa liczba pozostałych kart wynosiła ``count``.
+
+    Args:
+        count: Przedział prawdziwej liczby.
+
+    Returns:
+        Composition: Skład kart niewidocznych dla gracza.
+    """
+    full = tuple(number * config.SHOE_DECKS for number in FULL_DECK)
+    composition = list(full)
+    group = _LOW if count > 0 else _HIGH
+    for _ in range(round(sum(full) * abs(count) / (52 + abs(count)))):
+        index = max(group, key=lambda i: composition[i] / full[i])
+        composition[index] -= 1
+    return tuple(composition)
+
+
+@lru_cache(maxsize=1 << 10)
+def _stand_vector(upcard: Card, count: int) -> Tuple[float, ...]:
+    """Oczekiwana wartość pasowania dla wyników 0-21 w przedziale ``count``."""
+    dealer = dealer_outcome_vector(upcard, bucket_composition(count), exclude_blackjack=True)
+    return tuple(_stand_values(dealer))
+
+
+@lru_cache(maxsize=1 << 10)
+def _solve_states(upcard: Card, count: int) -> Dict[Tuple[int, bool], Tuple[float, float]]:
+    """
+    Rozwiązuje decyzję hit/stand dla wszystkich rąk gracza w przedziale.
+
+    Stany po dobraniu kart są wspólne dla wszystkich rąk początkowych,
+    więc są liczone raz.
+
+    Args:
+        upcard: Odkryta karta krupiera.
+        count: Przedział prawdziwej liczby.
+
+    Returns:
+        Dict: Oczekiwana wartość pasowania i dobrania dla każdej pary
+        (suma z asami liczonymi jako 1, czy ręka zawiera asa).
+    """
+    composition = bucket_composition(count)
+    stands = {bucket: _stand_vector(upcard, bucket)
+              for bucket in range(-MAX_TRUE_COUNT, MAX_TRUE_COUNT + 1)}
+    memo: Dict[Tuple[int, bool, int], float] = {}
+
+    # Karty dobrane przez gracza są kodowane liczbą - po 5 bitów na wartość karty.
+    def hit_value(hard: int, ace: bool, drawn: int, total: int, running: int, depth: int) -> float:
+        exact = depth < EXACT_DRAWS
+        ev = 0.0
+        for index, available in enumerate(composition):
+            number = available - (drawn >> 5 * index & 31)
+            if number <= 0:
+                continue
+            value = index + 1
+            probability = number / total
+            new_hard = hard + value
+            if new_hard > 21:
+                ev -= probability
+            elif exact:
+                ev += probability * best_value(new_hard, ace or value == 1, drawn + (1 << 5 * index),
+                                               total - 1, running - _HI_LO[index], depth + 1)
+            else:
+                ev += probability * best_value(new_hard, ace or value == 1, drawn,
+                                               total, running, depth)
+        return ev
+
+    def best_value(hard: int, ace: bool, drawn: int, total: int, running: int,
+                   depth: int) -> float:
+        key = (hard, ace, drawn)
+        if key not in memo:
+            score = best_score(hard, ace)
+            stand = stands[_bucket(running, total)][score]
+            if score < 21:
+                stand = max(stand, hit_value(hard, ace, drawn, total, running, depth))
+            memo[key] = stand
+        return memo[key]
+
+    size = sum(composition)
+    running = sum(number * _HI_LO[index] for index, number in enumerate(composition))
+    return {
+        (hard, ace): (stands[count][best_score(hard, ace)],
+                      hit_value(hard, ace, 0, size, running, 0))
+        for hard, ace in PLAYER_STATES
+    }
+
+
+def solve(hard_total: int, has_ace: bool, upcard: Card, count: int) -> Tuple[float, float]:
+    """
+    Rozwiązuje decyzję hit/stand dla danego stanu (``PLAYER_STATES``).
+
+    Args:
+        hard_total: Suma ręki gracza z asami liczonymi jako 1.
+        has_ace: Czy ręka gracza zawiera asa.
+        upcard: Odkryta karta krupiera.
+        count: Przedział prawdziwej liczby kart niewidocznych dla gracza.
+
+    Returns:
+        Tuple[float, float]: Oczekiwana wartość pasowania i dobrania.
+    """
+    return _solve_states(upcard, count)[(hard_total, has_ace)]
+
+
+def advise(player_cards: Iterable[Card], upcard: Card,
+           unseen_cards: Iterable[Card]) -> Advice:
+    """
+    Zwraca oczekiwane wartości hit i stand dla ręki gracza.
+
+    Args:
+        player_cards: Karty gracza.
+        upcard: Odkryta karta krupiera.
+        unseen_cards: Karty niewidoczne dla gracza (talia i zakryta karta krupiera).
+
+    Returns:
+        Advice: Rekomendacja.
+    """
+    hand = Hand(list(player_cards))
+    hard_total = sum(hard_value(card) for card in hand.cards)
+    has_ace = any(card.rank == "A" for card in hand.cards)
+    stand_ev, hit_ev = solve(hard_total, has_ace, _canonical(upcard),
+                             true_count(composition_from_cards(unseen_cards)))
+    return Advice(player_score=hand.calculate_score(), stand_ev=stand_ev, hit_ev=hit_ev)
+
+
+def precompute_common_states() -> int:
+    """
+    Wypełnia pamięć podręczną wszystkimi stanami.
+
+    Obejmuje każdą rękę gracza i każdą odkrytą kartę krupiera w każdym
+    przedziale prawdziwej liczby - od przedziału 0 (świeżo potasowany
+    sabot) do skrajnych.
+
+    Returns:
+        int: Liczba policzonych stanów.
+    """
+    computed = 0
+    for count in sorted(range(-MAX_TRUE_COUNT, MAX_TRUE_COUNT + 1), key=abs):
+        for up in sorted(_CANONICAL):
+            computed += len(_solve_states(_CANONICAL[up], count))
+    return computed
@@ -0,0 +1,220 @@
+"""
+Archiwizacja zakończonych gier.
+
+Wiersz gry w tabeli ``games`` i jej zdarzenia w ``game_events`` po
+rozliczeniu są już tylko historią. Wątek w tle co ``config.ARCHIVE_INTERVAL``
+sekund przenosi zakończone gry starsze niż ``config.ARCHIVE_AFTER_DAYS``
+do wąskiej tabeli ``games_archive`` (wynik, zakład, ręce zakodowane jako
+indeksy kart, daty) i usuwa ich zdarzenia. Rozmiar tabel ``games``
+i ``game_events`` oraz głębokość ich indeksów zależą więc od liczby gier
+z ostatniego okresu, a nie od całej historii.
+
+Gry są przenoszone partiami po ``config.ARCHIVE_BATCH_SIZE``. Każda partia
+jest zlecana wątkowi piszącemu (``write_queue``) jak zapisy żądań, więc
+archiwizacja nie konkuruje z nim o blokadę bazy, a kolejna partia czeka
+w kolejce za zapisami zleconymi wcześniej. Na PostgreSQL wiersze partii są
+pobierane przez ``SELECT ... FOR UPDATE SKIP LOCKED`` - gry zablokowane
+przez trwające w tej chwili zapisy są pomijane do następnego przebiegu.
+
+Liczniki gier (``app.counters``) obejmują gry zarchiwizowane, więc
+archiwizacja ich nie zmienia. Zarchiwizowana gra jest dostępna przez
+``GET /games/{id}``, ale nie ma już dziennika zdarzeń ani kodu odtworzenia.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from . import config, models
+from .game_logic import Card
+from .write_queue import write_queue
+
+logger = logging.getLogger(__name__)
+
+
+def encode_hand(hand: Optional[List[Dict]]) -> bytes:
+    """
+    Koduje rękę zapisaną w wierszu gry (JSON) jako indeksy kart.
+
+    Args:
+        hand: Karty w postaci ``Card.to_dict``.
+
+    Returns:
+        bytes: Jeden bajt - indeks karty - na kartę.
+    """
+    return bytes(Card.from_dict(card).index for card in hand or [])
+
+
+def decode_hand(data: bytes) -> List[Dict]:
+    """
+    Odtwarza rękę zakodowaną przez ``encode_hand``.
+
+    Args:
+        data: Indeksy kart.
+
+    Returns:
+        List[Dict]: Karty w postaci ``Card.to_dict``.
+    """
+    return [Card.from_index(index).to_dict() for index in data]
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Przenosi do archiwum partię gier zakończonych przed ``cutoff``.
+
+    Gry są wybierane od najstarszych po indeksie ``finished_at`` (gry
+    trwające mają ``finished_at`` równe NULL). Wiersze zablokowane przez
+    inną transakcję są pomijane.
+
+    Args:
+        db: Sesja bazy danych.
+        cutoff: Gry zakończone wcześniej są archiwizowane.
+        batch_size: Maksymalna liczba gier w partii.
+
+    Returns:
+        int: Liczba zarchiwizowanych gier.
+    """
+    rows = db.execute(
+        select(models.Game.id, models.Game.status, models.Game.player_id,
+               models.Game.bet_amount, models.Game.player_hand, models.Game.dealer_hand,
+               models.Game.player_score, models.Game.dealer_score,
+               models.Game.created_at, models.Game.finished_at)
+        .where(models.Game.finished_at < cutoff)
+        .order_by(models.Game.finished_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+
+    db.execute(insert(models.GameArchive), [
+        {
+            "id": row.id,
+            "status": row.status,
+            "player_id": row.player_id,
+            "bet_amount": row.bet_amount,
+            "player_hand": encode_hand(row.player_hand),
+            "dealer_hand": encode_hand(row.dealer_hand),
+            "player_score": row.player_score,
+            "dealer_score": row.dealer_score,
+            "created_at": row.created_at,
+            "finished_at": row.finished_at
+        }
+        for row in rows
+    ])
+    ids = [row.id for row in rows]
+    db.execute(delete(models.GameEvent).where(models.GameEvent.game_id.in_(ids))
+               .execution_options(synchronize_session=False))
+    db.execute(delete(models.Game).where(models.Game.id.in_(ids))
+               .execution_options(synchronize_session=False))
+    return len(rows)
+
+
+class Archiver:
+    """
+    Archiwizacja zakończonych gier w tle.
+
+    Attributes:
+        interval: Odstęp między przebiegami archiwizacji (w sekundach).
+        after_days: Wiek zakończonej gry (w dniach), po którym jest archiwizowana.
+        batch_size: Liczba gier przenoszonych w jednej partii.
+    """
+
+    def __init__(self, interval: float, after_days: float, batch_size: int) -> None:
+        """
+        Inicjalizuje archiwizację.
+
+        Args:
+            interval: Odstęp między przebiegami archiwizacji (w sekundach).
+            after_days: Wiek zakończonej gry (w dniach), po którym jest archiwizowana.
+            batch_size: Liczba gier przenoszonych w jednej partii.
+        """
+        self.interval = interval
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._batches = 0
+        self._archived = 0
+        self._failures = 0
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Przenosi do archiwum wszystkie gry starsze niż próg, partia po partii.
+
+        Args:
+            now: Bieżący czas (domyślnie ``datetime.utcnow()``).
+
+        Returns:
+            int: Liczba zarchiwizowanych gier.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.after_days)
+        total = 0
+        while True:
+            moved = write_queue.submit(archive_batch, cutoff, self.batch_size).result()
+            total += moved
+            if moved:
+                with self._lock:
+                    self._batches += 1
+                    self._archived += moved
+            if moved < self.batch_size or self._stop.is_set():
+                break
+        with self._lock:
+            self._runs += 1
+        return total
+
+    def _archive_in_background(self) -> None:
+        """Przebieg archiwizacji w wątku w tle - błąd nie zatrzymuje wątku."""
+        try:
+            self.run_once()
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            logger.exception("Archiwizacja zakończonych gier nie powiodła się")
+
+    def _run(self) -> None:
+        """Pętla wątku archiwizacji."""
+        while True:
+            self._archive_in_background()
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        """Uruchamia wątek archiwizacji."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Zatrzymuje wątek archiwizacji po zakończeniu bieżącej partii."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Zwraca statystyki archiwizacji.
+
+        Returns:
+            Dict: Liczba przebiegów, partii, zarchiwizowanych gier
+            i nieudanych przebiegów.
+        """
+        with self._lock:
+            return {
+                "runs": self._runs,
+                "batches": self._batches,
+                "archived_games": self._archived,
+                "failures": self._failures
+            }
+
+
+archiver = Archiver(config.ARCHIVE_INTERVAL, config.ARCHIVE_AFTER_DAYS, config.ARCHIVE_BATCH_SIZE)
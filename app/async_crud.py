@@ -0,0 +1,114 @@
+"""
+Asynchroniczne operacje CRUD dla endpointów ``async def``.
+
+Logika gry, rozliczenia, liczniki i magazyn gier w pamięci pozostają
+w ``crud`` - tutaj każdy odczyt jest uruchamiany przez
+``AsyncSession.run_sync`` na sesji synchronicznej opakowanej przez
+sesję asynchroniczną. Kod ``crud`` wykonuje się w wątku pętli zdarzeń
+(w greenlecie), a każde zapytanie czeka na sterownik (aiosqlite, psycopg) bez
+blokowania pętli, więc liczba równoległych żądań nie jest ograniczona
+rozmiarem puli wątków. Jedna ścieżka kodu dla sesji synchronicznych
+i asynchronicznych gwarantuje identyczne zachowanie obu.
+
+Sekcje chronione ``game_store.lock`` nie wykonują zapytań, więc
+greenlety różnych żądań ani wątek piszący nie czekają na siebie
+wewnątrz blokady.
+
+Operacje zapisujące nie korzystają z sesji żądania (parametr ``db``
+pozostaje dla jednolitego interfejsu) - są zlecane wątkowi piszącemu
+(``write_queue``), który zatwierdza zapisy wielu żądań jedną transakcją,
+a żądanie czeka na wynik bez blokowania pętli zdarzeń.
+
+Podpowiedź (``crud.get_game_advice``) nie ma tu odpowiednika - jej koszt
+to obliczenia, a nie baza, więc jej endpoint działa w puli wątków.
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import counters, crud, models, schemas
+from .write_queue import write_queue
+
+T = TypeVar("T")
+
+
+async def _write(work: Callable[..., T], *args: Any) -> T:
+    """Zleca operację zapisu wątkowi piszącemu i czeka na jej zatwierdzenie."""
+    return await asyncio.wrap_future(write_queue.submit(work, *args))
+
+
+async def create_player(db: AsyncSession, player: schemas.PlayerCreate) -> models.Player:
+    """Asynchroniczna wersja ``crud.create_player``."""
+    return await _write(crud.create_player, player)
+
+
+async def get_player(db: AsyncSession, player_id: int) -> Optional[models.Player]:
+    """Asynchroniczna wersja ``crud.get_player``."""
+    return await db.run_sync(crud.get_player, player_id)
+
+
+async def get_players(db: AsyncSession, skip: int = 0, limit: int = 100,
+                      after_id: int = 0) -> List[models.Player]:
+    """Asynchroniczna wersja ``crud.get_players``."""
+    return await db.run_sync(crud.get_players, skip, limit, after_id)
+
+
+async def update_player(db: AsyncSession, player_id: int,
+                        player_update: schemas.PlayerUpdate) -> Optional[models.Player]:
+    """Asynchroniczna wersja ``crud.update_player``."""
+    return await _write(crud.update_player, player_id, player_update)
+
+
+async def delete_player(db: AsyncSession, player_id: int) -> bool:
+    """Asynchroniczna wersja ``crud.delete_player``."""
+    return await _write(crud.delete_player, player_id)
+
+
+async def create_game(db: AsyncSession, game_data: schemas.GameCreate) -> models.Game:
+    """Asynchroniczna wersja ``crud.create_game``."""
+    return await _write(crud.create_game, game_data)
+
+
+async def get_game_view(db: AsyncSession, game_id: int):
+    """Asynchroniczna wersja ``crud.get_game_view``."""
+    return await db.run_sync(crud.get_game_view, game_id)
+
+
+async def get_games(db: AsyncSession, skip: int = 0, limit: int = 100,
+                    after_id: int = 0) -> list:
+    """
+    Asynchroniczna wersja ``crud.get_games``.
+
+    Trwające gry z magazynu w pamięci mają już uzupełniony bieżący
+    stan (``crud.with_live_state``).
+    """
+    games = await db.run_sync(crud.get_games, skip, limit, after_id)
+    return crud.with_live_state(games)
+
+
+async def game_action(db: AsyncSession, game_id: int, action: schemas.GameAction):
+    """Asynchroniczna wersja ``crud.game_action``."""
+    return await _write(crud.game_action, game_id, action)
+
+
+async def get_game_events(db: AsyncSession,
+                          game_id: int) -> Optional[List[schemas.GameEventResponse]]:
+    """Asynchroniczna wersja ``crud.get_game_events``."""
+    return await db.run_sync(crud.get_game_events, game_id)
+
+
+async def get_game_replay(db: AsyncSession, game_id: int) -> Optional[schemas.GameReplay]:
+    """Asynchroniczna wersja ``crud.get_game_replay``."""
+    return await db.run_sync(crud.get_game_replay, game_id)
+
+
+async def delete_game(db: AsyncSession, game_id: int) -> bool:
+    """Asynchroniczna wersja ``crud.delete_game``."""
+    return await _write(crud.delete_game, game_id)
+
+
+async def get_counters(db: AsyncSession) -> dict:
+    """Asynchroniczna wersja ``counters.get_counters``."""
+    return await db.run_sync(counters.get_counters)
@@ -0,0 +1,149 @@
+"""
+Wspólny nadawca statusu serwera dla połączeń WebSocket.
+
+Jedno zadanie w tle liczy status raz na takt, serializuje go raz
+i rozsyła te same dane do wszystkich subskrybentów. Każdy subskrybent
+ma własną ograniczoną kolejkę - wolny klient traci najstarsze
+komunikaty zamiast spowalniać pozostałych.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    Subskrybent statusu - kolejka komunikatów jednego połączenia.
+
+    Attributes:
+        queue: Ograniczona kolejka komunikatów do wysłania.
+        dropped: Liczba komunikatów odrzuconych z powodu pełnej kolejki.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        """
+        Inicjalizuje subskrybenta.
+
+        Args:
+            queue_size: Maksymalna liczba oczekujących komunikatów.
+        """
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, message: str) -> None:
+        """
+        Dodaje komunikat do kolejki, usuwając najstarszy gdy kolejka jest pełna.
+
+        Args:
+            message: Zserializowany komunikat.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class StatusBroadcaster:
+    """
+    Rozsyła okresowo liczony status do zarejestrowanych subskrybentów.
+
+    Zadanie w tle działa tylko wtedy, gdy istnieje co najmniej jeden
+    subskrybent; jest uruchamiane przy pierwszej subskrypcji. Błąd
+    obliczenia statusu pomija jeden takt - nie zatrzymuje nadawania.
+
+    Attributes:
+        interval: Odstęp między kolejnymi komunikatami (w sekundach).
+        queue_size: Rozmiar kolejki każdego subskrybenta.
+        failures: Liczba taktów, w których obliczenie statusu się nie powiodło.
+    """
+
+    def __init__(self, compute: Callable[[], str], interval: float = 1.0,
+                 queue_size: int = 4) -> None:
+        """
+        Inicjalizuje nadawcę.
+
+        Args:
+            compute: Funkcja (synchroniczna) zwracająca zserializowany status.
+                Jest wywoływana w puli wątków, aby nie blokować pętli zdarzeń.
+            interval: Odstęp między kolejnymi komunikatami (w sekundach).
+            queue_size: Rozmiar kolejki każdego subskrybenta.
+        """
+        self._compute = compute
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._last_message: Optional[str] = None
+        self.failures = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        """Liczba zarejestrowanych subskrybentów."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """
+        Rejestruje nowego subskrybenta i w razie potrzeby uruchamia nadawanie.
+
+        Nowy subskrybent od razu otrzymuje ostatni wysłany komunikat.
+
+        Returns:
+            Subscriber: Subskrybent z własną kolejką komunikatów.
+        """
+        subscriber = Subscriber(self.queue_size)
+        if self._last_message is not None:
+            subscriber.offer(self._last_message)
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """
+        Wyrejestrowuje subskrybenta.
+
+        Args:
+            subscriber: Subskrybent do usunięcia.
+        """
+        self._subscribers.discard(subscriber)
+        if not self._subscribers:
+            self._last_message = None
+
+    def publish(self, message: str) -> None:
+        """
+        Rozsyła komunikat do wszystkich subskrybentów.
+
+        Args:
+            message: Zserializowany komunikat.
+        """
+        self._last_message = message
+        for subscriber in tuple(self._subscribers):
+            subscriber.offer(message)
+
+    async def _run(self) -> None:
+        """Pętla nadawania - jedno obliczenie statusu na takt."""
+        while self._subscribers:
+            try:
+                message = await run_in_threadpool(self._compute)
+            except Exception:
+                self.failures += 1
+                logger.exception("Obliczenie statusu serwera nie powiodło się")
+            else:
+                self.publish(message)
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        """Zatrzymuje zadanie nadawania."""
+        self._last_message = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
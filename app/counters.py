@@ -0,0 +1,255 @@
+"""
+Liczniki gier i graczy utrzymywane przyrostowo.
+
+Liczniki (aktywne gry, zakończone gry, gracze, suma zakładów) są
+przechowywane w tabeli ``stats`` oraz w pamięci procesu. Funkcje CRUD
+zmieniają je instrukcją ``UPDATE stats SET value = value + :d`` w tej samej
+transakcji co zmianę danych, a kopia w pamięci jest aktualizowana dopiero
+po zatwierdzeniu transakcji. Odczyt kosztuje O(1), bez zapytań do tabel
+gier i graczy.
+
+Kopia w pamięci jest wczytywana z tabeli przy pierwszym odczycie. Do tego
+czasu zatwierdzane zmiany trafiają tylko do tabeli, więc wczytana kopia
+jest przyjmowana tylko wtedy, gdy w trakcie odczytu żadna transakcja ze
+zmianą liczników nie była zatwierdzana (licznik ``_generation`` i liczba
+zatwierdzanych transakcji ``_committing``) - inaczej zmiana mogłaby zostać
+pominięta albo policzona dwa razy. Odrzucona kopia zostanie wczytana
+ponownie przy następnym odczycie.
+
+Gdy tabela ``stats`` jest pusta lub niekompletna, liczniki są odbudowywane
+z tabel źródłowych w osobnej transakcji. Ręczna naprawa:
+    python -m app.counters
+"""
+
+import threading
+from typing import Dict
+
+from sqlalchemy import BigInteger, delete, event, func, select, update
+from sqlalchemy.orm import Session, SessionTransaction
+
+from . import models
+from .database import SessionLocal, run_in_transaction
+
+ACTIVE_GAMES: str = "active_games"
+FINISHED_GAMES: str = "finished_games"
+TOTAL_PLAYERS: str = "total_players"
+TOTAL_WAGERED: str = "total_wagered"
+
+COUNTERS = (ACTIVE_GAMES, FINISHED_GAMES, TOTAL_PLAYERS, TOTAL_WAGERED)
+
+_PENDING_KEY = "counter_deltas"
+_COMMITTING_KEY = "counter_committing"
+
+_lock = threading.Lock()
+_values: Dict[str, int] = {}
+_loaded = False
+_generation = 0
+_committing = 0
+
+
+def increment(db: Session, name: str, delta: int) -> None:
+    """
+    Zmienia licznik w bieżącej transakcji.
+
+    Kopia w pamięci zostanie zaktualizowana po zatwierdzeniu transakcji.
+    Jeśli liczniki nie zostały jeszcze zainicjalizowane, zmiana jest
+    pomijana - zostaną policzone od nowa przy pierwszym odczycie.
+
+    Args:
+        db: Sesja bazy danych.
+        name: Nazwa licznika.
+        delta: Wartość do dodania.
+    """
+    if not delta:
+        return
+    result = db.execute(
+        update(models.Stat)
+        .where(models.Stat.key == name)
+        .values(value=models.Stat.value + delta)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        pending = db.info.setdefault(_PENDING_KEY, {})
+        pending[name] = pending.get(name, 0) + delta
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _before_commit(session: Session) -> None:
+    """Oznacza transakcję ze zmianami liczników jako zatwierdzaną."""
+    global _committing
+    if session.in_nested_transaction():
+        return
+    if session.info.get(_PENDING_KEY) and not session.info.get(_COMMITTING_KEY):
+        session.info[_COMMITTING_KEY] = True
+        with _lock:
+            _committing += 1
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    """Przenosi zatwierdzone zmiany liczników do pamięci (punkty zapisu są pomijane)."""
+    global _generation
+    if session.in_nested_transaction():
+        return
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if not deltas:
+        return
+    with _lock:
+        _generation += 1
+        if _loaded:
+            for name, delta in deltas.items():
+                _values[name] = _values.get(name, 0) + delta
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    """Odrzuca zmiany liczników z wycofanej transakcji."""
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _after_transaction_end(session: Session, transaction: SessionTransaction) -> None:
+    """Kończy zatwierdzanie transakcji oznaczonej w ``_before_commit``."""
+    global _committing
+    if transaction.parent is None and session.info.pop(_COMMITTING_KEY, False):
+        with _lock:
+            _committing -= 1
+
+
+def _load(values: Dict[str, int], generation: int) -> bool:
+    """
+    Przyjmuje wartości odczytane z bazy jako kopię w pamięci.
+
+    Args:
+        values: Wartości liczników.
+        generation: Wartość ``_generation`` sprzed odczytu.
+
+    Returns:
+        bool: True jeśli kopia została przyjęta; False jeśli w trakcie
+        odczytu zatwierdzano zmiany liczników.
+    """
+    global _loaded
+    with _lock:
+        if _generation != generation or _committing:
+            return False
+        _values.clear()
+        _values.update(values)
+        _loaded = True
+        return True
+
+
+def compute_from_source(db: Session) -> Dict[str, int]:
+    """
+    Liczy wartości liczników z tabel gier (także zarchiwizowanych) i graczy.
+
+    Sumy stawek są liczone jako BIGINT - suma wszystkich zakładów może
+    przekroczyć zakres kolumny ``bet_amount``.
+
+    Args:
+        db: Sesja bazy danych.
+
+    Returns:
+        Dict[str, int]: Wartości liczników.
+    """
+    in_progress = models.GameStatus.IN_PROGRESS.value
+    active, total, wagered = db.execute(
+        select(
+            func.count().filter(models.Game.status == in_progress),
+            func.count(),
+            func.coalesce(func.sum(models.Game.bet_amount, type_=BigInteger), 0)
+        ).select_from(models.Game)
+    ).one()
+    archived, archived_wagered = db.execute(
+        select(func.count(),
+               func.coalesce(func.sum(models.GameArchive.bet_amount, type_=BigInteger), 0))
+        .select_from(models.GameArchive)
+    ).one()
+    players = db.scalar(select(func.count()).select_from(models.Player))
+    return {
+        ACTIVE_GAMES: active,
+        FINISHED_GAMES: total - active + archived,
+        TOTAL_PLAYERS: players,
+        TOTAL_WAGERED: int(wagered) + int(archived_wagered)
+    }
+
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """
+    Odbudowuje liczniki z tabel źródłowych w bieżącej transakcji.
+
+    Kopię w pamięci wczytuje wywołujący po zatwierdzeniu transakcji
+    (``repair``).
+
+    Args:
+        db: Sesja bazy danych.
+
+    Returns:
+        Dict[str, int]: Nowe wartości liczników.
+    """
+    values = compute_from_source(db)
+    db.execute(delete(models.Stat).execution_options(synchronize_session=False))
+    db.add_all(models.Stat(key=name, value=value) for name, value in values.items())
+    db.flush()
+    db.info.pop(_PENDING_KEY, None)
+    return values
+
+
+def get_counters(db: Session) -> Dict[str, int]:
+    """
+    Zwraca bieżące wartości liczników.
+
+    Dopóki kopia w pamięci nie jest wczytana, liczniki są czytane z tabeli
+    ``stats`` (lub odbudowywane w osobnej transakcji, gdy tabela jest
+    niekompletna); kolejne odczyty korzystają z pamięci.
+
+    Args:
+        db: Sesja bazy danych (używana tylko do wczytania kopii).
+
+    Returns:
+        Dict[str, int]: Wartości liczników.
+    """
+    with _lock:
+        if _loaded:
+            return dict(_values)
+        generation = _generation
+
+    rows = dict(db.execute(select(models.Stat.key, models.Stat.value)).all())
+    if not all(name in rows for name in COUNTERS):
+        return repair()
+    values = {name: rows[name] for name in COUNTERS}
+    _load(values, generation)
+    return values
+
+
+def reset() -> None:
+    """Usuwa kopię liczników z pamięci (zostaną wczytane przy następnym odczycie)."""
+    global _loaded
+    with _lock:
+        _values.clear()
+        _loaded = False
+
+
+def repair() -> Dict[str, int]:
+    """
+    Zadanie naprawcze - odbudowuje liczniki z tabel źródłowych.
+
+    Odbudowa działa w osobnej transakcji. Jeśli w jej trakcie zatwierdzono
+    zmiany liczników, kopia w pamięci jest usuwana i zostanie wczytana
+    z tabeli przy następnym odczycie.
+
+    Returns:
+        Dict[str, int]: Nowe wartości liczników.
+    """
+    with _lock:
+        generation = _generation
+    values = run_in_transaction(rebuild)
+    if not _load(values, generation):
+        reset()
+    return values
+
+
+if __name__ == "__main__":
+    for counter, value in repair().items():
+        print(f"{counter}: {value}")
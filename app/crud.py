@@ -3,14 +3,23 @@ Operacje CRUD dla bazy danych.
 
 Zawiera funkcje do tworzenia, odczytu, aktualizacji i usuwania
 rekordów graczy i gier.
+
+Funkcje jedynie przygotowują zmiany w sesji (``flush``). Transakcję
+zatwierdza - raz na żądanie - ``database.get_db``, a w razie błędu
+wycofuje ją w całości.
 """
 
+from sqlalchemy import delete, func, null, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime
 
-from . import models, schemas
-from .game_logic import BlackjackGame
+from . import archiver, config, counters, game_events, models, schemas
+from .advisor import advise
+from .deck_pool import deck_pool
+from .game_store import HotGame, game_store, load_shoe
+from .game_logic import BlackjackGame, Card, Deck, Hand, Shoe
 
 
 def create_player(db: Session, player: schemas.PlayerCreate) -> models.Player:
@@ -39,8 +48,8 @@ def create_player(db: Session, player: schemas.PlayerCreate) -> models.Player:
         balance=player.initial_balance
     )
     db.add(db_player)
-    db.commit()
-    db.refresh(db_player)
+    db.flush()
+    counters.increment(db, counters.TOTAL_PLAYERS, 1)
     return db_player
 
 
@@ -58,19 +67,43 @@ def get_player(db: Session, player_id: int) -> Optional[models.Player]:
     return db.query(models.Player).filter(models.Player.id == player_id).first()
 
 
-def get_players(db: Session, skip: int = 0, limit: int = 100) -> List[models.Player]:
+def get_players(db: Session, skip: int = 0, limit: int = 100,
+                after_id: int = 0) -> List[models.Player]:
     """
     Pobiera listę graczy
     
+    Gracze są uporządkowani według ID. Kolejne strony należy pobierać
+    przez ``after_id`` (stronicowanie keyset); ``skip`` pozostaje dla
+    zgodności wstecznej.
+    
     Args:
         db: Sesja bazy danych.
         skip: Liczba rekordów do pominięcia.
         limit: Maksymalna liczba rekordów.
+        after_id: ID ostatniego gracza poprzedniej strony.
         
     Returns:
         List[Player]: Lista graczy.
     """
-    return db.query(models.Player).offset(skip).limit(limit).all()
+    query = db.query(models.Player).filter(
+        models.Player.id > after_id
+    ).order_by(models.Player.id)
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def count_players(db: Session) -> int:
+    """
+    Zlicza wszystkich graczy (``SELECT COUNT(*)``).
+    
+    Args:
+        db: Sesja bazy danych.
+        
+    Returns:
+        int: Liczba graczy.
+    """
+    return db.scalar(select(func.count()).select_from(models.Player))
 
 
 def update_player(db: Session, player_id: int, 
@@ -95,8 +128,7 @@ def update_player(db: Session, player_id: int,
     for field, value in update_data.items():
         setattr(db_player, field, value)
     
-    db.commit()
-    db.refresh(db_player)
+    db.flush()
     return db_player
 
 
@@ -116,61 +148,180 @@ def delete_player(db: Session, player_id: int) -> bool:
         return False
     
     db.delete(db_player)
-    db.commit()
+    db.flush()
+    counters.increment(db, counters.TOTAL_PLAYERS, -1)
     return True
 
 
-def update_player_stats(db: Session, player_id: int, won: bool) -> Optional[models.Player]:
+def settle_game(db: Session, db_game: models.Game, winner: str) -> None:
     """
-    Aktualizuje statystyki gracza po zakończonej grze.
+    Rozlicza zakończoną grę.
+    
+    Zmiana statusu gry oraz saldo i statystyki gracza są zapisywane
+    atomowymi instrukcjami UPDATE (``balance = balance + :d``) w jednej
+    transakcji, bez odczytu i zapisu wartości w Pythonie. Warunek na
+    status gry zapobiega podwójnemu rozliczeniu przy równoległych żądaniach.
     
     Args:
         db: Sesja bazy danych.
-        player_id: ID gracza.
-        won: Czy gracz wygrał.
+        db_game: Gra do rozliczenia (z aktualnym stanem kart).
+        winner: Wynik gry ('player_won', 'dealer_won', 'tie').
         
-    Returns:
-        Player: Zaktualizowany gracz.
+    Raises:
+        ValueError: Jeśli gra została już rozliczona.
     """
-    db_player = get_player(db, player_id)
-    if not db_player:
-        return None
+    if winner == models.GameStatus.PLAYER_WON.value:
+        delta = db_game.bet_amount
+    elif winner == models.GameStatus.DEALER_WON.value:
+        delta = -db_game.bet_amount
+    else:
+        delta = 0
+    
+    db.flush()
+    result = db.execute(
+        update(models.Game)
+        .where(models.Game.id == db_game.id,
+               models.Game.status == models.GameStatus.IN_PROGRESS.value)
+        .values(status=winner, finished_at=datetime.utcnow())
+    )
+    if result.rowcount != 1:
+        raise ValueError("Gra jest już zakończona")
     
-    db_player.games_played += 1
-    if won:
-        db_player.games_won += 1
+    db.execute(
+        update(models.Player)
+        .where(models.Player.id == db_game.player_id)
+        .values(
+            balance=models.Player.balance + delta,
+            games_played=models.Player.games_played + 1,
+            games_won=models.Player.games_won + (1 if delta > 0 else 0)
+        )
+    )
+    counters.increment(db, counters.ACTIVE_GAMES, -1)
+    counters.increment(db, counters.FINISHED_GAMES, 1)
+
+
+def get_current_shoe(db: Session, player_id: int) -> Optional[models.Shoe]:
+    """
+    Pobiera najnowszy sabot gracza.
     
-    db.commit()
-    db.refresh(db_player)
-    return db_player
+    Args:
+        db: Sesja bazy danych.
+        player_id: ID gracza.
+        
+    Returns:
+        Shoe: Sabot lub None jeśli gracz nie ma jeszcze sabotu.
+    """
+    return db.query(models.Shoe).filter(
+        models.Shoe.player_id == player_id
+    ).order_by(models.Shoe.id.desc()).first()
 
 
-def update_player_balance(db: Session, player_id: int, 
-                          amount: int) -> Optional[models.Player]:
+def create_shoe(db: Session, player_id: int) -> models.Shoe:
     """
-    Aktualizuje saldo gracza.
+    Tworzy i tasuje nowy sabot dla gracza.
+    
+    Liczba talii i penetracja pochodzą z ``config``. Ziarno i kolejność
+    kart są pobierane z puli sabotów tasowanych w tle; gdy pula jest pusta,
+    sabot jest tasowany od razu. W bazie zapisywane jest tylko ziarno,
+    a potasowany sabot trafia do magazynu w pamięci.
     
     Args:
         db: Sesja bazy danych.
         player_id: ID gracza.
-        amount: Kwota do dodania (ujemna = odjęcie).
         
     Returns:
-        Player: Zaktualizowany gracz.
+        Shoe: Utworzony sabot.
     """
-    db_player = get_player(db, player_id)
-    if not db_player:
-        return None
+    shoe = Shoe(config.SHOE_DECKS, config.SHOE_PENETRATION)
+    shuffled = deck_pool.take() if deck_pool.num_decks == shoe.num_decks else None
+    if shuffled is None:
+        shoe.shuffle()
+    else:
+        shoe.seed, shoe.order = shuffled
+    
+    db_shoe = models.Shoe(
+        player_id=player_id,
+        num_decks=shoe.num_decks,
+        cut_card=shoe.cut_card,
+        seed=shoe.seed,
+        position=shoe.position
+    )
+    db.add(db_shoe)
+    db.flush()
+    game_store.shoe(db_shoe, order=shoe.order)
+    return db_shoe
+
+
+def _load_deck(db_game: models.Game) -> Deck:
+    """Odtwarza talię gry - sabot lub, dla starszych gier, własną talię gry."""
+    db_shoe = db_game.shoe
+    if db_shoe is None:
+        return Deck.from_list(db_game.deck)
+    return load_shoe(db_shoe, game_store.shoe_position(db_shoe))
+
+
+def _advance_shoe(db: Session, shoe_id: int, position: int) -> None:
+    """Przesuwa kursor sabotu w bazie - nigdy wstecz (zapis w tle może być nowszy)."""
+    db.execute(
+        update(models.Shoe)
+        .where(models.Shoe.id == shoe_id, models.Shoe.position < position)
+        .values(position=position)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _store_state(db_game: models.Game, game: BlackjackGame) -> None:
+    """Zapisuje ręce i wyniki gry w wierszu gry."""
+    db_game.player_hand = game.player_hand.to_list()
+    db_game.dealer_hand = game.dealer_hand.to_list()
+    db_game.player_score = game.player_hand.calculate_score()
+    db_game.dealer_score = game.dealer_hand.calculate_score()
+
+
+def _finish_game(db: Session, db_game: models.Game, game: BlackjackGame,
+                 events: List[dict], seq: int) -> None:
+    """
+    Zapisuje końcowy stan gry i jej zdarzenia, a następnie rozlicza grę.
     
-    db_player.balance += amount
-    db.commit()
-    db.refresh(db_player)
-    return db_player
+    Talia gry (tylko gry sprzed wprowadzenia sabotu) nie jest po
+    rozliczeniu odczytywana, więc jest usuwana z wiersza.
+    
+    Args:
+        db: Sesja bazy danych.
+        db_game: Wiersz gry.
+        game: Zakończona gra.
+        events: Niezapisane zdarzenia gry (uzupełniane o zdarzenie rozliczenia).
+        seq: Numer ostatniego zdarzenia w ``events``.
+    """
+    winner = game.determine_winner()
+    events.append(game_events.make_event(db_game.id, seq + 1, game_events.SETTLED,
+                                         detail=winner))
+    _store_state(db_game, game)
+    db_game.deck = null()
+    db_game.snapshot_seq = seq + 1
+    game_events.append(db, events)
+    settle_game(db, db_game, winner)
+
+
+def _apply_action(game: BlackjackGame, action: str) -> None:
+    """Wykonuje akcję gracza na stanie gry."""
+    if action == "hit":
+        game.player_hit()
+    elif action == "stand":
+        game.player_stand()
+    else:
+        raise ValueError(f"Nieznana akcja: {action}")
+
 
 def create_game(db: Session, game_data: schemas.GameCreate) -> models.Game:
     """
     Tworzy nową grę w bazie danych.
     
+    Karty są dobierane z bieżącego sabotu gracza. Nowy sabot jest
+    tasowany tylko wtedy, gdy gracz go nie ma lub rozdawanie doszło
+    do karty odcięcia. Trwająca gra trafia do magazynu w pamięci
+    (``game_store``) po zatwierdzeniu transakcji.
+    
     Args:
         db: Sesja bazy danych.
         game_data: Dane nowej gry.
@@ -189,39 +340,44 @@ def create_game(db: Session, game_data: schemas.GameCreate) -> models.Game:
         raise ValueError(f"Gracz {player.username} ma niewystarczające środki")
     
 
-    game = BlackjackGame()
-    game.deal_initial_cards()
-    state = game.get_state()
+    db_shoe = get_current_shoe(db, player.id)
+    if (db_shoe is None or
+            db_shoe.size - game_store.shoe_position(db_shoe) <= db_shoe.cut_card):
+        db_shoe = create_shoe(db, player.id)
+    
+    with game_store.lock:
+        shoe = game_store.shoe(db_shoe)
+        start = shoe.position
+        game = BlackjackGame(deck=shoe)
+        game.deal_initial_cards()
+        state = game.get_state()
+        position = shoe.position
+    _advance_shoe(db, db_shoe.id, position)
     
     db_game = models.Game(
         status=models.GameStatus.IN_PROGRESS.value,
         player_id=game_data.player1_id,
+        shoe_id=db_shoe.id,
         bet_amount=game_data.bet_amount,
         player_hand=state["player_hand"],
         dealer_hand=state["dealer_hand"],
-        deck=game.deck.to_list(),
+        deck=None,
         player_score=state["player_score"],
         dealer_score=state["dealer_score"]
     )
+    db.add(db_game)
+    counters.increment(db, counters.ACTIVE_GAMES, 1)
+    counters.increment(db, counters.TOTAL_WAGERED, game_data.bet_amount)
+    db.flush()
     
-
+    events = [game_events.created_event(game, db_game.id, start)]
     if state["game_over"]:
-        winner = game.determine_winner()
-        db_game.status = winner
-        db_game.finished_at = datetime.utcnow()
-        
-        if winner == "player_won":
-            update_player_stats(db, game_data.player1_id, won=True)
-            update_player_balance(db, game_data.player1_id, game_data.bet_amount)
-        elif winner == "dealer_won":
-            update_player_stats(db, game_data.player1_id, won=False)
-            update_player_balance(db, game_data.player1_id, -game_data.bet_amount)
-        else:
-            update_player_stats(db, game_data.player1_id, won=False)
-    
-    db.add(db_game)
-    db.commit()
-    db.refresh(db_game)
+        _finish_game(db, db_game, game, events, 1)
+    else:
+        db_game.snapshot_seq = 1
+        game_events.append(db, events)
+        db.flush()
+        game_store.stage_add(db, db_game, game, 1)
     return db_game
 
 
@@ -239,19 +395,135 @@ def get_game(db: Session, game_id: int) -> Optional[models.Game]:
     return db.query(models.Game).filter(models.Game.id == game_id).first()
 
 
-def get_games(db: Session, skip: int = 0, limit: int = 100) -> List[models.Game]:
+def lock_game(db: Session, game_id: int) -> Optional[models.Game]:
+    """
+    Pobiera grę do zmiany, blokując jej wiersz do końca transakcji.
+    
+    Wiersz jest pobierany przez ``SELECT ... FOR UPDATE SKIP LOCKED``:
+    na PostgreSQL równoczesna akcja w tej samej grze (np. z innego żądania
+    lub zadania w tle tej instancji) nie czeka na blokadę, tylko kończy się
+    błędem. SQLite nie ma blokad wierszy (klauzula jest pomijana), a zapisy
+    szereguje wątek piszący. Z bazy korzysta tylko jedna instancja aplikacji
+    (``database.acquire_instance_lock``).
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        Game: Gra lub None jeśli nie znaleziono.
+        
+    Raises:
+        ValueError: Jeśli wiersz gry jest zablokowany przez inną transakcję.
+    """
+    db_game = db.query(models.Game).filter(
+        models.Game.id == game_id
+    ).with_for_update(skip_locked=True).first()
+    if db_game is None and get_game(db, game_id) is not None:
+        raise ValueError("Gra jest właśnie zmieniana przez inne żądanie")
+    return db_game
+
+
+def get_game_view(db: Session, game_id: int):
+    """
+    Pobiera bieżący stan gry do odpowiedzi API.
+    
+    Trwająca gra jest zwracana z magazynu w pamięci (jej wiersz w bazie
+    może jeszcze nie zawierać ostatnich akcji), pozostałe - z bazy,
+    a gry przeniesione przez ``app.archiver`` - z archiwum.
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        GameResponse lub Game: Stan gry lub None jeśli nie znaleziono.
+    """
+    hot = game_store.get(game_id)
+    if hot is not None:
+        with game_store.lock:
+            if not hot.closed:
+                return hot.snapshot()
+    db_game = get_game(db, game_id)
+    if db_game is None:
+        return get_archived_game(db, game_id)
+    return db_game
+
+
+def get_archived_game(db: Session, game_id: int) -> Optional[schemas.GameResponse]:
+    """
+    Pobiera zarchiwizowaną grę.
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        GameResponse: Stan gry lub None jeśli gry nie ma w archiwum.
+    """
+    archived = db.get(models.GameArchive, game_id)
+    if archived is None:
+        return None
+    return schemas.GameResponse(
+        id=archived.id,
+        status=archived.status,
+        player_id=archived.player_id,
+        bet_amount=archived.bet_amount,
+        player_hand=archiver.decode_hand(archived.player_hand),
+        dealer_hand=archiver.decode_hand(archived.dealer_hand),
+        player_score=archived.player_score,
+        dealer_score=archived.dealer_score,
+        created_at=archived.created_at,
+        finished_at=archived.finished_at
+    )
+
+
+def get_games(db: Session, skip: int = 0, limit: int = 100,
+              after_id: int = 0) -> List[models.Game]:
     """
     Pobiera listę gier.
     
+    Gry są uporządkowane według ID. Kolejne strony należy pobierać
+    przez ``after_id`` (stronicowanie keyset); ``skip`` pozostaje dla
+    zgodności wstecznej.
+    
     Args:
         db: Sesja bazy danych.
         skip: Liczba rekordów do pominięcia.
         limit: Maksymalna liczba rekordów.
+        after_id: ID ostatniej gry poprzedniej strony.
         
     Returns:
         List[Game]: Lista gier.
     """
-    return db.query(models.Game).offset(skip).limit(limit).all()
+    query = db.query(models.Game).filter(
+        models.Game.id > after_id
+    ).order_by(models.Game.id)
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def with_live_state(games: List[models.Game]) -> list:
+    """
+    Zastępuje trwające gry ich bieżącym stanem z magazynu w pamięci.
+    
+    Args:
+        games: Wiersze gier.
+        
+    Returns:
+        list: Gry (wiersze lub GameResponse dla gier z magazynu).
+    """
+    result = []
+    for db_game in games:
+        hot = game_store.get(db_game.id)
+        if hot is not None:
+            with game_store.lock:
+                if not hot.closed:
+                    result.append(hot.snapshot())
+                    continue
+        result.append(db_game)
+    return result
 
 
 def get_active_games(db: Session) -> List[models.Game]:
@@ -269,22 +541,97 @@ def get_active_games(db: Session) -> List[models.Game]:
     ).all()
 
 
-def game_action(db: Session, game_id: int, action: schemas.GameAction) -> models.Game:
+def count_active_games(db: Session) -> int:
+    """
+    Zlicza aktywne gry (``SELECT COUNT(*)`` z użyciem indeksu na ``status``).
+    
+    Args:
+        db: Sesja bazy danych.
+        
+    Returns:
+        int: Liczba aktywnych gier.
+    """
+    return db.scalar(
+        select(func.count()).select_from(models.Game).where(
+            models.Game.status == models.GameStatus.IN_PROGRESS.value
+        )
+    )
+
+
+EXPORT_COLUMNS = (
+    "id", "status", "player_id", "bet_amount", "player_hand", "dealer_hand",
+    "player_score", "dealer_score", "created_at", "finished_at"
+)
+
+
+def iter_games_for_export(db: Session, status: Optional[str] = None,
+                          player_id: Optional[int] = None,
+                          since: Optional[datetime] = None,
+                          until: Optional[datetime] = None,
+                          batch_size: int = 1000) -> Iterator[Row]:
+    """
+    Iteruje po grach do eksportu.
+    
+    Wiersze są pobierane partiami (``yield_per``) bez tworzenia obiektów
+    ORM, więc zużycie pamięci nie zależy od liczby eksportowanych gier.
+    Na PostgreSQL partie są czytane kursorem po stronie serwera
+    (``stream_results``), a nie z wyniku wczytanego w całości przez sterownik.
+    
+    Args:
+        db: Sesja bazy danych.
+        status: Filtr statusu gry.
+        player_id: Filtr ID gracza.
+        since: Początek zakresu daty utworzenia (włącznie).
+        until: Koniec zakresu daty utworzenia (wyłącznie).
+        batch_size: Liczba wierszy pobieranych naraz.
+        
+    Yields:
+        Row: Wiersz z kolumnami ``EXPORT_COLUMNS``.
+    """
+    query = select(*(getattr(models.Game, column) for column in EXPORT_COLUMNS))
+    if status is not None:
+        query = query.where(models.Game.status == status)
+    if player_id is not None:
+        query = query.where(models.Game.player_id == player_id)
+    if since is not None:
+        query = query.where(models.Game.created_at >= since)
+    if until is not None:
+        query = query.where(models.Game.created_at < until)
+    
+    result = db.execute(
+        query.order_by(models.Game.id).execution_options(stream_results=True,
+                                                          yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        yield from partition
+
+
+def game_action(db: Session, game_id: int, action: schemas.GameAction):
     """
     Wykonuje akcję w grze (hit lub stand).
     
+    Każda akcja jest dopisywana do dziennika zdarzeń gry. Gra z magazynu
+    w pamięci jest obsługiwana bez odczytu wiersza gry; jeśli akcja nie
+    kończy gry, zdarzenie zostanie zapisane w tle. Gra spoza magazynu
+    jest wczytywana z bazy i po akcji trafia do magazynu. Zakończona gra
+    jest zapisywana i rozliczana synchronicznie.
+    
     Args:
         db: Sesja bazy danych.
         game_id: ID gry.
         action: Akcja do wykonania.
         
     Returns:
-        Game: Zaktualizowana gra.
+        GameResponse lub Game: Zaktualizowana gra.
         
     Raises:
         ValueError: Jeśli gra nie istnieje lub jest zakończona.
     """
-    db_game = get_game(db, game_id)
+    hot = game_store.get(game_id)
+    if hot is not None:
+        return _hot_game_action(db, hot, action)
+    
+    db_game = lock_game(db, game_id)
     if not db_game:
         raise ValueError(f"Gra o ID {game_id} nie istnieje")
     
@@ -294,45 +641,207 @@ def game_action(db: Session, game_id: int, action: schemas.GameAction) -> models
     if action.player_id != db_game.player_id:
         raise ValueError(f"Gracz {action.player_id} nie uczestniczy w tej grze")
     
-    game = BlackjackGame.from_state(
-        player_hand_data=db_game.player_hand,
-        dealer_hand_data=db_game.dealer_hand,
-        deck_data=db_game.deck
-    )
+    db_shoe = db_game.shoe
+    seq = game_events.last_seq(db, db_game.id)
+    with game_store.lock:
+        game = BlackjackGame(
+            deck=game_store.shoe(db_shoe) if db_shoe else Deck.from_list(db_game.deck),
+            player_hand=Hand.from_list(db_game.player_hand),
+            dealer_hand=Hand.from_list(db_game.dealer_hand)
+        )
+        player_cards, dealer_cards = len(game.player_hand.cards), len(game.dealer_hand.cards)
+        start = game.deck.position if db_shoe else None
+        _apply_action(game, action.action)
+        position = game.deck.position if db_shoe else None
+    
+    seq += 1
+    events = [game_events.action_event(game, db_game.id, seq, action.action,
+                                       player_cards, dealer_cards, start)]
+    if db_shoe is None:
+        db_game.deck = game.deck.to_list()
+    else:
+        _advance_shoe(db, db_shoe.id, position)
     
-    if action.action == "hit":
-        game.player_hit()
-    elif action.action == "stand":
-        game.player_stand()
+    if game.game_over:
+        _finish_game(db, db_game, game, events, seq)
     else:
-        raise ValueError(f"Nieznana akcja: {action.action}")
+        _store_state(db_game, game)
+        db_game.snapshot_seq = seq
+        game_events.append(db, events)
+        db.flush()
+        if db_shoe is not None:
+            game_store.stage_add(db, db_game, game, seq)
+    return db_game
+
+
+def _hot_game_action(db: Session, hot: HotGame, action: schemas.GameAction):
+    """
+    Wykonuje akcję w grze z magazynu w pamięci.
     
-    state = game.get_state()
-    db_game.player_hand = state["player_hand"]
-    db_game.dealer_hand = state["dealer_hand"]
-    db_game.deck = game.deck.to_list()
-    db_game.player_score = state["player_score"]
-    db_game.dealer_score = state["dealer_score"]
+    Args:
+        db: Sesja bazy danych.
+        hot: Gra z magazynu.
+        action: Akcja do wykonania.
+        
+    Returns:
+        GameResponse lub Game: Stan trwającej gry lub rozliczony wiersz gry.
+        
+    Raises:
+        ValueError: Jeśli gra jest już rozliczana lub gracz nie uczestniczy w grze.
+    """
+    with game_store.lock:
+        if hot.closed or game_store.get(hot.game_id) is not hot:
+            raise ValueError("Gra jest już zakończona")
+        if action.player_id != hot.player_id:
+            raise ValueError(f"Gracz {action.player_id} nie uczestniczy w tej grze")
+        
+        # Gra zakończona, ale nierozliczona (wycofana transakcja rozliczenia)
+        # jest tylko rozliczana - akcja, która ją zakończyła, jest już w zdarzeniach.
+        if not hot.game.game_over:
+            player_cards = len(hot.game.player_hand.cards)
+            dealer_cards = len(hot.game.dealer_hand.cards)
+            start = hot.game.deck.position
+            _apply_action(hot.game, action.action)
+            hot.seq += 1
+            hot.events.append(game_events.action_event(
+                hot.game, hot.game_id, hot.seq, action.action,
+                player_cards, dealer_cards, start
+            ))
+            if not hot.game.game_over:
+                return hot.snapshot()
+        position = hot.game.deck.position
+        seq = hot.seq
+    
+    events = game_store.close(db, hot)
+    db_game = get_game(db, hot.game_id)
+    if not db_game:
+        raise ValueError(f"Gra o ID {hot.game_id} nie istnieje")
     
-    if state["game_over"]:
-        winner = game.determine_winner()
-        db_game.status = winner
-        db_game.finished_at = datetime.utcnow()
-        
-        if winner == "player_won":
-            update_player_stats(db, db_game.player_id, won=True)
-            update_player_balance(db, db_game.player_id, db_game.bet_amount)
-        elif winner == "dealer_won":
-            update_player_stats(db, db_game.player_id, won=False)
-            update_player_balance(db, db_game.player_id, -db_game.bet_amount)
-        else:
-            update_player_stats(db, db_game.player_id, won=False)
-    
-    db.commit()
-    db.refresh(db_game)
+    _advance_shoe(db, hot.shoe_id, position)
+    _finish_game(db, db_game, hot.game, events, seq)
     return db_game
 
 
+def get_game_events(db: Session, game_id: int) -> Optional[List[schemas.GameEventResponse]]:
+    """
+    Zwraca dziennik zdarzeń gry (razem ze zdarzeniami czekającymi na zapis).
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        List[GameEventResponse]: Zdarzenia gry lub None jeśli gra nie istnieje.
+    """
+    hot = game_store.get(game_id)
+    pending = []
+    if hot is not None:
+        with game_store.lock:
+            pending = list(hot.events)
+    elif get_game(db, game_id) is None:
+        return None
+    
+    stored = [
+        {"seq": event.seq, "type": event.type, "cards": event.cards,
+         "detail": event.detail, "created_at": event.created_at}
+        for event in game_events.get_events(db, game_id)
+    ]
+    seen = {event["seq"] for event in stored}
+    stored += [dict(event, created_at=None) for event in pending if event["seq"] not in seen]
+    return [
+        schemas.GameEventResponse(
+            seq=event["seq"],
+            type=event["type"],
+            cards=[Card.from_index(index).to_dict() for index in event["cards"]],
+            detail=event["detail"],
+            created_at=event["created_at"]
+        )
+        for event in stored
+    ]
+
+
+def get_game_replay(db: Session, game_id: int) -> Optional[schemas.GameReplay]:
+    """
+    Zwraca zwięzły kod odtworzenia gry (ziarno sabotu i przebieg akcji).
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        GameReplay: Kod odtworzenia lub None jeśli gra nie istnieje.
+        
+    Raises:
+        ValueError: Jeśli gry nie można opisać kodem (np. gra bez sabotu).
+    """
+    hot = game_store.get(game_id)
+    pending = []
+    if hot is not None:
+        with game_store.lock:
+            pending = list(hot.events)
+    db_game = get_game(db, game_id)
+    if db_game is None:
+        return None
+    db_shoe = db_game.shoe
+    if db_shoe is None or db_shoe.seed is None:
+        raise ValueError("Gra nie ma sabotu z zapisanym ziarnem")
+    
+    events = game_events.get_events(db, game_id)
+    seen = {event.seq for event in events}
+    events += [models.GameEvent(**event) for event in pending if event["seq"] not in seen]
+    code = game_events.encode_replay(db_shoe.seed, db_shoe.num_decks, events)
+    return schemas.GameReplay(game_id=game_id, code=code)
+
+
+def get_game_advice(db: Session, game_id: int) -> Optional[schemas.GameAdvice]:
+    """
+    Zwraca oczekiwaną wartość akcji hit i stand dla trwającej gry.
+    
+    Karty niewidoczne dla gracza to pozostały sabot oraz zakryta
+    karta krupiera (pierwsza karta jego ręki).
+    
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        
+    Returns:
+        GameAdvice: Podpowiedź lub None jeśli gra nie istnieje.
+        
+    Raises:
+        ValueError: Jeśli gra jest już zakończona.
+    """
+    hot = game_store.get(game_id)
+    if hot is not None:
+        with game_store.lock:
+            if hot.closed or hot.game.game_over:
+                raise ValueError("Gra jest już zakończona")
+            player_cards = list(hot.game.player_hand.cards)
+            hole_card, upcard = hot.game.dealer_hand.cards[:2]
+            unseen = hot.game.deck.cards
+    else:
+        db_game = get_game(db, game_id)
+        if not db_game:
+            return None
+        
+        if db_game.status != models.GameStatus.IN_PROGRESS.value:
+            raise ValueError("Gra jest już zakończona")
+        
+        player_cards = [Card.from_dict(card) for card in db_game.player_hand]
+        hole_card, upcard = (Card.from_dict(card) for card in db_game.dealer_hand[:2])
+        unseen = _load_deck(db_game).cards
+    unseen.append(hole_card)
+    
+    advice = advise(player_cards, upcard, unseen)
+    return schemas.GameAdvice(
+        game_id=game_id,
+        player_score=advice.player_score,
+        dealer_upcard=upcard.to_dict(),
+        hit_ev=advice.hit_ev,
+        stand_ev=advice.stand_ev,
+        recommendation=advice.recommendation
+    )
+
+
 def delete_game(db: Session, game_id: int) -> bool:
     """
     Usuwa grę z bazy danych.
@@ -344,10 +853,21 @@ def delete_game(db: Session, game_id: int) -> bool:
     Returns:
         bool: True jeśli usunięto, False jeśli nie znaleziono.
     """
+    hot = game_store.get(game_id)
+    if hot is not None:
+        game_store.close(db, hot)
+    
     db_game = get_game(db, game_id)
     if not db_game:
         return False
     
+    if db_game.status == models.GameStatus.IN_PROGRESS.value:
+        counters.increment(db, counters.ACTIVE_GAMES, -1)
+    else:
+        counters.increment(db, counters.FINISHED_GAMES, -1)
+    counters.increment(db, counters.TOTAL_WAGERED, -db_game.bet_amount)
+    
+    db.execute(delete(models.GameEvent).where(models.GameEvent.game_id == game_id))
     db.delete(db_game)
-    db.commit()
+    db.flush()
     return True
@@ -1,34 +1,585 @@
 """
 Moduł konfiguracji bazy danych.
 
-Zawiera konfigurację połączenia z bazą SQLite oraz fabrykę sesji.
+Zawiera konfigurację połączenia z bazą danych, fabrykę sesji oraz
+jednostkę pracy (unit of work): funkcje CRUD tylko przygotowują zmiany,
+a transakcja jest zatwierdzana raz na granicy żądania.
+
+Adres bazy (``config.DATABASE_URL``) wskazuje SQLite (domyślnie) lub
+PostgreSQL (sterownik psycopg 3, ``postgresql+psycopg://...``). Rozmiar
+puli połączeń, nadmiarowe połączenia i maksymalny wiek połączenia
+ustawia się w ``config``; połączenia z serwerem bazy są dodatkowo
+sprawdzane przed użyciem (``pool_pre_ping``).
+
+W trybie ``config.STORAGE == "memory"`` wszystkie silniki łączą się
+z jedną ulotną bazą SQLite w pamięci procesu (``MEMORY_DATABASE_URL``,
+współdzielona pamięć podręczna), więc zatwierdzenie nie czeka na dysk.
+Baza istnieje, dopóki jest otwarte choć jedno połączenie - utrzymuje ją
+stałe połączenie wątku piszącego (``StaticPool``). Czytelnicy nie czekają
+na blokady tabel zapisywanych przez wątek piszący (``read_uncommitted``),
+a zapis, który trafi na blokadę tabeli, czeka na jej zwolnienie
+(``enable_lock_wait``) - tak jak ``busy_timeout`` dla bazy na dysku.
+
+Endpointy HTTP korzystają z sesji asynchronicznej (``AsyncSession``
+na sterowniku aiosqlite lub psycopg), więc oczekiwanie na bazę nie blokuje pętli
+zdarzeń ani nie zajmuje wątku z puli. Sesja asynchroniczna opakowuje
+sesję klasy ``SessionLocal``, dzięki czemu zdarzenia sesji (liczniki,
+magazyn gier) działają tak samo dla obu rodzajów sesji. Wątki w tle
+i zadania wsadowe używają sesji synchronicznej.
+
+Każde nowe połączenie SQLite dostaje ustawienia (PRAGMA) z profilu
+``config.SQLITE_PROFILE`` - domyślnie dziennik WAL (czytelnicy nie
+blokują piszącego), ``synchronous=NORMAL``, limit oczekiwania na blokadę
+oraz większą pamięć podręczną i mapowanie pliku. Zapisy, które mimo to
+trafią na blokadę, są ponawiane z losowym opóźnieniem
+(``run_in_transaction``, ``lock_retry_delays``).
+
+Zmiany wykonywane przez endpointy trafiają do jednego wątku piszącego
+(``write_queue``), który korzysta z osobnego silnika ``writer_engine``
+z jednym połączeniem. Na SQLite transakcja tego połączenia zaczyna się od
+``BEGIN IMMEDIATE`` (blokada zapisu od początku, bez późniejszego
+podnoszenia blokady), a operacje grupy są oddzielone punktami zapisu
+(SAVEPOINT), których sterownik pysqlite sam nie obsługuje poprawnie.
+
+Z bazy może korzystać tylko jedna instancja aplikacji (jeden proces):
+magazyn trwających gier, liczniki i kursory sabotów są trzymane w pamięci
+procesu. Na PostgreSQL działająca instancja zajmuje blokadę doradczą
+(``acquire_instance_lock``), a kolejna instancja nie startuje.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import Generator
+import asyncio
+import random
+import sqlite3
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from typing import Any, AsyncIterator, Callable, Dict, Generator, Iterator, Optional, TypeVar, Union
 
-SQLALCHEMY_DATABASE_URL: str = "sqlite:///./blackjack.db"
+from . import config
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+T = TypeVar("T")
+
+ASYNC_DRIVERS: Dict[str, str] = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg"
+}
+"""Sterowniki asynchroniczne odpowiadające sterownikom synchronicznym."""
+
+LOCK_SQLSTATES = frozenset({"40001", "40P01", "55P03"})
+"""
+Kody błędów PostgreSQL ponawianych jak blokada SQLite: konflikt
+serializacji, zakleszczenie i niedostępna blokada wiersza (``NOWAIT``).
+"""
+
+
+def async_url(url: str) -> str:
+    """
+    Wyznacza adres bazy dla silnika asynchronicznego.
+
+    Args:
+        url: Adres bazy danych silnika synchronicznego.
+
+    Returns:
+        str: Ten sam adres ze sterownikiem asynchronicznym (aiosqlite,
+        psycopg). Adres z innym sterownikiem jest zwracany bez zmian.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+STORAGE_MODES = ("disk", "memory")
+"""Tryby przechowywania danych (``config.STORAGE``)."""
+
+MEMORY_DATABASE_URL: str = "sqlite:///file:blackjack?mode=memory&cache=shared&uri=true"
+"""Adres ulotnej bazy w pamięci, wspólnej dla wszystkich połączeń procesu."""
+
+MEMORY_LOCK_TIMEOUT: float = 5.0
+"""Maksymalny czas oczekiwania (w sekundach) na blokadę tabeli bazy w pamięci."""
+
+INSTANCE_LOCK_KEY: int = 0x426C61636B6A6163
+"""Klucz blokady doradczej PostgreSQL zajmowanej przez działającą instancję aplikacji."""
+
+if config.STORAGE not in STORAGE_MODES:
+    raise ValueError(f"Nieznany tryb przechowywania danych: {config.STORAGE}")
+MEMORY: bool = config.STORAGE == "memory"
+
+if MEMORY:
+    SQLALCHEMY_DATABASE_URL: str = MEMORY_DATABASE_URL
+    ASYNC_DATABASE_URL: str = async_url(MEMORY_DATABASE_URL)
+else:
+    SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+    ASYNC_DATABASE_URL = config.ASYNC_DATABASE_URL or async_url(SQLALCHEMY_DATABASE_URL)
+DIALECT: str = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()
+"""Nazwa bazy danych (``sqlite`` lub ``postgresql``)."""
+
+SQLITE_PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    "legacy": {},
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY"
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY"
+    },
+    "memory": {
+        "read_uncommitted": 1,
+        "temp_store": "MEMORY"
+    }
+}
+"""
+Profile ustawień SQLite.
+
+- ``legacy`` - ustawienia domyślne (dziennik wycofań, ``synchronous=FULL``).
+- ``balanced`` - WAL z ``synchronous=NORMAL``: zatwierdzenie nie czeka na
+  fsync (awaria zasilania może cofnąć ostatnie transakcje, ale nie psuje bazy).
+- ``durable`` - WAL z ``synchronous=FULL``: każde zatwierdzenie jest trwałe.
+- ``memory`` - baza w pamięci ze współdzieloną pamięcią podręczną: odczyt
+  nie czeka na blokady tabel (widzi też zmiany jeszcze niezatwierdzone).
+  Używany zawsze w trybie ``config.STORAGE == "memory"``.
+"""
+
+
+def apply_sqlite_profile(target: Engine, profile: str) -> None:
+    """
+    Ustawia PRAGMA z profilu na każdym nowym połączeniu silnika.
+
+    Args:
+        target: Silnik bazy danych (dla silnika asynchronicznego - ``sync_engine``).
+        profile: Nazwa profilu z ``SQLITE_PROFILES``.
+
+    Raises:
+        ValueError: Jeśli profil nie istnieje.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Nieznany profil SQLite: {profile}")
+    pragmas = SQLITE_PROFILES[profile]
+    if not pragmas:
+        return
+
+    @event.listens_for(target, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def enable_explicit_begin(target: Engine) -> None:
+    """
+    Przejmuje otwieranie transakcji od sterownika pysqlite.
+
+    Sterownik otwiera transakcję dopiero przed pierwszą instrukcją
+    modyfikującą i nie obsługuje poprawnie punktów zapisu (SAVEPOINT).
+    Po tej zmianie każda transakcja silnika zaczyna się od
+    ``BEGIN IMMEDIATE`` - blokada zapisu jest brana od razu.
+
+    Args:
+        target: Silnik bazy danych.
+    """
+    @event.listens_for(target, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(target, "begin")
+    def _begin_immediate(connection) -> None:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def enable_lock_wait(target: Engine, timeout: float) -> None:
+    """
+    Ponawia polecenie, które trafiło na blokadę tabeli bazy w pamięci.
+
+    Połączenia ze współdzieloną pamięcią podręczną nie korzystają
+    z ``busy_timeout`` - polecenie trafiające na blokadę tabeli innego
+    połączenia od razu kończy się błędem "database table is locked", a jego
+    transakcja pozostaje otwarta. Polecenie jest wtedy ponawiane
+    z rosnącym opóźnieniem, aż blokada zostanie zwolniona lub minie
+    ``timeout``. Oczekiwanie blokuje wątek, więc nie należy go włączać
+    dla silnika asynchronicznego.
+
+    Args:
+        target: Silnik bazy danych.
+        timeout: Maksymalny czas oczekiwania w sekundach.
+    """
+    def wait(execute: Callable[[], Any]) -> bool:
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            try:
+                execute()
+                return True
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) or time.monotonic() + delay > deadline:
+                    raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    @event.listens_for(target, "do_execute")
+    def _execute(cursor, statement, parameters, context) -> bool:
+        return wait(lambda: cursor.execute(statement, parameters))
+
+    @event.listens_for(target, "do_executemany")
+    def _executemany(cursor, statement, parameters, context) -> bool:
+        return wait(lambda: cursor.executemany(statement, parameters))
+
+
+def engine_options(url: str, pool_size: Optional[int] = None,
+                   max_overflow: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Zwraca ustawienia puli połączeń silnika dla danej bazy.
+
+    Args:
+        url: Adres bazy danych.
+        pool_size: Rozmiar puli (domyślnie ``config.DB_POOL_SIZE``).
+        max_overflow: Dodatkowe połączenia (domyślnie ``config.DB_MAX_OVERFLOW``).
+
+    Returns:
+        Dict[str, Any]: Argumenty ``create_engine`` / ``create_async_engine``.
+    """
+    options: Dict[str, Any] = {
+        "pool_size": config.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": config.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_recycle": config.DB_POOL_RECYCLE
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_pre_ping"] = True
+    return options
+
+
+if MEMORY:
+    # Pula domyślna dla bazy w pamięci trzyma jedno połączenie na wątek
+    # (w silniku asynchronicznym - jedno dla wszystkich sesji). Bazę utrzymuje
+    # przy życiu stałe połączenie wątku piszącego, które nie jest odnawiane.
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=QueuePool,
+                           **engine_options(SQLALCHEMY_DATABASE_URL))
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    writer_engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=StaticPool,
+                                  connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+    if DIALECT == "sqlite":
+        # aiosqlite trzyma każde połączenie w osobnym wątku (nie-demonie), więc
+        # silnik asynchroniczny nie utrzymuje puli - połączenia otwarte w puli
+        # blokowałyby zakończenie procesu. Otwarcie połączenia SQLite jest tanie.
+        async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    else:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    writer_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        **engine_options(SQLALCHEMY_DATABASE_URL, pool_size=1, max_overflow=0)
+    )
+
+SQLITE_PROFILE: str = "memory" if MEMORY else config.SQLITE_PROFILE
+"""Profil ustawień SQLite używany przez silniki aplikacji."""
+
+if DIALECT == "sqlite":
+    apply_sqlite_profile(engine, SQLITE_PROFILE)
+    apply_sqlite_profile(async_engine.sync_engine, SQLITE_PROFILE)
+    apply_sqlite_profile(writer_engine, SQLITE_PROFILE)
+    enable_explicit_begin(writer_engine)
+
+if MEMORY:
+    enable_lock_wait(engine, MEMORY_LOCK_TIMEOUT)
+    enable_lock_wait(writer_engine, MEMORY_LOCK_TIMEOUT)
+    writer_engine.connect().close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    sync_session_class=SessionLocal.class_
+)
+
 Base = declarative_base()
 
 
-def get_db() -> Generator:
+@dataclass
+class CommitCounter:
     """
-    Generator sesji bazy danych.
-    
-    Tworzy sesję bazy danych i zapewnia jej prawidłowe zamknięcie
-    po zakończeniu operacji.
+    Licznik zatwierdzeń transakcji w obrębie jednego żądania.
+
+    Attributes:
+        commits: Liczba zatwierdzeń.
+    """
+    commits: int = 0
+
+
+_current_counter: ContextVar[Optional[CommitCounter]] = ContextVar(
+    "commit_counter", default=None
+)
+
+commit_stats: Dict[str, int] = {
+    "requests": 0,
+    "commits": 0,
+    "max_commits_per_request": 0
+}
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _count_commit(session: Session) -> None:
+    """Zlicza zatwierdzenia transakcji (globalnie i w bieżącym żądaniu)."""
+    if session.in_nested_transaction():
+        return
+    commit_stats["commits"] += 1
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.commits += 1
+
+
+def current_commit_counter() -> Optional[CommitCounter]:
+    """Zwraca licznik zatwierdzeń bieżącego żądania (None poza żądaniem)."""
+    return _current_counter.get()
+
+
+@contextmanager
+def count_commits() -> Iterator[CommitCounter]:
+    """
+    Zlicza zatwierdzenia transakcji wykonane wewnątrz bloku.
+
+    Yields:
+        CommitCounter: Licznik dla bieżącego żądania.
+    """
+    counter = CommitCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+        commit_stats["requests"] += 1
+        commit_stats["max_commits_per_request"] = max(
+            commit_stats["max_commits_per_request"], counter.commits
+        )
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Jednostka pracy poza obsługą żądania HTTP.
+
+    Zatwierdza transakcję raz po wyjściu z bloku lub wycofuje ją w razie błędu.
+
+    Yields:
+        Session: Sesja bazy danych.
     """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    """
+    Sprawdza, czy błąd oznacza blokadę bazy przez inne połączenie.
+
+    Args:
+        exc: Wyjątek.
+
+    Returns:
+        bool: True dla błędów "database is locked" / "database is busy"
+        (SQLite) oraz konfliktów serializacji, zakleszczeń i niedostępnych
+        blokad (PostgreSQL, ``LOCK_SQLSTATES``).
+    """
+    if not isinstance(exc, OperationalError):
+        return False
+    if getattr(exc.orig, "sqlstate", None) in LOCK_SQLSTATES:
+        return True
+    message = str(exc.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def lock_retry_delays(retries: Optional[int] = None,
+                      base: Optional[float] = None) -> Iterator[float]:
+    """
+    Zwraca opóźnienia kolejnych ponowień zapisu po trafieniu na blokadę.
+
+    Opóźnienie rośnie wykładniczo i jest losowane z przedziału
+    ``[0, base * 2**n]`` (full jitter), aby piszący, którzy trafili na
+    blokadę jednocześnie, nie ponawiali zapisu w tej samej chwili.
+
+    Args:
+        retries: Liczba ponowień (domyślnie ``config.DB_LOCK_RETRIES``).
+        base: Podstawa opóźnienia w sekundach (domyślnie ``config.DB_LOCK_RETRY_BASE``).
+
+    Yields:
+        float: Opóźnienie w sekundach przed kolejnym ponowieniem.
+    """
+    retries = config.DB_LOCK_RETRIES if retries is None else retries
+    base = config.DB_LOCK_RETRY_BASE if base is None else base
+    for attempt in range(retries):
+        yield random.uniform(0, base * 2 ** attempt)
+
+
+def run_in_transaction(work: Callable[[Session], T]) -> T:
+    """
+    Wykonuje pracę w jednostce pracy, ponawiając ją po trafieniu na blokadę.
+
+    Po błędzie blokady transakcja jest wycofywana, a praca wykonywana od
+    nowa w nowej sesji, więc ``work`` nie może mieć skutków ubocznych poza
+    sesją (efekty odroczone do zatwierdzenia są bezpieczne).
+
+    Args:
+        work: Funkcja wykonująca zmiany w przekazanej sesji.
+
+    Returns:
+        Wynik ``work`` z zatwierdzonej transakcji.
+    """
+    for delay in lock_retry_delays():
+        try:
+            with session_scope() as db:
+                return work(db)
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+        time.sleep(delay)
+    with session_scope() as db:
+        return work(db)
+
+
+async def run_sync_with_retry(db: AsyncSession, work: Callable[..., T], *args: Any) -> T:
+    """
+    Wykonuje synchroniczną operację w sesji asynchronicznej, ponawiając ją
+    po trafieniu na blokadę.
+
+    Po błędzie blokady transakcja jest wycofywana (efekty odroczone do
+    zatwierdzenia są odrzucane), a operacja wykonywana od nowa w tej samej
+    sesji po losowym opóźnieniu, które nie blokuje pętli zdarzeń.
+
+    Args:
+        db: Asynchroniczna sesja bazy danych.
+        work: Funkcja ``work(session, *args)`` wykonująca zmiany.
+        *args: Argumenty ``work``.
+
+    Returns:
+        Wynik ``work``.
+    """
+    for delay in lock_retry_delays():
+        try:
+            return await db.run_sync(work, *args)
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+        await db.rollback()
+        await asyncio.sleep(delay)
+    return await db.run_sync(work, *args)
+
+
+def get_db() -> Generator:
+    """
+    Generator sesji bazy danych - jednostka pracy żądania.
+
+    Tworzy sesję bazy danych, zatwierdza transakcję dokładnie raz po
+    zakończeniu obsługi żądania (lub wycofuje ją w razie błędu) i zapewnia
+    prawidłowe zamknięcie sesji.
+    """
+    with session_scope() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Asynchroniczna jednostka pracy.
+
+    Zatwierdza transakcję raz po wyjściu z bloku lub wycofuje ją w razie
+    błędu. Sesja, która nie rozpoczęła transakcji (zapisy żądania wykonał
+    wątek piszący), nie jest zatwierdzana.
+
+    Yields:
+        AsyncSession: Asynchroniczna sesja bazy danych.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            if db.in_transaction():
+                await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Asynchroniczna sesja bazy danych - jednostka pracy żądania.
+
+    Odpowiednik ``get_db`` dla endpointów ``async def``: transakcja jest
+    zatwierdzana dokładnie raz po zakończeniu obsługi żądania.
+    """
+    async with async_session_scope() as db:
+        yield db
+
+
+def acquire_instance_lock(target: Optional[Engine] = None) -> Optional[Connection]:
+    """
+    Zajmuje bazę dla bieżącej instancji aplikacji.
+
+    Na PostgreSQL zajmuje blokadę doradczą ``INSTANCE_LOCK_KEY`` na osobnym
+    połączeniu, utrzymywanym do ``release_instance_lock``. Blokada jest
+    zwalniana także wtedy, gdy proces zakończy się bez zwolnienia (serwer
+    zamyka jego połączenie). SQLite jest bazą jednego procesu aplikacji
+    i nie wymaga blokady.
+
+    Args:
+        target: Silnik bazy danych (domyślnie ``engine``).
+
+    Returns:
+        Connection: Połączenie z zajętą blokadą lub None dla SQLite.
+
+    Raises:
+        RuntimeError: Jeśli z bazy korzysta już inna instancja aplikacji.
+    """
+    target = target or engine
+    if target.dialect.name != "postgresql":
+        return None
+    connection = target.connect()
+    locked = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": INSTANCE_LOCK_KEY})
+    connection.commit()
+    if not locked:
+        connection.close()
+        raise RuntimeError(
+            "Z bazy danych korzysta już inna instancja aplikacji - "
+            "stan gier jest trzymany w pamięci procesu, więc może działać tylko jedna"
+        )
+    return connection
+
+
+def release_instance_lock(connection: Optional[Connection]) -> None:
+    """
+    Zwalnia blokadę zajętą przez ``acquire_instance_lock``.
+
+    Args:
+        connection: Połączenie z zajętą blokadą (None dla SQLite).
+    """
+    if connection is None:
+        return
+    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INSTANCE_LOCK_KEY})
+    connection.commit()
+    connection.close()
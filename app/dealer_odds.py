@@ -0,0 +1,196 @@
+"""
+Dokładne prawdopodobieństwa wyniku krupiera.
+
+Oblicza rozkład końcowego wyniku krupiera (17-21 lub bust) dla dowolnej
+odkrytej karty i dowolnego składu pozostałej talii. Obliczenie to
+memoizowana rekurencja po liczbach kart każdej rangi (bez losowania),
+zgodna z zasadami ``BlackjackGame``: krupier dobiera dopóki ma mniej niż
+``DEALER_STAND_VALUE`` punktów, a asy liczone są tak jak
+w ``Hand.calculate_score``.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .game_logic import BlackjackGame, Card, Deck, best_score
+
+Composition = Tuple[int, ...]
+
+BUST: str = "bust"
+
+# Indeks w wektorze wyników oznaczający przekroczenie 21.
+_BUST_INDEX: int = 22
+
+DEALER_STAND_VALUE: int = BlackjackGame.DEALER_STAND_VALUE
+
+
+def hard_value(card: Card) -> int:
+    """
+    Zwraca wartość "twardą" karty (as = 1).
+
+    Args:
+        card: Karta.
+
+    Returns:
+        int: Wartość 1-10.
+    """
+    return 1 if card.rank == "A" else card.value
+
+
+def composition_from_cards(cards: Iterable[Card]) -> Composition:
+    """
+    Zlicza karty według wartości.
+
+    Args:
+        cards: Karty pozostałe w talii.
+
+    Returns:
+        Composition: Krotka 10 liczników - indeks 0 to asy, 1-8 to karty
+        2-9, indeks 9 to wszystkie karty o wartości 10.
+    """
+    counts = [0] * 10
+    for card in cards:
+        counts[hard_value(card) - 1] += 1
+    return tuple(counts)
+
+
+FULL_DECK: Composition = composition_from_cards(Deck().cards)
+
+
+def remove_card(composition: Composition, card: Card) -> Composition:
+    """
+    Usuwa kartę ze składu talii.
+
+    Args:
+        composition: Skład talii.
+        card: Karta do usunięcia.
+
+    Returns:
+        Composition: Nowy skład talii.
+    """
+    index = hard_value(card) - 1
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
+
+
+def _final_vector(score: int) -> Tuple[float, ...]:
+    """Zwraca wektor wyników z prawdopodobieństwem 1 dla danego wyniku."""
+    vector = [0.0] * (_BUST_INDEX + 1)
+    vector[min(score, _BUST_INDEX)] = 1.0
+    return tuple(vector)
+
+
+@lru_cache(maxsize=1 << 18)
+def _dealer_draw(hard_total: int, has_ace: bool, counts: Composition) -> Tuple[float, ...]:
+    """
+    Rozkład wyniku krupiera od danego stanu ręki do końca jego tury.
+
+    Args:
+        hard_total: Suma ręki z asami liczonymi jako 1.
+        has_ace: Czy ręka zawiera asa.
+        counts: Skład pozostałej talii.
+
+    Returns:
+        Tuple[float, ...]: Prawdopodobieństwa wyników 0-21 oraz bust (indeks 22).
+    """
+    score = best_score(hard_total, has_ace)
+    total = sum(counts)
+    if score >= DEALER_STAND_VALUE or total == 0:
+        return _final_vector(score)
+
+    result = [0.0] * (_BUST_INDEX + 1)
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        value = index + 1
+        remaining = counts[:index] + (count - 1,) + counts[index + 1:]
+        sub = _dealer_draw(hard_total + value, has_ace or value == 1, remaining)
+        weight = count / total
+        for outcome, probability in enumerate(sub):
+            if probability:
+                result[outcome] += weight * probability
+    return tuple(result)
+
+
+@lru_cache(maxsize=1 << 14)
+def _distribution(upcard_value: int, counts: Composition,
+                  exclude_blackjack: bool) -> Tuple[float, ...]:
+    """Rozkład wyniku krupiera z odkrytą kartą; zakryta karta pochodzi z ``counts``."""
+    total = sum(counts)
+    if total == 0:
+        return _final_vector(best_score(upcard_value, upcard_value == 1))
+
+    result = [0.0] * (_BUST_INDEX + 1)
+    weight_sum = 0
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        value = index + 1
+        has_ace = upcard_value == 1 or value == 1
+        if exclude_blackjack and best_score(upcard_value + value, has_ace) == 21:
+            continue
+        remaining = counts[:index] + (count - 1,) + counts[index + 1:]
+        sub = _dealer_draw(upcard_value + value, has_ace, remaining)
+        weight_sum += count
+        for outcome, probability in enumerate(sub):
+            if probability:
+                result[outcome] += count * probability
+
+    if weight_sum == 0:
+        return tuple(result)
+    return tuple(probability / weight_sum for probability in result)
+
+
+def dealer_outcome_vector(upcard: Card, composition: Composition,
+                          exclude_blackjack: bool = False) -> Tuple[float, ...]:
+    """
+    Zwraca rozkład wyniku krupiera jako wektor.
+
+    Wariant ``dealer_outcome_distribution`` dla kodu, który sam liczy
+    na wynikach - bez budowania słownika.
+
+    Args:
+        upcard: Odkryta karta krupiera.
+        composition: Skład talii, z której pochodzi zakryta karta i kolejne karty.
+        exclude_blackjack: Czy pominąć zakryte karty dające krupierowi Blackjacka
+            (gdy wiadomo, że gra trwa, więc krupier go nie ma).
+
+    Returns:
+        Tuple[float, ...]: Prawdopodobieństwa wyników 0-21 oraz bust (indeks 22).
+    """
+    return _distribution(hard_value(upcard), tuple(composition), exclude_blackjack)
+
+
+def dealer_outcome_distribution(upcard: Card, composition: Optional[Composition] = None,
+                                exclude_blackjack: bool = False
+                                ) -> Dict[Union[int, str], float]:
+    """
+    Zwraca dokładny rozkład końcowego wyniku krupiera.
+
+    Wyniki poniżej 17 pojawiają się tylko wtedy, gdy w talii zabraknie kart.
+
+    Args:
+        upcard: Odkryta karta krupiera.
+        composition: Skład talii, z której pochodzi zakryta karta i kolejne karty
+            (domyślnie pełna talia bez odkrytej karty).
+        exclude_blackjack: Czy pominąć zakryte karty dające krupierowi Blackjacka.
+
+    Returns:
+        Dict: Prawdopodobieństwa wyników 17-21 oraz klucza ``"bust"``.
+    """
+    if composition is None:
+        composition = remove_card(FULL_DECK, upcard)
+    vector = dealer_outcome_vector(upcard, composition, exclude_blackjack)
+    distribution: Dict[Union[int, str], float] = {
+        score: vector[score] for score in range(DEALER_STAND_VALUE, 22)
+    }
+    for score in range(DEALER_STAND_VALUE):
+        if vector[score]:
+            distribution[score] = vector[score]
+    distribution[BUST] = vector[_BUST_INDEX]
+    return distribution
+
+
+def clear_cache() -> None:
+    """Czyści pamięć podręczną obliczeń."""
+    _dealer_draw.cache_clear()
+    _distribution.cache_clear()
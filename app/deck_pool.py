@@ -0,0 +1,129 @@
+"""
+Pula potasowanych sabotów.
+
+Tasowanie i kodowanie nowego sabotu odbywa się w wątku w tle, a nie
+w trakcie obsługi żądania ``POST /games/``. ``crud.create_shoe`` pobiera
+z puli ziarno i gotową kolejność kart, a gdy pula jest pusta - tasuje
+sabot samodzielnie.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from . import config
+from .game_logic import Shoe
+
+
+class DeckPool:
+    """
+    Ograniczona pula potasowanych i zakodowanych sabotów.
+
+    Attributes:
+        num_decks: Liczba talii w sabotach z puli.
+        capacity: Maksymalna liczba sabotów w puli.
+    """
+
+    def __init__(self, num_decks: int, capacity: int) -> None:
+        """
+        Inicjalizuje pustą pulę.
+
+        Args:
+            num_decks: Liczba talii w sabotach z puli.
+            capacity: Maksymalna liczba sabotów w puli.
+        """
+        self.num_decks = num_decks
+        self.capacity = capacity
+        self._queue: "queue.Queue[Tuple[int, bytes]]" = queue.Queue(maxsize=capacity)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._produced = 0
+        self._taken = 0
+        self._misses = 0
+        self._busy_seconds = 0.0
+
+    def _produce(self) -> Tuple[int, bytes]:
+        """Tasuje nowy sabot i zwraca jego ziarno oraz kolejność kart."""
+        started = time.perf_counter()
+        shoe = Shoe(self.num_decks)
+        shoe.shuffle()
+        with self._lock:
+            self._produced += 1
+            self._busy_seconds += time.perf_counter() - started
+        return shoe.seed, shoe.order
+
+    def take(self) -> Optional[Tuple[int, bytes]]:
+        """
+        Pobiera potasowany sabot z puli.
+
+        Returns:
+            Tuple[int, bytes]: Ziarno i kolejność kart lub None jeśli pula jest pusta.
+        """
+        try:
+            shuffled = self._queue.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._taken += 1
+        return shuffled
+
+    def fill(self) -> None:
+        """Wypełnia pulę do pełna w bieżącym wątku."""
+        while not self._queue.full():
+            try:
+                self._queue.put_nowait(self._produce())
+            except queue.Full:
+                break
+
+    def _run(self) -> None:
+        """Pętla wątku uzupełniającego pulę."""
+        while not self._stop.is_set():
+            shuffled = self._produce()
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(shuffled, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def start(self) -> None:
+        """Uruchamia wątek uzupełniający pulę."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="deck-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Zatrzymuje wątek uzupełniający pulę."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Zwraca statystyki puli.
+
+        Returns:
+            Dict: Głębokość i pojemność puli, liczba sabotów potasowanych,
+            pobranych i brakujących (tasowanych w żądaniu) oraz szybkość
+            uzupełniania (sabotów na sekundę pracy wątku).
+        """
+        with self._lock:
+            refill_rate = self._produced / self._busy_seconds if self._busy_seconds else 0.0
+            return {
+                "depth": self._queue.qsize(),
+                "capacity": self.capacity,
+                "produced": self._produced,
+                "taken": self._taken,
+                "misses": self._misses,
+                "refill_rate": round(refill_rate, 1)
+            }
+
+
+deck_pool = DeckPool(config.SHOE_DECKS, config.DECK_POOL_SIZE)
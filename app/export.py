@@ -0,0 +1,109 @@
+"""
+Strumieniowy eksport historii gier (NDJSON lub CSV).
+
+Wiersze są czytane z bazy partiami i od razu serializowane do porcji
+tekstu wysyłanych przez ``StreamingResponse`` - pamięć nie rośnie
+z liczbą eksportowanych gier.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy.engine import Row
+
+from . import crud
+from .database import session_scope
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+CHUNK_ROWS: int = 500
+
+
+def _row_to_dict(row: Row) -> dict:
+    """Zamienia wiersz na słownik z datami w formacie ISO."""
+    data = row._asdict()
+    for column in ("created_at", "finished_at"):
+        if data[column] is not None:
+            data[column] = data[column].isoformat()
+    return data
+
+
+def iter_ndjson(rows: Iterable[Row]) -> Iterator[str]:
+    """
+    Serializuje wiersze do NDJSON (jeden obiekt JSON na linię).
+
+    Args:
+        rows: Wiersze gier.
+
+    Yields:
+        str: Porcje tekstu po ``CHUNK_ROWS`` linii.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(_row_to_dict(row), separators=(",", ":")))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(rows: Iterable[Row]) -> Iterator[str]:
+    """
+    Serializuje wiersze do CSV z nagłówkiem. Karty zapisywane są jako JSON.
+
+    Args:
+        rows: Wiersze gier.
+
+    Yields:
+        str: Porcje tekstu po ``CHUNK_ROWS`` wierszy.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(crud.EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        data = _row_to_dict(row)
+        for column in ("player_hand", "dealer_hand"):
+            data[column] = json.dumps(data[column], separators=(",", ":"))
+        writer.writerow(data[column] for column in crud.EXPORT_COLUMNS)
+        count += 1
+        if count >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_games(fmt: str, status: Optional[str] = None,
+                 player_id: Optional[int] = None,
+                 since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Strumieniuje eksport gier we własnej sesji bazy danych.
+
+    Sesja żądania jest zamykana przed wysłaniem odpowiedzi, dlatego
+    generator otwiera własną i trzyma ją do końca eksportu.
+
+    Args:
+        fmt: Format eksportu ('ndjson' lub 'csv').
+        status: Filtr statusu gry.
+        player_id: Filtr ID gracza.
+        since: Początek zakresu daty utworzenia (włącznie).
+        until: Koniec zakresu daty utworzenia (wyłącznie).
+
+    Yields:
+        str: Kolejne porcje eksportu.
+    """
+    serialize = iter_csv if fmt == "csv" else iter_ndjson
+    with session_scope() as db:
+        rows = crud.iter_games_for_export(db, status, player_id, since, until)
+        yield from serialize(rows)
@@ -0,0 +1,323 @@
+"""
+Dziennik zdarzeń gier (event sourcing) z okresowymi migawkami.
+
+Każda akcja gry jest dopisywana do tabeli ``game_events`` zamiast
+nadpisywania rąk w wierszu gry. Zdarzenie przechowuje karty dobrane
+w jego trakcie, więc stan gry można odtworzyć, przepuszczając zdarzenia
+przez ``BlackjackGame`` z talią podającą zapisane karty.
+
+Wiersz gry przechowuje migawkę stanu po zdarzeniu ``snapshot_seq``
+(odświeżaną co ``config.GAME_SNAPSHOT_INTERVAL`` zdarzeń i przy
+rozliczeniu), więc odtworzenie wymaga tylko zdarzeń po migawce.
+
+Zdarzenia zapisują też pozycję sabotu, od której dobrano ich karty.
+Sabot jest tasowany deterministycznie z ziarna, więc całą grę opisuje
+zwięzły kod odtworzenia: ziarno, liczba talii i para (akcja, pozycja)
+na zdarzenie - kilkanaście bajtów zamiast pełnej kolejności kart.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+from .game_logic import SHUFFLE_VERSION, BlackjackGame, Card, Deck, Hand, Shoe
+
+CREATED: str = "created"
+HIT: str = "hit"
+STAND: str = "stand"
+SETTLED: str = "settled"
+
+# Wersja kodu odtworzenia wyznacza algorytm tasowania sabotu z ziarna.
+REPLAY_VERSION: str = f"v{SHUFFLE_VERSION}"
+_REPLAY_ACTIONS: Dict[str, str] = {CREATED: "c", HIT: "h", STAND: "s"}
+_REPLAY_TYPES: Dict[str, str] = {code: name for name, code in _REPLAY_ACTIONS.items()}
+
+
+def make_event(game_id: int, seq: int, event_type: str,
+               cards: Iterable[Card] = (), detail: Optional[str] = None,
+               position: Optional[int] = None) -> Dict:
+    """
+    Tworzy zdarzenie do zapisu w ``game_events``.
+
+    Args:
+        game_id: ID gry.
+        seq: Numer kolejny zdarzenia.
+        event_type: Rodzaj zdarzenia.
+        cards: Karty dobrane w zdarzeniu (w kolejności dobierania).
+        detail: Dodatkowe dane zdarzenia.
+        position: Pozycja sabotu, od której dobrano karty zdarzenia.
+
+    Returns:
+        Dict: Wartości kolumn zdarzenia.
+    """
+    return {
+        "game_id": game_id,
+        "seq": seq,
+        "type": event_type,
+        "cards": bytes(card.index for card in cards),
+        "detail": detail,
+        "position": position
+    }
+
+
+def action_event(game: BlackjackGame, game_id: int, seq: int, action: str,
+                 player_cards: int, dealer_cards: int,
+                 position: Optional[int] = None) -> Dict:
+    """
+    Tworzy zdarzenie akcji gracza na podstawie kart dobranych w jej trakcie.
+
+    Args:
+        game: Stan gry po akcji.
+        game_id: ID gry.
+        seq: Numer kolejny zdarzenia.
+        action: Wykonana akcja ('hit' lub 'stand').
+        player_cards: Liczba kart gracza przed akcją.
+        dealer_cards: Liczba kart krupiera przed akcją.
+        position: Pozycja sabotu przed akcją (None dla talii gry).
+
+    Returns:
+        Dict: Wartości kolumn zdarzenia.
+    """
+    drawn = (game.player_hand.cards[player_cards:] +
+             game.dealer_hand.cards[dealer_cards:])
+    return make_event(game_id, seq, action, drawn, position=position)
+
+
+def created_event(game: BlackjackGame, game_id: int,
+                  position: Optional[int] = None) -> Dict:
+    """
+    Tworzy zdarzenie rozdania początkowego (karty w kolejności rozdawania).
+
+    Args:
+        game: Stan gry po rozdaniu.
+        game_id: ID gry.
+        position: Pozycja sabotu przed rozdaniem.
+
+    Returns:
+        Dict: Wartości kolumn zdarzenia.
+    """
+    return make_event(game_id, 1, CREATED,
+                      game.player_hand.cards[:2] + game.dealer_hand.cards[:2],
+                      position=position)
+
+
+def append(db: Session, events: Sequence[Dict]) -> None:
+    """
+    Dopisuje zdarzenia do dziennika jednym poleceniem INSERT.
+
+    Zdarzenie już zapisane (ta sama para ``game_id``, ``seq``) jest
+    pomijane - zdarzenia są niezmienne, więc zapis w tle i rozliczenie
+    mogą bezpiecznie zapisać to samo zdarzenie bez wzajemnego czekania.
+
+    Args:
+        db: Sesja bazy danych.
+        events: Zdarzenia utworzone przez ``make_event``.
+    """
+    if events:
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = insert(models.GameEvent).on_conflict_do_nothing(
+            index_elements=["game_id", "seq"]
+        )
+        db.execute(statement, list(events))
+
+
+def last_seq(db: Session, game_id: int) -> int:
+    """
+    Zwraca numer ostatniego zdarzenia gry.
+
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+
+    Returns:
+        int: Numer ostatniego zdarzenia lub 0, jeśli gra nie ma zdarzeń.
+    """
+    return db.scalar(
+        select(func.coalesce(func.max(models.GameEvent.seq), 0))
+        .where(models.GameEvent.game_id == game_id)
+    )
+
+
+def get_events(db: Session, game_id: int, after_seq: int = 0) -> List[models.GameEvent]:
+    """
+    Pobiera zdarzenia gry w kolejności.
+
+    Args:
+        db: Sesja bazy danych.
+        game_id: ID gry.
+        after_seq: Pomija zdarzenia o numerach nie większych niż podany.
+
+    Returns:
+        List[GameEvent]: Zdarzenia gry.
+    """
+    return db.query(models.GameEvent).filter(
+        models.GameEvent.game_id == game_id,
+        models.GameEvent.seq > after_seq
+    ).order_by(models.GameEvent.seq).all()
+
+
+class ReplayDeck(Deck):
+    """
+    Talia podająca zapisane karty w kolejności ich dobierania.
+    """
+
+    def __init__(self, cards: Iterable[Card]) -> None:
+        """
+        Inicjalizuje talię.
+
+        Args:
+            cards: Karty w kolejności dobierania.
+        """
+        self.cards = list(cards)
+        self.cards.reverse()
+
+    def __bool__(self) -> bool:
+        """Talia odtwarzania jest zawsze używana, nawet gdy jest pusta."""
+        return True
+
+
+def replay(events: Iterable[models.GameEvent], player_hand: Optional[Hand] = None,
+           dealer_hand: Optional[Hand] = None) -> BlackjackGame:
+    """
+    Odtwarza stan gry ze zdarzeń.
+
+    Args:
+        events: Zdarzenia w kolejności (od początku gry lub po migawce).
+        player_hand: Ręka gracza z migawki.
+        dealer_hand: Ręka krupiera z migawki.
+
+    Returns:
+        BlackjackGame: Odtworzona gra.
+
+    Raises:
+        ValueError: Jeśli zdarzenia nie są spójne z przebiegiem gry.
+    """
+    events = list(events)
+    deck = ReplayDeck(Card.from_index(index) for event in events for index in event.cards)
+    game = BlackjackGame(deck=deck, player_hand=player_hand, dealer_hand=dealer_hand)
+    for event in events:
+        if event.type == CREATED:
+            game.deal_initial_cards()
+        elif event.type == HIT:
+            game.player_hit()
+        elif event.type == STAND:
+            game.player_stand()
+        elif event.type != SETTLED:
+            raise ValueError(f"Nieznane zdarzenie: {event.type}")
+    if deck.cards:
+        raise ValueError("Zdarzenia gry są niespójne - pozostały niedobrane karty")
+    return game
+
+
+def load_hands(db: Session, db_game: models.Game) -> Tuple[Hand, Hand, int]:
+    """
+    Odtwarza ręce gry z migawki w wierszu gry i późniejszych zdarzeń.
+
+    Args:
+        db: Sesja bazy danych.
+        db_game: Wiersz gry.
+
+    Returns:
+        Tuple[Hand, Hand, int]: Ręka gracza, ręka krupiera i numer
+        ostatniego zdarzenia.
+    """
+    snapshot_seq = db_game.snapshot_seq or 0
+    events = get_events(db, db_game.id, snapshot_seq)
+    player_hand = Hand.from_list(db_game.player_hand)
+    dealer_hand = Hand.from_list(db_game.dealer_hand)
+    if not events:
+        return player_hand, dealer_hand, snapshot_seq
+    if snapshot_seq == 0:
+        player_hand, dealer_hand = Hand(), Hand()
+    game = replay(events, player_hand, dealer_hand)
+    return game.player_hand, game.dealer_hand, events[-1].seq
+
+
+def encode_replay(seed: int, num_decks: int, events: Iterable[models.GameEvent]) -> str:
+    """
+    Tworzy zwięzły kod odtworzenia gry.
+
+    Kod ma postać ``v1.<ziarno>.<talie>.<akcje>``, gdzie akcje to litery
+    ``c`` (rozdanie), ``h`` (hit) i ``s`` (stand) z pozycją sabotu,
+    np. ``v1.123.6.c0,h9,s15``. Zdarzenie rozliczenia jest pomijane -
+    wynik wynika z przebiegu gry. Wersja kodu to wersja algorytmu
+    tasowania (``game_logic.SHUFFLE_VERSION``), więc kod pozostaje
+    odtwarzalny niezależnie od wersji Pythona.
+
+    Args:
+        seed: Ziarno tasowania sabotu.
+        num_decks: Liczba talii w sabocie.
+        events: Zdarzenia gry od początku.
+
+    Returns:
+        str: Kod odtworzenia.
+
+    Raises:
+        ValueError: Jeśli zdarzenie nie ma zapisanej pozycji sabotu.
+    """
+    actions = []
+    for event in events:
+        if event.type == SETTLED:
+            continue
+        if event.position is None or event.type not in _REPLAY_ACTIONS:
+            raise ValueError("Gry nie można opisać kodem odtworzenia")
+        actions.append(f"{_REPLAY_ACTIONS[event.type]}{event.position}")
+    return ".".join((REPLAY_VERSION, str(seed), str(num_decks), ",".join(actions)))
+
+
+def decode_replay(code: str) -> Tuple[int, int, List[Tuple[str, int]]]:
+    """
+    Odczytuje kod odtworzenia gry.
+
+    Args:
+        code: Kod utworzony przez ``encode_replay``.
+
+    Returns:
+        Tuple[int, int, List[Tuple[str, int]]]: Ziarno, liczba talii
+        i lista par (rodzaj zdarzenia, pozycja sabotu).
+
+    Raises:
+        ValueError: Jeśli kod jest nieprawidłowy.
+    """
+    try:
+        version, seed, num_decks, actions = code.split(".")
+        if version != REPLAY_VERSION:
+            raise ValueError
+        steps = [(_REPLAY_TYPES[action[0]], int(action[1:]))
+                 for action in actions.split(",") if action]
+        return int(seed), int(num_decks), steps
+    except (KeyError, ValueError):
+        raise ValueError(f"Nieprawidłowy kod odtworzenia: {code}") from None
+
+
+def replay_code(code: str, shoe: Optional[Shoe] = None) -> BlackjackGame:
+    """
+    Odtwarza grę z kodu odtworzenia.
+
+    Args:
+        code: Kod utworzony przez ``encode_replay``.
+        shoe: Sabot potasowany z ziarna kodu (pozwala pominąć ponowne
+            tasowanie przy sprawdzaniu wielu gier z jednego sabotu).
+
+    Returns:
+        BlackjackGame: Odtworzona gra.
+
+    Raises:
+        ValueError: Jeśli kod jest nieprawidłowy.
+    """
+    seed, num_decks, steps = decode_replay(code)
+    if shoe is None or shoe.seed != seed or shoe.num_decks != num_decks:
+        shoe = Shoe.from_seed(seed, 0, num_decks)
+    game = BlackjackGame(deck=shoe)
+    for event_type, position in steps:
+        shoe.position = position
+        if event_type == CREATED:
+            game.deal_initial_cards()
+        elif event_type == HIT:
+            game.player_hit()
+        else:
+            game.player_stand()
+    return game
@@ -4,47 +4,85 @@ Logika gry Blackjack.
 Zawiera implementację talii kart, obliczanie punktów oraz mechanikę gry.
 """
 
-import random
-from typing import List, Dict, Optional
-from dataclasses import dataclass, field
+import secrets
+from typing import Iterator, List, Dict, MutableSequence, Optional, Tuple
+
+
+SUITS: Tuple[str, ...] = ("hearts", "diamonds", "clubs", "spades")
+RANKS: Tuple[str, ...] = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A")
+
+RANK_VALUES: Dict[str, int] = {
+    "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "10": 10,
+    "J": 10, "Q": 10, "K": 10, "A": 11
+}
+
+SUIT_SYMBOLS: Dict[str, str] = {
+    "hearts": "♥",
+    "diamonds": "♦",
+    "clubs": "♣",
+    "spades": "♠"
+}
 
 
-@dataclass
 class Card:
     """
     Reprezentacja pojedynczej karty do gry.
     
+    Karty są niezmienne i internowane: istnieje dokładnie 52 instancji,
+    tworzonych raz przy imporcie modułu. ``Card(suit, rank)`` oraz
+    ``Card.from_dict`` zwracają gotową instancję z rejestru zamiast
+    budować nowy obiekt. Każda karta ma też indeks 0-51 (``index``),
+    pozwalający zapisać ją jako pojedynczą liczbę.
+    
     Attributes:
         suit: Kolor karty.
         rank: Ranga karty (2-10, J, Q, K, A).
+        value: Wartość punktowa (As = 11, figury = 10, reszta = wartość nominalna).
+        index: Indeks karty w pełnej talii (0-51).
     """
-    suit: str
-    rank: str
     
-    RANK_VALUES: Dict[str, int] = field(default_factory=lambda: {
-        "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "10": 10,
-        "J": 10, "Q": 10, "K": 10, "A": 11
-    }, repr=False)
+    __slots__ = ("suit", "rank", "value", "index")
     
-    def __post_init__(self) -> None:
-        """Walidacja karty po utworzeniu."""
-        valid_suits = {"hearts", "diamonds", "clubs", "spades"}
-        valid_ranks = {"2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"}
-        
-        if self.suit not in valid_suits:
-            raise ValueError(f"Nieprawidłowy kolor karty: {self.suit}")
-        if self.rank not in valid_ranks:
-            raise ValueError(f"Nieprawidłowa ranga karty: {self.rank}")
+    RANK_VALUES: Dict[str, int] = RANK_VALUES
     
-    @property
-    def value(self) -> int:
+    _registry: Dict[Tuple[str, str], "Card"] = {}
+    
+    def __new__(cls, suit: str, rank: str) -> "Card":
         """
-        Zwraca wartość punktową karty.
+        Zwraca internowaną instancję karty.
         
-        Returns:
-            int: Wartość punktowa (As = 11, figury = 10, reszta = wartość nominalna).
+        Raises:
+            ValueError: Jeśli kolor lub ranga są nieprawidłowe.
         """
-        return self.RANK_VALUES[self.rank]
+        try:
+            return cls._registry[(suit, rank)]
+        except (KeyError, TypeError):
+            pass
+        
+        if suit not in SUITS:
+            raise ValueError(f"Nieprawidłowy kolor karty: {suit}")
+        if rank not in RANKS:
+            raise ValueError(f"Nieprawidłowa ranga karty: {rank}")
+        
+        card = object.__new__(cls)
+        object.__setattr__(card, "suit", suit)
+        object.__setattr__(card, "rank", rank)
+        object.__setattr__(card, "value", RANK_VALUES[rank])
+        object.__setattr__(card, "index", SUITS.index(suit) * len(RANKS) + RANKS.index(rank))
+        cls._registry[(suit, rank)] = card
+        return card
+    
+    def __setattr__(self, name: str, value: object) -> None:
+        """Karty są niezmienne."""
+        raise AttributeError("Karta jest niezmienna")
+    
+    def __delattr__(self, name: str) -> None:
+        """Karty są niezmienne."""
+        raise AttributeError("Karta jest niezmienna")
+    
+    def __reduce__(self) -> Tuple[type, Tuple[str, str]]:
+        """Zachowuje internowanie przy kopiowaniu i serializacji pickle."""
+        return (Card, (self.suit, self.rank))
     
     def to_dict(self) -> Dict[str, any]:
         """
@@ -68,19 +106,117 @@ class Card:
             data: Słownik z kluczami 'suit' i 'rank'.
             
         Returns:
-            Card: Nowa instancja karty.
+            Card: Internowana instancja karty.
+        """
+        return cls(data["suit"], data["rank"])
+    
+    @staticmethod
+    def from_index(index: int) -> "Card":
+        """
+        Zwraca kartę o podanym indeksie (0-51).
+        
+        Args:
+            index: Indeks karty w pełnej talii.
+            
+        Returns:
+            Card: Internowana instancja karty.
         """
-        return cls(suit=data["suit"], rank=data["rank"])
+        return CARDS[index]
+    
+    def __repr__(self) -> str:
+        """Reprezentacja karty do debugowania."""
+        return f"Card(suit={self.suit!r}, rank={self.rank!r})"
     
     def __str__(self) -> str:
         """Tekstowa reprezentacja karty."""
-        suit_symbols = {
-            "hearts": "♥",
-            "diamonds": "♦",
-            "clubs": "♣",
-            "spades": "♠"
-        }
-        return f"{self.rank}{suit_symbols.get(self.suit, self.suit)}"
+        return f"{self.rank}{SUIT_SYMBOLS.get(self.suit, self.suit)}"
+
+
+def best_score(hard_total: int, aces: int) -> int:
+    """
+    Oblicza najlepszy wynik ręki z sumy "twardej" i liczby asów.
+    
+    Co najwyżej jeden as może liczyć się jako 11, więc wystarczy
+    sprawdzić, czy dodanie 10 nie przekroczy 21.
+    
+    Args:
+        hard_total: Suma kart z asami liczonymi jako 1.
+        aces: Liczba asów na ręce.
+        
+    Returns:
+        int: Wynik punktowy.
+    """
+    if aces and hard_total + 10 <= 21:
+        return hard_total + 10
+    return hard_total
+
+
+# Wszystkie 52 karty w kolejności indeksów (kolor, potem ranga).
+CARDS: Tuple[Card, ...] = tuple(Card(suit, rank) for suit in SUITS for rank in RANKS)
+
+
+def new_seed() -> int:
+    """
+    Losuje ziarno tasowania.
+    
+    Returns:
+        int: Losowe 63-bitowe ziarno (mieści się w kolumnie INTEGER bazy).
+    """
+    return secrets.randbits(63)
+
+
+# Wersja algorytmu tasowania (SplitMix64 + Fisher-Yates). Kolejność kart
+# dla danego ziarna jest częścią formatu kodu odtworzenia, więc każda
+# zmiana algorytmu wymaga podniesienia wersji.
+SHUFFLE_VERSION: int = 1
+
+_MASK64: int = (1 << 64) - 1
+
+
+def splitmix64(seed: int) -> Iterator[int]:
+    """
+    Generator liczb pseudolosowych SplitMix64 (Steele, Lea, Flood 2014).
+    
+    Wynik zależy wyłącznie od ziarna - w przeciwieństwie do modułu
+    ``random`` nie zmienia się między wersjami Pythona.
+    
+    Args:
+        seed: Ziarno (brane modulo 2**64).
+        
+    Yields:
+        int: Kolejne liczby 64-bitowe.
+    """
+    state = seed & _MASK64
+    while True:
+        state = (state + 0x9E3779B97F4A7C15) & _MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        yield z ^ (z >> 31)
+
+
+def seeded_shuffle(items: MutableSequence, seed: int) -> None:
+    """
+    Tasuje sekwencję w miejscu algorytmem Fishera-Yatesa.
+    
+    Dla i = n-1, ..., 1 zamienia element i z elementem j = x mod (i+1),
+    gdzie x to kolejna liczba ``splitmix64(seed)``. Liczby z niepełnego
+    ostatniego przedziału (x >= 2**64 - 2**64 mod (i+1)) są odrzucane,
+    więc każda permutacja jest jednakowo prawdopodobna.
+    
+    Args:
+        items: Sekwencja do potasowania.
+        seed: Ziarno tasowania.
+    """
+    numbers = splitmix64(seed)
+    for i in range(len(items) - 1, 0, -1):
+        bound = i + 1
+        limit = _MASK64 + 1 - (_MASK64 + 1) % bound
+        x = next(numbers)
+        while x >= limit:
+            x = next(numbers)
+        j = x % bound
+        items[i], items[j] = items[j], items[i]
 
 
 class Deck:
@@ -91,10 +227,12 @@ class Deck:
     
     Attributes:
         cards: Lista kart w talii.
+        seed: Ziarno ostatniego tasowania (None dla talii nietasowanej).
     """
     
-    SUITS: List[str] = ["hearts", "diamonds", "clubs", "spades"]
-    RANKS: List[str] = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+    SUITS: List[str] = list(SUITS)
+    RANKS: List[str] = list(RANKS)
+    seed: Optional[int] = None
     
     def __init__(self) -> None:
         """Inicjalizuje talię kart."""
@@ -103,14 +241,18 @@ class Deck:
     
     def _create_deck(self) -> None:
         """Tworzy pełną talię kart."""
-        self.cards = []
-        for suit in self.SUITS:
-            for rank in self.RANKS:
-                self.cards.append(Card(suit, rank))
+        self.cards = list(CARDS)
     
-    def shuffle(self) -> None:
-        """Tasuje talię kart."""
-        random.shuffle(self.cards)
+    def shuffle(self, seed: Optional[int] = None) -> None:
+        """
+        Tasuje talię kart (``seeded_shuffle``).
+        
+        Args:
+            seed: Ziarno tasowania (domyślnie losowe). To samo ziarno
+                daje zawsze tę samą kolejność kart.
+        """
+        self.seed = new_seed() if seed is None else seed
+        seeded_shuffle(self.cards, self.seed)
     
     def draw(self) -> Optional[Card]:
         """
@@ -152,11 +294,169 @@ class Deck:
         return len(self.cards)
 
 
+class Shoe(Deck):
+    """
+    Sabot - kilka talii potasowanych razem, z kartą odcięcia.
+    
+    Sabot jest używany przez kolejne gry gracza. Kolejność kart jest
+    ustalana raz przy tasowaniu i zapisywana zwięźle jako bajty (jeden
+    bajt - indeks karty 0-51 - na kartę); dobieranie przesuwa jedynie
+    kursor ``position``. Gdy liczba pozostałych kart spadnie do pozycji
+    karty odcięcia, sabot należy zastąpić nowym.
+    
+    Attributes:
+        order: Kolejność kart w sabocie (indeksy kart jako bajty).
+        position: Indeks następnej karty do dobrania.
+        num_decks: Liczba talii.
+        cut_card: Liczba kart pozostałych w sabocie w chwili dojścia do karty odcięcia.
+    """
+    
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75) -> None:
+        """
+        Inicjalizuje sabot.
+        
+        Args:
+            num_decks: Liczba talii.
+            penetration: Część sabotu rozdawana przed kartą odcięcia (0-1).
+            
+        Raises:
+            ValueError: Jeśli parametry są nieprawidłowe.
+        """
+        if num_decks < 1:
+            raise ValueError(f"Nieprawidłowa liczba talii: {num_decks}")
+        if not 0 < penetration < 1:
+            raise ValueError(f"Nieprawidłowa penetracja sabotu: {penetration}")
+        
+        self.num_decks = num_decks
+        self.order: bytes = bytes(range(len(CARDS))) * num_decks
+        self.position: int = 0
+        self.cut_card = len(self.order) - int(len(self.order) * penetration)
+    
+    @property
+    def cards(self) -> List[Card]:
+        """Karty pozostałe w sabocie, w kolejności dobierania."""
+        return [CARDS[index] for index in self.order[self.position:]]
+    
+    def shuffle(self, seed: Optional[int] = None) -> None:
+        """
+        Tasuje cały sabot i ustawia kursor na początek.
+        
+        Kolejność kart zależy wyłącznie od ziarna, liczby talii
+        i ``SHUFFLE_VERSION``, więc sabot można odtworzyć z ``seed`` bez
+        zapisywania ``order``.
+        
+        Args:
+            seed: Ziarno tasowania (domyślnie losowe).
+        """
+        self.seed = new_seed() if seed is None else seed
+        order = bytearray(range(len(CARDS))) * self.num_decks
+        seeded_shuffle(order, self.seed)
+        self.order = bytes(order)
+        self.position = 0
+    
+    def draw(self) -> Optional[Card]:
+        """
+        Dobiera kolejną kartę z sabotu.
+        
+        Returns:
+            Card: Dobrana karta lub None jeśli sabot pusty.
+        """
+        if self.position >= len(self.order):
+            return None
+        card = CARDS[self.order[self.position]]
+        self.position += 1
+        return card
+    
+    def needs_shuffle(self) -> bool:
+        """
+        Sprawdza czy rozdawanie doszło do karty odcięcia.
+        
+        Returns:
+            bool: True jeśli sabot należy potasować od nowa.
+        """
+        return len(self) <= self.cut_card
+    
+    def to_list(self) -> List[Dict[str, any]]:
+        """
+        Konwertuje pozostałe karty sabotu do listy słowników.
+        
+        Returns:
+            List[Dict]: Lista kart jako słowniki.
+        """
+        return [CARDS[index].to_dict() for index in self.order[self.position:]]
+    
+    @classmethod
+    def from_seed(cls, seed: int, position: int = 0, num_decks: int = 1,
+                  cut_card: int = 0) -> "Shoe":
+        """
+        Odtwarza sabot z ziarna tasowania i kursora.
+        
+        Args:
+            seed: Ziarno tasowania.
+            position: Indeks następnej karty do dobrania.
+            num_decks: Liczba talii w sabocie.
+            cut_card: Pozycja karty odcięcia.
+            
+        Returns:
+            Shoe: Odtworzony sabot.
+        """
+        shoe = cls.from_bytes(b"", 0, num_decks, cut_card)
+        shoe.shuffle(seed)
+        shoe.position = position
+        return shoe
+    
+    @classmethod
+    def from_bytes(cls, order: bytes, position: int = 0, num_decks: int = 1,
+                   cut_card: int = 0) -> "Shoe":
+        """
+        Odtwarza sabot z zapisanej kolejności kart i kursora.
+        
+        Args:
+            order: Kolejność kart (indeksy kart jako bajty).
+            position: Indeks następnej karty do dobrania.
+            num_decks: Liczba talii w sabocie.
+            cut_card: Pozycja karty odcięcia.
+            
+        Returns:
+            Shoe: Odtworzony sabot.
+        """
+        shoe = cls.__new__(cls)
+        shoe.order = bytes(order)
+        shoe.position = position
+        shoe.num_decks = num_decks
+        shoe.cut_card = cut_card
+        return shoe
+    
+    @classmethod
+    def from_list(cls, cards_data: List[Dict[str, any]], num_decks: int = 1,
+                  cut_card: int = 0) -> "Shoe":
+        """
+        Tworzy sabot z listy słowników (w kolejności dobierania).
+        
+        Args:
+            cards_data: Lista słowników z danymi kart.
+            num_decks: Liczba talii w sabocie.
+            cut_card: Pozycja karty odcięcia.
+            
+        Returns:
+            Shoe: Sabot z podanymi kartami.
+        """
+        order = bytes(Card.from_dict(card).index for card in cards_data)
+        return cls.from_bytes(order, 0, num_decks, cut_card)
+    
+    def __len__(self) -> int:
+        """Zwraca liczbę kart pozostałych w sabocie."""
+        return len(self.order) - self.position
+
+
 class Hand:
     """
     Ręka gracza - zbiór kart.
     
-    Zarządza kartami gracza i oblicza wynik punktowy.
+    Zarządza kartami gracza i oblicza wynik punktowy. Suma "twarda"
+    (asy liczone jako 1) oraz liczba asów są aktualizowane przy każdym
+    ``add_card``, więc wynik, bust i Blackjack sprawdzane są w czasie stałym.
+    Karty należy dodawać przez ``add_card``, a nie bezpośrednio do ``cards``.
     
     Attributes:
         cards: Lista kart na ręce.
@@ -169,7 +469,12 @@ class Hand:
         Args:
             cards: Opcjonalna lista początkowych kart.
         """
-        self.cards: List[Card] = cards if cards else []
+        self.cards: List[Card] = []
+        self._hard_total: int = 0
+        self._aces: int = 0
+        self._score: int = 0
+        for card in cards or ():
+            self.add_card(card)
     
     def add_card(self, card: Card) -> None:
         """
@@ -179,10 +484,16 @@ class Hand:
             card: Karta do dodania.
         """
         self.cards.append(card)
+        if card.rank == "A":
+            self._aces += 1
+            self._hard_total += 1
+        else:
+            self._hard_total += card.value
+        self._score = best_score(self._hard_total, self._aces)
     
     def calculate_score(self) -> int:
         """
-        Oblicza wynik punktowy ręki.
+        Zwraca wynik punktowy ręki.
         
         Automatycznie dostosowuje wartość asów (11 lub 1)
         aby uzyskać najlepszy wynik bez przekroczenia 21.
@@ -190,14 +501,16 @@ class Hand:
         Returns:
             int: Wynik punktowy.
         """
-        score = sum(card.value for card in self.cards)
-        aces = sum(1 for card in self.cards if card.rank == "A")
-        
-        while score > 21 and aces > 0:
-            score -= 10
-            aces -= 1
+        return self._score
+    
+    def is_soft(self) -> bool:
+        """
+        Sprawdza czy ręka jest "miękka" (jeden z asów liczony jako 11).
         
-        return score
+        Returns:
+            bool: True jeśli ręka jest miękka.
+        """
+        return self._score != self._hard_total
     
     def is_blackjack(self) -> bool:
         """
@@ -206,7 +519,7 @@ class Hand:
         Returns:
             bool: True jeśli Blackjack.
         """
-        return len(self.cards) == 2 and self.calculate_score() == 21
+        return len(self.cards) == 2 and self._score == 21
     
     def is_bust(self) -> bool:
         """
@@ -215,7 +528,7 @@ class Hand:
         Returns:
             bool: True jeśli bust (powyżej 21).
         """
-        return self.calculate_score() > 21
+        return self._score > 21
     
     def to_list(self) -> List[Dict[str, any]]:
         """
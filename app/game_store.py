@@ -0,0 +1,496 @@
+"""
+Magazyn trwających gier w pamięci (write-behind).
+
+Gry w statusie IN_PROGRESS (rozdawane z sabotu) są trzymane w pamięci
+procesu jako obiekty ``BlackjackGame`` razem ze współdzielonymi sabotami
+gracza. Akcje hit/stand są obsługiwane w pamięci, bez odczytu wiersza
+gry. Zdarzenia akcji (``app.game_events``) są dopisywane do bazy przez
+wątek w tle co najwyżej ``config.GAME_STORE_FLUSH_INTERVAL`` sekund
+później, a migawka stanu w wierszu gry jest odświeżana co
+``config.GAME_SNAPSHOT_INTERVAL`` zdarzeń. Synchronicznie zapisywane
+jest tylko rozliczenie zakończonej gry.
+
+Po awarii procesu niezapisane akcje (z ostatniego interwału) przepadają,
+a ``recover`` wczytuje trwające gry z bazy. Magazyn działa w obrębie
+jednego procesu - aplikacja musi być uruchomiona z jednym workerem.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event
+from sqlalchemy.orm import Session
+
+from . import config, game_events, models, schemas
+from .database import SessionLocal, run_in_transaction, session_scope
+from .game_logic import BlackjackGame, Shoe
+
+logger = logging.getLogger(__name__)
+
+_ADD_KEY = "hot_games_add"
+_REMOVE_KEY = "hot_games_remove"
+
+
+def load_shoe(db_shoe: models.Shoe, position: Optional[int] = None,
+              order: Optional[bytes] = None) -> Shoe:
+    """
+    Odtwarza sabot z wiersza bazy - z ziarna lub, dla starszych sabotów,
+    z zapisanej kolejności kart.
+
+    Args:
+        db_shoe: Wiersz sabotu.
+        position: Pozycja kursora (domyślnie zapisana w wierszu).
+        order: Znana już kolejność kart (pomija ponowne tasowanie).
+
+    Returns:
+        Shoe: Sabot.
+    """
+    if position is None:
+        position = db_shoe.position
+    order = order or db_shoe.order
+    if order is None:
+        return Shoe.from_seed(db_shoe.seed, position, db_shoe.num_decks, db_shoe.cut_card)
+    shoe = Shoe.from_bytes(order, position, db_shoe.num_decks, db_shoe.cut_card)
+    shoe.seed = db_shoe.seed
+    return shoe
+
+
+@dataclass
+class HotShoe:
+    """
+    Sabot trwających gier w pamięci.
+
+    Attributes:
+        shoe: Sabot współdzielony przez gry gracza.
+        flushed_position: Pozycja zapisana ostatnio w bazie.
+        refs: Liczba gier w pamięci korzystających z sabotu.
+    """
+    shoe: Shoe
+    flushed_position: int
+    refs: int = 0
+
+
+@dataclass
+class HotGame:
+    """
+    Trwająca gra w pamięci.
+
+    Attributes:
+        game_id: ID gry.
+        player_id: ID gracza.
+        shoe_id: ID sabotu.
+        bet_amount: Kwota zakładu.
+        created_at: Data utworzenia gry.
+        game: Stan gry.
+        seq: Numer ostatniego zdarzenia gry.
+        snapshot_seq: Numer zdarzenia, którego stan zawiera migawka w bazie.
+        events: Zdarzenia jeszcze niezapisane w bazie.
+        closed: Czy gra jest w trakcie rozliczania lub usuwania.
+    """
+    game_id: int
+    player_id: int
+    shoe_id: int
+    bet_amount: int
+    created_at: datetime
+    game: BlackjackGame
+    seq: int = 0
+    snapshot_seq: int = 0
+    events: List[Dict] = field(default_factory=list)
+    closed: bool = False
+
+    def snapshot(self) -> schemas.GameResponse:
+        """
+        Zwraca bieżący stan gry w formacie odpowiedzi API.
+
+        Returns:
+            GameResponse: Stan gry.
+        """
+        return schemas.GameResponse(
+            id=self.game_id,
+            status=models.GameStatus.IN_PROGRESS.value,
+            player_id=self.player_id,
+            bet_amount=self.bet_amount,
+            player_hand=self.game.player_hand.to_list(),
+            dealer_hand=self.game.dealer_hand.to_list(),
+            player_score=self.game.player_hand.calculate_score(),
+            dealer_score=self.game.dealer_hand.calculate_score(),
+            created_at=self.created_at,
+            finished_at=None
+        )
+
+
+class GameStore:
+    """
+    Magazyn trwających gier z zapisem w tle.
+
+    Wszystkie zmiany stanu gier i sabotów odbywają się pod ``lock``.
+
+    Attributes:
+        flush_interval: Odstęp między zapisami w tle (w sekundach).
+        lock: Blokada stanu magazynu.
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        """
+        Inicjalizuje pusty magazyn.
+
+        Args:
+            flush_interval: Odstęp między zapisami w tle (w sekundach).
+        """
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self._games: Dict[int, HotGame] = {}
+        self._shoes: Dict[int, HotShoe] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+        self._flushes = 0
+        self._flushed_rows = 0
+        self._flush_failures = 0
+
+    def get(self, game_id: int) -> Optional[HotGame]:
+        """
+        Zwraca grę z pamięci.
+
+        Args:
+            game_id: ID gry.
+
+        Returns:
+            HotGame: Gra lub None jeśli nie ma jej w pamięci.
+        """
+        return self._games.get(game_id)
+
+    def shoe(self, db_shoe: models.Shoe, order: Optional[bytes] = None) -> Shoe:
+        """
+        Zwraca sabot z pamięci, w razie potrzeby wczytując go z wiersza bazy.
+
+        Pozycja sabotu w pamięci nigdy się nie cofa - jest co najmniej
+        równa pozycji zapisanej w bazie. Sabot z innym ziarnem niż wiersz
+        (ID zwolnione przez wycofaną transakcję i użyte ponownie) jest
+        wczytywany od nowa. Wywołujący musi trzymać ``lock`` przez cały
+        czas dobierania kart.
+
+        Args:
+            db_shoe: Wiersz sabotu.
+            order: Znana już kolejność kart nowego sabotu.
+
+        Returns:
+            Shoe: Sabot współdzielony przez gry gracza.
+        """
+        with self.lock:
+            hot = self._shoes.get(db_shoe.id)
+            if hot is None or hot.shoe.seed != db_shoe.seed:
+                shoe = load_shoe(db_shoe, order=order)
+                hot = self._shoes[db_shoe.id] = HotShoe(shoe, db_shoe.position)
+            elif db_shoe.position > hot.shoe.position:
+                hot.shoe.position = db_shoe.position
+            return hot.shoe
+
+    def shoe_position(self, db_shoe: models.Shoe) -> int:
+        """
+        Zwraca aktualną pozycję sabotu (z pamięci lub z bazy).
+
+        Args:
+            db_shoe: Wiersz sabotu.
+
+        Returns:
+            int: Indeks następnej karty do dobrania.
+        """
+        with self.lock:
+            hot = self._shoes.get(db_shoe.id)
+            return max(db_shoe.position, hot.shoe.position if hot else 0)
+
+    def _add(self, entry: HotGame) -> None:
+        """Dodaje grę do magazynu (wywoływane pod ``lock``)."""
+        if entry.game_id in self._games or entry.shoe_id not in self._shoes:
+            return
+        self._games[entry.game_id] = entry
+        self._shoes[entry.shoe_id].refs += 1
+
+    def _remove(self, game_id: int) -> None:
+        """Usuwa grę z magazynu (wywoływane pod ``lock``)."""
+        entry = self._games.pop(game_id, None)
+        if entry is not None:
+            hot_shoe = self._shoes.get(entry.shoe_id)
+            if hot_shoe is not None:
+                hot_shoe.refs -= 1
+
+    def stage_add(self, db: Session, db_game: models.Game, game: BlackjackGame,
+                  seq: int) -> None:
+        """
+        Dodaje grę do magazynu po zatwierdzeniu bieżącej transakcji.
+
+        Args:
+            db: Sesja bazy danych.
+            db_game: Wiersz gry (po ``flush``) z migawką stanu po zdarzeniu ``seq``.
+            game: Stan gry korzystający z sabotu z ``shoe``.
+            seq: Numer ostatniego zdarzenia gry.
+        """
+        entry = HotGame(
+            game_id=db_game.id,
+            player_id=db_game.player_id,
+            shoe_id=db_game.shoe_id,
+            bet_amount=db_game.bet_amount,
+            created_at=db_game.created_at,
+            game=game,
+            seq=seq,
+            snapshot_seq=seq
+        )
+        db.info.setdefault(_ADD_KEY, []).append(entry)
+
+    def close(self, db: Session, entry: HotGame) -> List[Dict]:
+        """
+        Zamyka grę (rozliczenie lub usunięcie) i zwraca jej niezapisane zdarzenia.
+
+        Gra jest usuwana z magazynu po zatwierdzeniu bieżącej transakcji.
+        Po wycofaniu transakcji zdarzenia wracają do gry, a gra jest
+        ponownie otwierana - nic nie przepada, a ponowione żądanie
+        dokończy rozliczenie.
+
+        Nie czeka na trwający zapis w tle (wywołanie z pętli zdarzeń nie
+        może blokować się na bazie): zwrócone zdarzenia mogą być właśnie
+        zapisywane przez ``flush``, ale zapis zdarzeń pomija już zapisane
+        (``game_events.append``), a ``flush`` usuwa z gry zapisane
+        zdarzenia według numeru, nie pozycji na liście.
+
+        Args:
+            db: Sesja bazy danych.
+            entry: Gra z magazynu.
+
+        Returns:
+            List[Dict]: Zdarzenia do zapisania przez wywołującego.
+
+        Raises:
+            ValueError: Jeśli gra jest już zamykana przez inne żądanie.
+        """
+        with self.lock:
+            if entry.closed:
+                raise ValueError("Gra jest już zakończona")
+            entry.closed = True
+            events, entry.events = entry.events, []
+        db.info.setdefault(_REMOVE_KEY, []).append((entry, events))
+        return list(events)
+
+    def _after_commit(self, session: Session) -> None:
+        """Stosuje zmiany magazynu z zatwierdzonej transakcji (punkty zapisu są pomijane)."""
+        if session.in_nested_transaction():
+            return
+        added = session.info.pop(_ADD_KEY, ())
+        removed = session.info.pop(_REMOVE_KEY, ())
+        if added or removed:
+            with self.lock:
+                for entry in added:
+                    self._add(entry)
+                for entry, _ in removed:
+                    self._remove(entry.game_id)
+
+    def _after_rollback(self, session: Session) -> None:
+        """Odrzuca zmiany magazynu z wycofanej transakcji i otwiera zamknięte gry."""
+        if session.in_nested_transaction():
+            return
+        session.info.pop(_ADD_KEY, None)
+        removed = session.info.pop(_REMOVE_KEY, ())
+        if removed:
+            with self.lock:
+                for entry, events in removed:
+                    entry.events[:0] = events
+                    entry.closed = False
+
+    def _dirty(self) -> Tuple[List[Dict], List[Dict], List[Dict], List[Tuple[int, int, int]]]:
+        """Zbiera niezapisane zmiany gier i sabotów (wywoływane pod ``lock``)."""
+        events = []
+        snapshots = []
+        written = []
+        for entry in self._games.values():
+            if entry.closed or not entry.events:
+                continue
+            events.extend(entry.events)
+            snapshot_seq = entry.snapshot_seq
+            if entry.seq - entry.snapshot_seq >= config.GAME_SNAPSHOT_INTERVAL:
+                snapshot_seq = entry.seq
+                snapshots.append({
+                    "b_id": entry.game_id,
+                    "b_player_hand": entry.game.player_hand.to_list(),
+                    "b_dealer_hand": entry.game.dealer_hand.to_list(),
+                    "b_player_score": entry.game.player_hand.calculate_score(),
+                    "b_dealer_score": entry.game.dealer_hand.calculate_score(),
+                    "b_snapshot_seq": entry.seq
+                })
+            written.append((entry.game_id, entry.events[-1]["seq"], snapshot_seq))
+        shoes = [
+            {"b_id": shoe_id, "b_position": hot.shoe.position}
+            for shoe_id, hot in self._shoes.items()
+            if hot.shoe.position > hot.flushed_position
+        ]
+        return events, snapshots, shoes, written
+
+    def flush(self) -> int:
+        """
+        Zapisuje niezapisane zdarzenia, migawki i pozycje sabotów w jednej transakcji.
+
+        Migawka gry jest zapisywana tylko, jeśli gra nadal trwa, a pozycja
+        sabotu tylko, jeśli jest większa od zapisanej - zapis w tle nie może
+        nadpisać rozliczenia ani cofnąć sabotu. Transakcja trafiająca na
+        blokadę bazy jest ponawiana.
+
+        Returns:
+            int: Liczba zapisanych wierszy.
+        """
+        with self._flush_lock:
+            with self.lock:
+                events, snapshots, shoes, written = self._dirty()
+
+            if events or shoes:
+                games_table = models.Game.__table__
+                shoes_table = models.Shoe.__table__
+
+                def write(db: Session) -> None:
+                    game_events.append(db, events)
+                    if snapshots:
+                        db.execute(
+                            games_table.update()
+                            .where(games_table.c.id == bindparam("b_id"),
+                                   games_table.c.status == models.GameStatus.IN_PROGRESS.value)
+                            .values(player_hand=bindparam("b_player_hand"),
+                                    dealer_hand=bindparam("b_dealer_hand"),
+                                    player_score=bindparam("b_player_score"),
+                                    dealer_score=bindparam("b_dealer_score"),
+                                    snapshot_seq=bindparam("b_snapshot_seq")),
+                            snapshots
+                        )
+                    if shoes:
+                        db.execute(
+                            shoes_table.update()
+                            .where(shoes_table.c.id == bindparam("b_id"),
+                                   shoes_table.c.position < bindparam("b_position"))
+                            .values(position=bindparam("b_position")),
+                            shoes
+                        )
+
+                run_in_transaction(write)
+
+            with self.lock:
+                for game_id, flushed_seq, snapshot_seq in written:
+                    entry = self._games.get(game_id)
+                    if entry is not None:
+                        entry.events[:] = [event for event in entry.events
+                                           if event["seq"] > flushed_seq]
+                        entry.snapshot_seq = max(entry.snapshot_seq, snapshot_seq)
+                for params in shoes:
+                    hot = self._shoes.get(params["b_id"])
+                    if hot is not None:
+                        hot.flushed_position = max(hot.flushed_position, params["b_position"])
+                for shoe_id in [shoe_id for shoe_id, hot in self._shoes.items()
+                                if hot.refs <= 0 and hot.shoe.position <= hot.flushed_position]:
+                    del self._shoes[shoe_id]
+                rows = len(events) + len(snapshots) + len(shoes)
+                self._flushes += 1
+                self._flushed_rows += rows
+            return rows
+
+    def recover(self) -> int:
+        """
+        Wczytuje trwające gry z bazy (np. po restarcie procesu).
+
+        Stan gry jest odtwarzany z migawki w wierszu gry i zdarzeń zapisanych
+        po niej.
+
+        Returns:
+            int: Liczba wczytanych gier.
+        """
+        recovered = 0
+        with session_scope() as db:
+            rows = db.query(models.Game).filter(
+                models.Game.status == models.GameStatus.IN_PROGRESS.value,
+                models.Game.shoe_id.isnot(None)
+            ).all()
+            with self.lock:
+                for db_game in rows:
+                    if db_game.id in self._games:
+                        continue
+                    player_hand, dealer_hand, seq = game_events.load_hands(db, db_game)
+                    game = BlackjackGame(
+                        deck=self.shoe(db_game.shoe),
+                        player_hand=player_hand,
+                        dealer_hand=dealer_hand
+                    )
+                    self._add(HotGame(
+                        game_id=db_game.id,
+                        player_id=db_game.player_id,
+                        shoe_id=db_game.shoe_id,
+                        bet_amount=db_game.bet_amount,
+                        created_at=db_game.created_at,
+                        game=game,
+                        seq=seq,
+                        snapshot_seq=db_game.snapshot_seq or 0
+                    ))
+                    recovered += 1
+        return recovered
+
+    def _flush_in_background(self) -> None:
+        """
+        Zapis w tle odporny na błędy bazy.
+
+        Nieudany zapis jest logowany i liczony w ``stats``; niezapisane
+        zmiany zostają w pamięci i trafiają do kolejnego zapisu.
+        """
+        try:
+            self.flush()
+        except Exception:
+            with self.lock:
+                self._flush_failures += 1
+            logger.exception("Zapis trwających gier w tle nie powiódł się")
+
+    def _run(self) -> None:
+        """Pętla wątku zapisującego zmiany w tle."""
+        while not self._stop.wait(self.flush_interval):
+            self._flush_in_background()
+
+    def start(self) -> None:
+        """Uruchamia wątek zapisujący zmiany w tle."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="game-store", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Zatrzymuje wątek i zapisuje pozostałe zmiany."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        self.flush()
+
+    def clear(self) -> None:
+        """Usuwa wszystkie gry i saboty z pamięci bez zapisu."""
+        with self.lock:
+            self._games.clear()
+            self._shoes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Zwraca statystyki magazynu.
+
+        Returns:
+            Dict: Liczba gier i sabotów w pamięci, liczba niezapisanych gier,
+            liczba zapisów w tle, zapisanych wierszy i nieudanych zapisów.
+        """
+        with self.lock:
+            return {
+                "games": len(self._games),
+                "shoes": len(self._shoes),
+                "dirty_games": sum(1 for entry in self._games.values() if entry.events),
+                "flushes": self._flushes,
+                "flushed_rows": self._flushed_rows,
+                "flush_failures": self._flush_failures
+            }
+
+
+game_store = GameStore(config.GAME_STORE_FLUSH_INTERVAL)
+
+event.listen(SessionLocal, "after_commit", game_store._after_commit)
+event.listen(SessionLocal, "after_rollback", game_store._after_rollback)
@@ -4,29 +4,76 @@ Główna aplikacja FastAPI dla gry Blackjack.
 Definiuje endpointy REST API oraz WebSocket do komunikacji w czasie rzeczywistym.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
 import asyncio
 import os
-
-from .database import engine, get_db, Base
-from . import models, schemas, crud
+import threading
+
+from .database import (engine, async_engine, get_db, get_async_db, Base, SessionLocal,
+                       AsyncSessionLocal, commit_stats, count_commits,
+                       acquire_instance_lock, release_instance_lock)
+from .broadcaster import StatusBroadcaster
+from . import models, schemas, crud, async_crud, advisor, config, counters, export
+from .archiver import archiver
+from .deck_pool import deck_pool
+from .game_store import game_store
+from .migrations import upgrade_schema
+from .write_queue import write_queue
+from .pagination import decode_cursor, encode_cursor
 
 SERVER_START_TIME = datetime.utcnow()
 
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Zadania wykonywane przy starcie i zatrzymaniu serwera.
+    
+    Przy starcie najpierw zajmowana jest baza danych dla tej instancji
+    aplikacji (na PostgreSQL druga instancja nie wystartuje), potem
+    tworzone są brakujące tabele i uzupełniany jest schemat bazy
+    z poprzedniej wersji - przed wczytaniem trwających gier, które
+    odczytuje kolumny dodane w nowszych wersjach. Następnie w tle liczone
+    są podpowiedzi dla wszystkich stanów doradcy (aby zapytania
+    o podpowiedź nie czekały na obliczenia),
+    uruchamiany jest wątek tasujący saboty do puli, a trwające gry są
+    wczytywane do magazynu w pamięci, którego zmiany zapisuje wątek w tle.
+    Wątek archiwizacji przenosi stare zakończone gry do archiwum. Przy
+    zatrzymaniu zapisywane są pozostałe zmiany gier i zwalniana jest baza.
+    """
+    instance_lock = acquire_instance_lock()
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    threading.Thread(target=advisor.precompute_common_states, daemon=True).start()
+    deck_pool.start()
+    game_store.recover()
+    game_store.start()
+    archiver.start()
+    yield
+    archiver.stop()
+    deck_pool.stop()
+    write_queue.stop()
+    game_store.stop()
+    await status_broadcaster.stop()
+    await async_engine.dispose()
+    release_instance_lock(instance_lock)
+
 
 app = FastAPI(
     title="Blackjack API",
     description="REST API dla gry w Blackjack (tryb single player)",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
@@ -42,8 +89,21 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def commit_counter_middleware(request: Request, call_next):
+    """
+    Zlicza zatwierdzenia transakcji w trakcie obsługi żądania.
+    
+    Liczba jest zwracana w nagłówku ``X-DB-Commits``.
+    """
+    with count_commits() as counter:
+        response = await call_next(request)
+    response.headers["X-DB-Commits"] = str(counter.commits)
+    return response
+
+
 @app.post("/players/", response_model=schemas.PlayerResponse, tags=["Players"])
-def create_player(player: schemas.PlayerCreate, db: Session = Depends(get_db)):
+async def create_player(player: schemas.PlayerCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Tworzy nowego gracza.
     
@@ -58,29 +118,46 @@ def create_player(player: schemas.PlayerCreate, db: Session = Depends(get_db)):
         HTTPException: Jeśli nazwa użytkownika jest zajęta.
     """
     try:
-        return crud.create_player(db, player)
+        return await async_crud.create_player(db, player)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/players/", response_model=List[schemas.PlayerResponse], tags=["Players"])
-def read_players(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_players(response: Response, skip: int = 0, limit: int = 100,
+                 cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
     Pobiera listę wszystkich graczy.
     
+    Jeśli strona jest pełna, nagłówek ``X-Next-Cursor`` zawiera kursor
+    następnej strony (przekazywany w parametrze ``cursor``).
+    
     Args:
-        skip: Liczba rekordów do pominięcia.
+        response: Odpowiedź HTTP (nagłówek kursora).
+        skip: Liczba rekordów do pominięcia (zgodność wsteczna).
         limit: Maksymalna liczba rekordów.
+        cursor: Kursor zwrócony w nagłówku ``X-Next-Cursor``.
         db: Sesja bazy danych.
         
     Returns:
         List[PlayerResponse]: Lista graczy.
+        
+    Raises:
+        HTTPException: 400 jeśli kursor jest nieprawidłowy.
     """
-    return crud.get_players(db, skip=skip, limit=limit)
+    try:
+        after_id = decode_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = await async_crud.get_players(db, skip=skip, limit=limit, after_id=after_id)
+    if items and len(items) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1].id)
+    return items
 
 
 @app.get("/players/{player_id}", response_model=schemas.PlayerResponse, tags=["Players"])
-def read_player(player_id: int, db: Session = Depends(get_db)):
+async def read_player(player_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Pobiera gracza po ID.
     
@@ -94,15 +171,15 @@ def read_player(player_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Jeśli gracz nie istnieje.
     """
-    db_player = crud.get_player(db, player_id)
+    db_player = await async_crud.get_player(db, player_id)
     if db_player is None:
         raise HTTPException(status_code=404, detail="Gracz nie znaleziony")
     return db_player
 
 
 @app.put("/players/{player_id}", response_model=schemas.PlayerResponse, tags=["Players"])
-def update_player(player_id: int, player: schemas.PlayerUpdate, 
-                  db: Session = Depends(get_db)):
+async def update_player(player_id: int, player: schemas.PlayerUpdate, 
+                  db: AsyncSession = Depends(get_async_db)):
     """
     Aktualizuje dane gracza.
     
@@ -117,14 +194,14 @@ def update_player(player_id: int, player: schemas.PlayerUpdate,
     Raises:
         HTTPException: Jeśli gracz nie istnieje.
     """
-    db_player = crud.update_player(db, player_id, player)
+    db_player = await async_crud.update_player(db, player_id, player)
     if db_player is None:
         raise HTTPException(status_code=404, detail="Gracz nie znaleziony")
     return db_player
 
 
 @app.delete("/players/{player_id}", tags=["Players"])
-def delete_player(player_id: int, db: Session = Depends(get_db)):
+async def delete_player(player_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Usuwa gracza.
     
@@ -138,13 +215,13 @@ def delete_player(player_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Jeśli gracz nie istnieje.
     """
-    if not crud.delete_player(db, player_id):
+    if not await async_crud.delete_player(db, player_id):
         raise HTTPException(status_code=404, detail="Gracz nie znaleziony")
     return {"message": "Gracz usunięty pomyślnie"}
 
 
 @app.post("/games/", response_model=schemas.GameResponse, tags=["Games"])
-def create_game(game: schemas.GameCreate, db: Session = Depends(get_db)):
+async def create_game(game: schemas.GameCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Tworzy nową grę w Blackjack.
     
@@ -159,29 +236,78 @@ def create_game(game: schemas.GameCreate, db: Session = Depends(get_db)):
         HTTPException: Jeśli gracz nie istnieje lub ma za mało środków.
     """
     try:
-        return crud.create_game(db, game)
+        return await async_crud.create_game(db, game)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/games/", response_model=List[schemas.GameResponse], tags=["Games"])
-def read_games(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_games(response: Response, skip: int = 0, limit: int = 100,
+               cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
     Pobiera listę wszystkich gier.
     
+    Jeśli strona jest pełna, nagłówek ``X-Next-Cursor`` zawiera kursor
+    następnej strony (przekazywany w parametrze ``cursor``).
+    
     Args:
-        skip: Liczba rekordów do pominięcia.
+        response: Odpowiedź HTTP (nagłówek kursora).
+        skip: Liczba rekordów do pominięcia (zgodność wsteczna).
         limit: Maksymalna liczba rekordów.
+        cursor: Kursor zwrócony w nagłówku ``X-Next-Cursor``.
         db: Sesja bazy danych.
         
     Returns:
         List[GameResponse]: Lista gier.
+        
+    Raises:
+        HTTPException: 400 jeśli kursor jest nieprawidłowy.
+    """
+    try:
+        after_id = decode_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = await async_crud.get_games(db, skip=skip, limit=limit, after_id=after_id)
+    if items and len(items) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1].id)
+    return items
+
+
+@app.get("/games/export", tags=["Games"])
+def export_games(format: str = "ndjson", status: Optional[str] = None,
+                 player_id: Optional[int] = None, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None):
     """
-    return crud.get_games(db, skip=skip, limit=limit)
+    Eksportuje historię gier strumieniowo w formacie NDJSON lub CSV.
+    
+    Args:
+        format: Format eksportu ('ndjson' lub 'csv').
+        status: Filtr statusu gry.
+        player_id: Filtr ID gracza.
+        since: Początek zakresu daty utworzenia (włącznie).
+        until: Koniec zakresu daty utworzenia (wyłącznie).
+        
+    Returns:
+        StreamingResponse: Strumień z wierszami gier.
+        
+    Raises:
+        HTTPException: 400 jeśli format lub status są nieprawidłowe.
+    """
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Nieznany format eksportu: {format}")
+    if status is not None and status not in {s.value for s in models.GameStatus}:
+        raise HTTPException(status_code=400, detail=f"Nieznany status gry: {status}")
+    
+    return StreamingResponse(
+        export.stream_games(format, status, player_id, since, until),
+        media_type=export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="games.{format}"'}
+    )
 
 
 @app.get("/games/{game_id}", response_model=schemas.GameResponse, tags=["Games"])
-def read_game(game_id: int, db: Session = Depends(get_db)):
+async def read_game(game_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Pobiera grę po ID.
     
@@ -195,15 +321,15 @@ def read_game(game_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Jeśli gra nie istnieje.
     """
-    db_game = crud.get_game(db, game_id)
+    db_game = await async_crud.get_game_view(db, game_id)
     if db_game is None:
         raise HTTPException(status_code=404, detail="Gra nie znaleziona")
     return db_game
 
 
 @app.post("/games/{game_id}/action", response_model=schemas.GameResponse, tags=["Games"])
-def game_action(game_id: int, action: schemas.GameAction, 
-                db: Session = Depends(get_db)):
+async def game_action(game_id: int, action: schemas.GameAction, 
+                db: AsyncSession = Depends(get_async_db)):
     """
     Wykonuje akcję w grze (hit lub stand).
     
@@ -219,13 +345,85 @@ def game_action(game_id: int, action: schemas.GameAction,
         HTTPException: Jeśli gra nie istnieje lub akcja jest nieprawidłowa.
     """
     try:
-        return crud.game_action(db, game_id, action)
+        return await async_crud.game_action(db, game_id, action)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/games/{game_id}/advice", response_model=schemas.GameAdvice, tags=["Games"])
+def game_advice(game_id: int, db: Session = Depends(get_db)):
+    """
+    Zwraca oczekiwaną wartość akcji hit i stand dla trwającej gry.
+    
+    Endpoint jest synchroniczny (pula wątków), bo jego koszt to obliczenia
+    wartości oczekiwanej, które zablokowałyby pętlę zdarzeń.
+    
+    Args:
+        game_id: ID gry.
+        db: Sesja bazy danych.
+        
+    Returns:
+        GameAdvice: Podpowiedź z zalecaną akcją.
+        
+    Raises:
+        HTTPException: Jeśli gra nie istnieje lub jest zakończona.
+    """
+    try:
+        advice = crud.get_game_advice(db, game_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if advice is None:
+        raise HTTPException(status_code=404, detail="Gra nie znaleziona")
+    return advice
+
+
+@app.get("/games/{game_id}/events", response_model=List[schemas.GameEventResponse], tags=["Games"])
+async def game_events_log(game_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Zwraca dziennik zdarzeń gry (audyt i odtwarzanie przebiegu gry).
+    
+    Args:
+        game_id: ID gry.
+        db: Sesja bazy danych.
+        
+    Returns:
+        List[GameEventResponse]: Zdarzenia gry w kolejności.
+        
+    Raises:
+        HTTPException: 404 jeśli gra nie istnieje.
+    """
+    events = await async_crud.get_game_events(db, game_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Gra nie znaleziona")
+    return events
+
+
+@app.get("/games/{game_id}/replay", response_model=schemas.GameReplay, tags=["Games"])
+async def game_replay(game_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Zwraca zwięzły kod, z którego można odtworzyć przebieg gry.
+    
+    Args:
+        game_id: ID gry.
+        db: Sesja bazy danych.
+        
+    Returns:
+        GameReplay: Kod odtworzenia gry.
+        
+    Raises:
+        HTTPException: 400 jeśli gry nie można opisać kodem, 404 jeśli gra nie istnieje.
+    """
+    try:
+        replay = await async_crud.get_game_replay(db, game_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if replay is None:
+        raise HTTPException(status_code=404, detail="Gra nie znaleziona")
+    return replay
 
 
 @app.delete("/games/{game_id}", tags=["Games"])
-def delete_game(game_id: int, db: Session = Depends(get_db)):
+async def delete_game(game_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Usuwa grę.
     
@@ -237,9 +435,13 @@ def delete_game(game_id: int, db: Session = Depends(get_db)):
         dict: Potwierdzenie usunięcia.
         
     Raises:
-        HTTPException: Jeśli gra nie istnieje.
+        HTTPException: Jeśli gra nie istnieje lub jest właśnie rozliczana.
     """
-    if not crud.delete_game(db, game_id):
+    try:
+        deleted = await async_crud.delete_game(db, game_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Gra nie znaleziona")
     return {"message": "Gra usunięta pomyślnie"}
 
@@ -257,6 +459,36 @@ def get_server_uptime() -> str:
     return f"{hours}h {minutes}m {seconds}s"
 
 
+def compute_server_status() -> str:
+    """
+    Liczy i serializuje status serwera.
+    
+    Wywoływana raz na takt przez ``status_broadcaster``, niezależnie
+    od liczby podłączonych klientów. Liczby gier i graczy pochodzą
+    z liczników utrzymywanych przyrostowo (``app.counters``).
+    
+    Returns:
+        str: Status serwera w formacie JSON.
+    """
+    db = SessionLocal()
+    try:
+        stats = counters.get_counters(db)
+    finally:
+        db.close()
+    
+    status_data = schemas.ServerStatus(
+        status="online",
+        datetime=datetime.utcnow().isoformat(),
+        active_games=stats[counters.ACTIVE_GAMES],
+        total_players=stats[counters.TOTAL_PLAYERS],
+        server_uptime=get_server_uptime()
+    )
+    return status_data.model_dump_json()
+
+
+status_broadcaster = StatusBroadcaster(compute_server_status, interval=1.0)
+
+
 @app.websocket("/ws/status")
 async def websocket_status(websocket: WebSocket):
     """
@@ -269,33 +501,33 @@ async def websocket_status(websocket: WebSocket):
     - total_players: Łączna liczba graczy
     - server_uptime: Czas działania serwera
     
+    Status jest liczony raz na sekundę przez wspólnego nadawcę
+    i rozsyłany do wszystkich połączeń.
+    
     Args:
         websocket: Połączenie WebSocket.
     """
     await websocket.accept()
+    subscriber = status_broadcaster.subscribe()
     
-    try:
+    async def send_updates() -> None:
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+    
+    async def wait_for_disconnect() -> None:
         while True:
-            db = next(get_db())
-            try:
-                active_games = len(crud.get_active_games(db))
-                total_players = len(crud.get_players(db))
-            finally:
-                db.close()
-            
-            status_data = schemas.ServerStatus(
-                status="online",
-                datetime=datetime.utcnow().isoformat(),
-                active_games=active_games,
-                total_players=total_players,
-                server_uptime=get_server_uptime()
-            )
-            
-            await websocket.send_json(status_data.model_dump())
-            await asyncio.sleep(1)
-            
-    except WebSocketDisconnect:
-        pass
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        status_broadcaster.unsubscribe(subscriber)
 
 
 @app.get("/", tags=["Info"])
@@ -327,14 +559,26 @@ def api_info():
 
 
 @app.get("/health", tags=["Info"])
-def health_check():
+async def health_check():
     """
     Endpoint sprawdzający stan serwera.
     
     Returns:
-        dict: Status serwera.
+        dict: Status serwera, czas działania, statystyki puli sabotów,
+        liczniki gier i graczy, stan magazynu trwających gier,
+        statystyki kolejki zapisów i archiwizacji oraz liczniki
+        zatwierdzeń transakcji.
     """
+    async with AsyncSessionLocal() as db:
+        stats = await async_crud.get_counters(db)
+    
     return {
         "status": "healthy",
-        "uptime": get_server_uptime()
+        "uptime": get_server_uptime(),
+        "deck_pool": deck_pool.stats(),
+        "counters": stats,
+        "game_store": game_store.stats(),
+        "write_queue": write_queue.stats(),
+        "archiver": archiver.stats(),
+        "database": dict(commit_stats)
     }
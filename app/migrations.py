@@ -0,0 +1,175 @@
+"""
+Aktualizacja schematu baz danych utworzonych przez starsze wersje aplikacji.
+
+``Base.metadata.create_all`` tworzy tylko brakujące tabele - nie dodaje
+kolumn ani indeksów do tabel, które już istnieją. ``upgrade_schema``
+uruchamiany przy starcie (po ``create_all``) uzupełnia brakujące kolumny
+i indeksy oraz poszerza typy kolumn, dzięki czemu
+baza z poprzedniej wersji działa bez ręcznej migracji. Każdy krok
+sprawdza bieżący schemat, więc aktualizację można uruchamiać wielokrotnie.
+
+SQLite nie zmienia definicji istniejących kolumn (``ALTER COLUMN``), więc
+tabela sabotów ze starszych wersji (karty jako JSON, kolejność kart
+wymagana) jest przebudowywana: nowa tabela, kopia wierszy, zamiana nazw.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import JSON, BigInteger, MetaData, insert, inspect, select, sql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from . import models
+from .game_logic import Card
+
+logger = logging.getLogger(__name__)
+
+ADDED_COLUMNS: List[Tuple[str, str, str]] = [
+    ("games", "shoe_id", "REFERENCES shoes (id)"),
+    ("games", "snapshot_seq", "NOT NULL DEFAULT 0"),
+]
+"""
+Kolumny dodane do istniejących tabel: (tabela, kolumna, dodatkowe
+klauzule ``ADD COLUMN``). Typ kolumny pochodzi z modelu.
+"""
+
+WIDENED_COLUMNS: List[Tuple[str, str]] = [
+    ("stats", "value"),
+]
+"""
+Kolumny zmienione z INTEGER na BIGINT (tabela, kolumna). Dotyczy tylko
+PostgreSQL - w SQLite INTEGER ma już 64 bity.
+"""
+
+
+def _columns(connection: Connection, table: str) -> List[str]:
+    """Zwraca nazwy kolumn tabeli."""
+    return [column["name"] for column in inspect(connection).get_columns(table)]
+
+
+def _legacy_shoe_order(cards: Optional[List[Dict]]) -> bytes:
+    """
+    Koduje karty sabotu zapisane jako JSON (pierwsza wersja sabotów) jako
+    kolejność kart.
+
+    Karty były dobierane z końca listy, a z ``order`` są dobierane od
+    początku, więc kolejność jest odwracana.
+    """
+    return bytes(Card.from_dict(card).index for card in reversed(cards or []))
+
+
+def _rebuild_shoes(connection: Connection) -> List[str]:
+    """
+    Przebudowuje tabelę sabotów ze starszej wersji (SQLite).
+
+    Saboty z kartami w JSON dostają kolejność kart z pozycją 0, saboty
+    z kolejnością kart zachowują ją; ziarno tasowania pozostaje puste.
+    """
+    if connection.dialect.name != "sqlite":
+        return []
+    columns = {column["name"]: column for column in inspect(connection).get_columns("shoes")}
+    if "seed" in columns and columns["order"]["nullable"]:
+        return []
+
+    metadata = MetaData()
+    models.Player.__table__.to_metadata(metadata)
+    rebuilt = models.Shoe.__table__.to_metadata(metadata, name="shoes_new")
+    connection.execute(CreateTable(rebuilt))
+
+    legacy = sql.table("shoes", *(
+        sql.column(name, rebuilt.c[name].type if name in rebuilt.c else JSON())
+        for name in columns
+    ))
+    rows = []
+    for row in connection.execute(select(legacy)).mappings():
+        if "cards" in columns:
+            order, position = _legacy_shoe_order(row["cards"]), 0
+        else:
+            order, position = row["order"], row["position"]
+        rows.append({
+            "id": row["id"],
+            "player_id": row["player_id"],
+            "num_decks": row["num_decks"],
+            "cut_card": row["cut_card"],
+            "seed": row.get("seed"),
+            "order": order,
+            "position": position,
+            "created_at": row["created_at"]
+        })
+    if rows:
+        connection.execute(insert(rebuilt), rows)
+
+    connection.exec_driver_sql("DROP TABLE shoes")
+    connection.exec_driver_sql("ALTER TABLE shoes_new RENAME TO shoes")
+    for index in models.Shoe.__table__.indexes:
+        index.create(connection, checkfirst=True)
+    return ["shoes (przebudowa)"]
+
+
+def _add_columns(connection: Connection) -> List[str]:
+    """Dodaje brakujące kolumny z ``ADDED_COLUMNS``."""
+    preparer = connection.dialect.identifier_preparer
+    added = []
+    for table, name, clauses in ADDED_COLUMNS:
+        if name in _columns(connection, table):
+            continue
+        column = models.Base.metadata.tables[table].c[name]
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {preparer.quote(table)} "
+            f"ADD COLUMN {preparer.quote(name)} {column_type} {clauses}".rstrip()
+        )
+        added.append(f"{table}.{name}")
+    return added
+
+
+def _widen_columns(connection: Connection) -> List[str]:
+    """Zmienia typ kolumn z ``WIDENED_COLUMNS`` na BIGINT (PostgreSQL)."""
+    if connection.dialect.name != "postgresql":
+        return []
+    preparer = connection.dialect.identifier_preparer
+    widened = []
+    for table, name in WIDENED_COLUMNS:
+        column_type = next(column["type"] for column in inspect(connection).get_columns(table)
+                           if column["name"] == name)
+        if isinstance(column_type, BigInteger):
+            continue
+        connection.exec_driver_sql(
+            f"ALTER TABLE {preparer.quote(table)} "
+            f"ALTER COLUMN {preparer.quote(name)} TYPE BIGINT"
+        )
+        widened.append(f"{table}.{name}")
+    return widened
+
+
+def _create_indexes(connection: Connection) -> List[str]:
+    """Tworzy indeksy modeli brakujące w istniejących tabelach."""
+    inspector = inspect(connection)
+    created = []
+    for model_table in models.Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(model_table.name)}
+        for index in model_table.indexes:
+            if index.name in existing:
+                continue
+            connection.execute(CreateIndex(index, if_not_exists=True))
+            created.append(index.name)
+    return created
+
+
+def upgrade_schema(target: Engine) -> List[str]:
+    """
+    Uzupełnia schemat istniejącej bazy do bieżących modeli.
+
+    Args:
+        target: Silnik bazy danych (tabele utworzone już przez ``create_all``).
+
+    Returns:
+        List[str]: Opis wykonanych zmian (pusta lista, gdy schemat jest aktualny).
+    """
+    with target.begin() as connection:
+        changes = _rebuild_shoes(connection) + _add_columns(connection)
+        changes += _widen_columns(connection) + _create_indexes(connection)
+    for change in changes:
+        logger.info("Zaktualizowano schemat bazy: %s", change)
+    return changes
@@ -1,10 +1,12 @@
 """
 Modele bazy danych dla aplikacji Blackjack.
 
-Definiuje encje Player (gracz) oraz Game (gra).
+Definiuje encje Player (gracz), Shoe (sabot), Game (gra), GameEvent (zdarzenie gry),
+GameArchive (zarchiwizowana gra) oraz Stat (licznik).
 """
 
-from sqlalchemy import Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy import BigInteger, Integer, String, ForeignKey, DateTime, Index, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import Optional, List
@@ -12,6 +14,9 @@ import enum
 
 from .database import Base
 
+JsonDocument = JSON().with_variant(JSONB(), "postgresql")
+"""Kolumna JSON - na PostgreSQL w postaci binarnej (``JSONB``)."""
+
 
 class GameStatus(enum.Enum):
     """
@@ -53,52 +58,206 @@ class Player(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     games: Mapped[List["Game"]] = relationship("Game", back_populates="player")
+    shoes: Mapped[List["Shoe"]] = relationship("Shoe", back_populates="player")
     
     def __repr__(self) -> str:
         """Reprezentacja tekstowa gracza."""
         return f"<Player(id={self.id}, username='{self.username}', balance={self.balance})>"
 
 
+class Shoe(Base):
+    """
+    Model sabotu w bazie danych.
+    
+    Sabot jest tasowany raz i używany przez kolejne gry gracza,
+    aż rozdawanie dojdzie do karty odcięcia. Kolejność kart wynika
+    z ziarna tasowania (``seed``); dobieranie kart zmienia tylko ``position``.
+    
+    Attributes:
+        id: Unikalny identyfikator sabotu.
+        player_id: ID gracza.
+        num_decks: Liczba talii w sabocie.
+        cut_card: Liczba pozostałych kart, przy której sabot jest wymieniany.
+        seed: Ziarno tasowania, z którego odtwarzana jest kolejność kart.
+        order: Kolejność kart (jeden bajt - indeks karty 0-51 - na kartę) -
+            tylko saboty sprzed wprowadzenia ziarna.
+        position: Indeks następnej karty do dobrania.
+        created_at: Data utworzenia sabotu.
+    """
+    __tablename__ = "shoes"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    player_id: Mapped[int] = mapped_column(Integer, ForeignKey("players.id"), nullable=False, index=True)
+    num_decks: Mapped[int] = mapped_column(Integer, default=1)
+    cut_card: Mapped[int] = mapped_column(Integer, default=0)
+    seed: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    order: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    player: Mapped["Player"] = relationship("Player", back_populates="shoes")
+    games: Mapped[List["Game"]] = relationship("Game", back_populates="shoe")
+    
+    @property
+    def size(self) -> int:
+        """Liczba kart w sabocie."""
+        return self.num_decks * 52
+    
+    def __repr__(self) -> str:
+        """Reprezentacja tekstowa sabotu."""
+        return f"<Shoe(id={self.id}, player_id={self.player_id}, num_decks={self.num_decks})>"
+
+
 class Game(Base):
     """
     Model gry w bazie danych.
     
     Przechowuje informacje o pojedynczej grze w Blackjack,
-    w tym stan kart, zakład i wynik.
+    w tym stan kart, zakład i wynik. Indeksy pokrywają filtrowanie
+    po statusie, historię gier gracza (``player_id``, ``created_at``)
+    oraz zakresy dat zakończenia.
+    
+    Ręce i wyniki w wierszu są migawką stanu po zdarzeniu
+    ``snapshot_seq``; pełny przebieg gry zapisany jest w ``game_events``.
     
     Attributes:
         id: Unikalny identyfikator gry.
         status: Aktualny status gry.
         player_id: ID gracza.
+        shoe_id: ID sabotu, z którego dobierane są karty.
         bet_amount: Kwota zakładu.
         player_hand: Karty gracza (JSON).
         dealer_hand: Karty krupiera (JSON).
-        deck: Pozostałe karty w talii (JSON).
+        deck: Pozostałe karty w talii (JSON) - tylko trwające gry sprzed
+            wprowadzenia sabotu (po rozliczeniu NULL).
         player_score: Wynik punktowy gracza.
         dealer_score: Wynik punktowy krupiera.
+        snapshot_seq: Numer ostatniego zdarzenia uwzględnionego w migawce.
         created_at: Data utworzenia gry.
         finished_at: Data zakończenia gry.
     """
     __tablename__ = "games"
+    __table_args__ = (
+        Index("ix_games_player_id_created_at", "player_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    status: Mapped[str] = mapped_column(String(20), default=GameStatus.IN_PROGRESS.value)
+    status: Mapped[str] = mapped_column(String(20), default=GameStatus.IN_PROGRESS.value, index=True)
     
     player_id: Mapped[int] = mapped_column(Integer, ForeignKey("players.id"), nullable=False)
+    shoe_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("shoes.id"), nullable=True)
     bet_amount: Mapped[int] = mapped_column(Integer, default=10)
     
-    player_hand: Mapped[Optional[list]] = mapped_column(JSON, default=list)
-    dealer_hand: Mapped[Optional[list]] = mapped_column(JSON, default=list)
-    deck: Mapped[Optional[list]] = mapped_column(JSON, default=list)
+    player_hand: Mapped[Optional[list]] = mapped_column(JsonDocument, default=list)
+    dealer_hand: Mapped[Optional[list]] = mapped_column(JsonDocument, default=list)
+    deck: Mapped[Optional[list]] = mapped_column(JsonDocument, default=list)
     
     player_score: Mapped[int] = mapped_column(Integer, default=0)
     dealer_score: Mapped[int] = mapped_column(Integer, default=0)
+    snapshot_seq: Mapped[int] = mapped_column(Integer, default=0)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
     
     player: Mapped["Player"] = relationship("Player", back_populates="games")
+    shoe: Mapped[Optional["Shoe"]] = relationship("Shoe", back_populates="games")
     
     def __repr__(self) -> str:
         """Reprezentacja tekstowa gry."""
         return f"<Game(id={self.id}, status='{self.status}')>"
+
+
+class GameEvent(Base):
+    """
+    Model zdarzenia gry w bazie danych (dziennik tylko do dopisywania).
+    
+    Stan gry można odtworzyć, odtwarzając zdarzenia po kolei
+    (zob. ``app.game_events``).
+    
+    Attributes:
+        id: Unikalny identyfikator zdarzenia.
+        game_id: ID gry.
+        seq: Numer kolejny zdarzenia w grze (od 1).
+        type: Rodzaj zdarzenia ('created', 'hit', 'stand', 'settled').
+        cards: Karty dobrane w zdarzeniu (jeden bajt - indeks karty - na kartę).
+        position: Pozycja sabotu, od której dobrano karty zdarzenia.
+        detail: Dodatkowe dane zdarzenia (np. wynik rozliczenia).
+        created_at: Data zdarzenia.
+    """
+    __tablename__ = "game_events"
+    __table_args__ = (
+        UniqueConstraint("game_id", "seq", name="uq_game_events_game_id_seq"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    game_id: Mapped[int] = mapped_column(Integer, ForeignKey("games.id"), nullable=False)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    type: Mapped[str] = mapped_column(String(20), nullable=False)
+    cards: Mapped[bytes] = mapped_column(LargeBinary, default=b"", nullable=False)
+    position: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    detail: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        """Reprezentacja tekstowa zdarzenia."""
+        return f"<GameEvent(game_id={self.game_id}, seq={self.seq}, type='{self.type}')>"
+
+
+class GameArchive(Base):
+    """
+    Model zarchiwizowanej gry w bazie danych.
+    
+    Zakończone gry starsze niż ``config.ARCHIVE_AFTER_DAYS`` są przenoszone
+    z tabeli ``games`` (razem z usunięciem ich zdarzeń) do tej wąskiej
+    tabeli przez ``app.archiver``. Gra zachowuje swoje ID.
+    
+    Attributes:
+        id: ID gry.
+        status: Wynik gry.
+        player_id: ID gracza.
+        bet_amount: Kwota zakładu.
+        player_hand: Karty gracza (jeden bajt - indeks karty - na kartę).
+        dealer_hand: Karty krupiera (jeden bajt - indeks karty - na kartę).
+        player_score: Wynik punktowy gracza.
+        dealer_score: Wynik punktowy krupiera.
+        created_at: Data utworzenia gry.
+        finished_at: Data zakończenia gry.
+    """
+    __tablename__ = "games_archive"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    player_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    bet_amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    player_hand: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    dealer_hand: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    player_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    dealer_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    
+    def __repr__(self) -> str:
+        """Reprezentacja tekstowa zarchiwizowanej gry."""
+        return f"<GameArchive(id={self.id}, status='{self.status}')>"
+
+
+class Stat(Base):
+    """
+    Model licznika statystyk w bazie danych.
+    
+    Liczniki są utrzymywane przyrostowo przez funkcje CRUD
+    (zob. ``app.counters``), aby status serwera nie wymagał zliczania
+    wierszy tabel gier i graczy.
+    
+    Attributes:
+        key: Nazwa licznika.
+        value: Wartość licznika.
+    """
+    __tablename__ = "stats"
+    
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    
+    def __repr__(self) -> str:
+        """Reprezentacja tekstowa licznika."""
+        return f"<Stat(key='{self.key}', value={self.value})>"
@@ -0,0 +1,49 @@
+"""
+Stronicowanie kursorowe (keyset) list graczy i gier.
+
+Kursor jest nieprzezroczystym napisem kodującym klucz ostatniego
+rekordu strony. Kolejna strona jest pobierana zapytaniem
+``WHERE id > :last_id ORDER BY id LIMIT :limit``, więc jej koszt nie
+zależy od głębokości stronicowania (w przeciwieństwie do ``OFFSET``).
+"""
+
+import base64
+import binascii
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Koduje kursor wskazujący na rekord po ``last_id``.
+
+    Args:
+        last_id: ID ostatniego rekordu bieżącej strony.
+
+    Returns:
+        str: Kursor w formacie base64 (bezpieczny w URL).
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Dekoduje kursor.
+
+    Args:
+        cursor: Kursor zwrócony przez ``encode_cursor``.
+
+    Returns:
+        int: ID ostatniego rekordu poprzedniej strony.
+
+    Raises:
+        ValueError: Jeśli kursor jest nieprawidłowy.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Nieprawidłowy kursor")
+    if not isinstance(last_id, int) or isinstance(last_id, bool) or last_id < 0:
+        raise ValueError("Nieprawidłowy kursor")
+    return last_id
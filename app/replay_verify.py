@@ -0,0 +1,197 @@
+"""
+Masowa weryfikacja zakończonych gier przez odtworzenie z kodu.
+
+Każda zakończona gra jest opisywana kodem odtworzenia (ziarno sabotu
+i akcje z pozycjami sabotu, zob. ``game_events.encode_replay``), a kod
+jest odtwarzany i porównywany z rękami i wynikiem zapisanymi w wierszu
+gry. Odtwarzanie jest czysto obliczeniowe, więc kody są rozdzielane
+między procesy (``multiprocessing.Pool``), a baza jest czytana tylko
+w procesie głównym, paczkami po ``batch_size`` gier.
+
+Uruchomienie:
+    python -m app.replay_verify --workers 4
+"""
+
+import argparse
+import multiprocessing
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import game_events, models
+from .database import session_scope
+from .game_logic import Shoe
+
+ReplayItem = Tuple[int, str, list, list, str]
+
+_shoe: Optional[Shoe] = None
+
+
+@dataclass
+class VerifyResult:
+    """
+    Wynik weryfikacji gier.
+
+    Attributes:
+        checked: Liczba sprawdzonych gier.
+        skipped: Liczba gier bez kodu odtworzenia (np. sprzed zapisu ziarna).
+        mismatched: ID gier, których odtworzenie nie zgadza się z zapisem.
+        elapsed: Czas weryfikacji w sekundach.
+    """
+
+    checked: int = 0
+    skipped: int = 0
+    mismatched: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        """Liczba sprawdzonych gier na sekundę."""
+        return self.checked / self.elapsed if self.elapsed else 0.0
+
+
+def iter_replay_items(db: Session, batch_size: int = 500) -> Iterator[Optional[ReplayItem]]:
+    """
+    Zwraca kody odtworzenia zakończonych gier wraz z zapisanym stanem.
+
+    Gry są czytane paczkami po ID (kursor), a zdarzenia paczki jednym
+    zapytaniem. Gry z tego samego sabotu trafiają obok siebie, dzięki
+    czemu proces weryfikujący rzadziej tasuje sabot od nowa.
+
+    Args:
+        db: Sesja bazy danych.
+        batch_size: Liczba gier w paczce.
+
+    Yields:
+        ReplayItem: Krotka (ID gry, kod, ręka gracza, ręka krupiera,
+        status) lub None dla gry, której nie da się opisać kodem.
+    """
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(models.Game.id, models.Game.player_hand, models.Game.dealer_hand,
+                   models.Game.status, models.Shoe.seed, models.Shoe.num_decks)
+            .outerjoin(models.Shoe, models.Game.shoe_id == models.Shoe.id)
+            .where(models.Game.id > last_id,
+                   models.Game.status != models.GameStatus.IN_PROGRESS.value)
+            .order_by(models.Game.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+
+        events = defaultdict(list)
+        for event in db.scalars(
+            select(models.GameEvent)
+            .where(models.GameEvent.game_id.in_([row.id for row in rows]))
+            .order_by(models.GameEvent.game_id, models.GameEvent.seq)
+        ):
+            events[event.game_id].append(event)
+
+        for row in sorted(rows, key=lambda row: (row.seed is None, row.seed or 0, row.id)):
+            if row.seed is None or not events[row.id]:
+                yield None
+                continue
+            try:
+                code = game_events.encode_replay(row.seed, row.num_decks, events[row.id])
+            except ValueError:
+                yield None
+                continue
+            yield row.id, code, row.player_hand, row.dealer_hand, row.status
+
+
+def verify_item(item: ReplayItem) -> Tuple[int, bool]:
+    """
+    Odtwarza jedną grę z kodu i porównuje ją z zapisem.
+
+    Sabot ostatnio odtwarzanej gry jest zapamiętywany w procesie, więc
+    kolejne gry z tego samego sabotu nie wymagają ponownego tasowania.
+
+    Args:
+        item: Krotka z ``iter_replay_items``.
+
+    Returns:
+        Tuple[int, bool]: ID gry i informacja, czy odtworzenie jest zgodne.
+    """
+    global _shoe
+    game_id, code, player_hand, dealer_hand, status = item
+    try:
+        game = game_events.replay_code(code, _shoe)
+    except ValueError:
+        return game_id, False
+    _shoe = game.deck
+    return game_id, (game.player_hand.to_list() == player_hand and
+                     game.dealer_hand.to_list() == dealer_hand and
+                     game.determine_winner() == status)
+
+
+def verify_games(workers: Optional[int] = None, batch_size: int = 500,
+                 chunksize: int = 64) -> VerifyResult:
+    """
+    Weryfikuje wszystkie zakończone gry.
+
+    Args:
+        workers: Liczba procesów (domyślnie liczba rdzeni; 1 - bez
+            dodatkowych procesów).
+        batch_size: Liczba gier czytanych z bazy jednym zapytaniem.
+        chunksize: Liczba gier wysyłanych do procesu naraz.
+
+    Returns:
+        VerifyResult: Wynik weryfikacji.
+    """
+    result = VerifyResult()
+    start = time.perf_counter()
+    with session_scope() as db:
+        items = _count_skipped(iter_replay_items(db, batch_size), result)
+        if workers == 1:
+            _collect(map(verify_item, items), result)
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                _collect(pool.imap_unordered(verify_item, items, chunksize), result)
+    result.mismatched.sort()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _count_skipped(items: Iterator[Optional[ReplayItem]],
+                   result: VerifyResult) -> Iterator[ReplayItem]:
+    """Pomija gry bez kodu odtworzenia, licząc je w wyniku."""
+    for item in items:
+        if item is None:
+            result.skipped += 1
+        else:
+            yield item
+
+
+def _collect(outcomes: Iterator[Tuple[int, bool]], result: VerifyResult) -> None:
+    """Zlicza wyniki weryfikacji pojedynczych gier."""
+    for game_id, ok in outcomes:
+        result.checked += 1
+        if not ok:
+            result.mismatched.append(game_id)
+
+
+def main() -> None:
+    """Punkt wejścia wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Weryfikacja zakończonych gier z kodów odtworzenia")
+    parser.add_argument("--workers", type=int, default=None, help="Liczba procesów")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rozmiar paczki z bazy")
+    args = parser.parse_args()
+
+    result = verify_games(args.workers, args.batch_size)
+
+    print(f"Sprawdzone gry: {result.checked}")
+    print(f"Pominięte gry:  {result.skipped}")
+    print(f"Niezgodne gry:  {len(result.mismatched)}")
+    for game_id in result.mismatched[:20]:
+        print(f"  gra {game_id}")
+    print(f"Gier/s:         {result.games_per_second:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -117,6 +117,56 @@ class GameAction(BaseModel):
     player_id: int = Field(..., description="ID gracza wykonującego akcję")
 
 
+class GameEventResponse(BaseModel):
+    """
+    Schemat zdarzenia z dziennika gry.
+    
+    Attributes:
+        seq: Numer kolejny zdarzenia.
+        type: Rodzaj zdarzenia ('created', 'hit', 'stand', 'settled').
+        cards: Karty dobrane w zdarzeniu.
+        detail: Dodatkowe dane zdarzenia (np. wynik rozliczenia).
+        created_at: Data zdarzenia (None dla zdarzeń jeszcze niezapisanych).
+    """
+    seq: int
+    type: str
+    cards: List[dict]
+    detail: Optional[str]
+    created_at: Optional[datetime]
+
+
+class GameReplay(BaseModel):
+    """
+    Schemat kodu odtworzenia gry.
+    
+    Attributes:
+        game_id: ID gry.
+        code: Kod odtworzenia (ziarno sabotu, liczba talii i akcje z pozycjami sabotu).
+    """
+    game_id: int
+    code: str
+
+
+class GameAdvice(BaseModel):
+    """
+    Schemat podpowiedzi dla bieżącej ręki gracza.
+    
+    Attributes:
+        game_id: ID gry.
+        player_score: Wynik gracza.
+        dealer_upcard: Odkryta karta krupiera.
+        hit_ev: Oczekiwana wartość dobrania karty.
+        stand_ev: Oczekiwana wartość pasowania.
+        recommendation: Zalecana akcja ('hit' lub 'stand').
+    """
+    game_id: int
+    player_score: int
+    dealer_upcard: dict
+    hit_ev: float
+    stand_ev: float
+    recommendation: str
+
+
 class ServerStatus(BaseModel):
     """
     Schemat statusu serwera dla WebSocket.
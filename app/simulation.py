@@ -0,0 +1,302 @@
+"""
+Wektorowa symulacja Monte Carlo dla zasad gry Blackjack.
+
+Rozgrywa i rozstrzyga miliony rozdań w paczkach tablic NumPy według
+dokładnie tych samych zasad co ``BlackjackGame``: krupier stoi na 17
+(również miękkim), Blackjack wypłaca 1:1 (tak jak w ``crud.game_action``),
+a rozdanie odbywa się z jednej talii 52 kart. Rozstrzygnięcie odtwarza
+``BlackjackGame.determine_winner`` bit w bit.
+
+Strategia gracza jest wymienna - to funkcja, która dla tablic
+``(wynik, czy_miękka, karta_krupiera, liczba_kart)`` zwraca maskę
+``True`` dla rąk, które dobierają kartę.
+
+Uruchomienie:
+    python -m app.simulation --hands 1000000 --strategy basic
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from .game_logic import BlackjackGame, CARDS
+
+Strategy = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+PLAYER_WON: int = 1
+DEALER_WON: int = -1
+TIE: int = 0
+
+OUTCOME_NAMES: Dict[int, str] = {
+    PLAYER_WON: "player_won",
+    DEALER_WON: "dealer_won",
+    TIE: "tie",
+}
+
+# Wartość "twarda" (as = 1) dla każdego indeksu karty 0-51.
+HARD_VALUES: np.ndarray = np.array(
+    [1 if card.rank == "A" else card.value for card in CARDS], dtype=np.int16
+)
+
+DEALER_STAND_VALUE: int = BlackjackGame.DEALER_STAND_VALUE
+
+
+def _score(hard: np.ndarray, aces: np.ndarray) -> np.ndarray:
+    """Wektorowy odpowiednik ``game_logic.best_score``."""
+    return np.where((aces > 0) & (hard + 10 <= 21), hard + 10, hard)
+
+
+def hit_below(threshold: int) -> Strategy:
+    """
+    Tworzy strategię dobierania poniżej zadanego progu.
+
+    Args:
+        threshold: Wynik, od którego gracz pasuje.
+
+    Returns:
+        Strategy: Funkcja strategii.
+    """
+    def strategy(score: np.ndarray, soft: np.ndarray,
+                 upcard: np.ndarray, num_cards: np.ndarray) -> np.ndarray:
+        return score < threshold
+
+    return strategy
+
+
+def basic_strategy(score: np.ndarray, soft: np.ndarray,
+                   upcard: np.ndarray, num_cards: np.ndarray) -> np.ndarray:
+    """
+    Podstawowa strategia ograniczona do akcji hit/stand.
+
+    Twarde ręce: dobieraj do 11, na 12 pasuj przeciw 4-6, na 13-16 pasuj
+    przeciw 2-6, od 17 pasuj. Miękkie ręce: dobieraj do 17, na miękkim 18
+    dobieraj przeciw 9, 10 i asowi, od 19 pasuj.
+
+    Args:
+        score: Wyniki rąk gracza.
+        soft: Czy ręka jest miękka.
+        upcard: Wartość odkrytej karty krupiera (2-11).
+        num_cards: Liczba kart na ręce gracza.
+
+    Returns:
+        np.ndarray: Maska rąk, które dobierają kartę.
+    """
+    weak_dealer = (upcard >= 2) & (upcard <= 6)
+    hard_hit = (score <= 11) | ((score == 12) & ~((upcard >= 4) & (upcard <= 6))) | \
+        ((score >= 13) & (score <= 16) & ~weak_dealer)
+    soft_hit = (score <= 17) | ((score == 18) & (upcard >= 9))
+    return np.where(soft, soft_hit, hard_hit)
+
+
+STRATEGIES: Dict[str, Strategy] = {
+    "basic": basic_strategy,
+    "dealer": hit_below(DEALER_STAND_VALUE),
+    "never_bust": hit_below(12),
+}
+
+
+@dataclass
+class SimulationResult:
+    """
+    Wynik symulacji Monte Carlo.
+
+    Attributes:
+        hands: Liczba rozegranych rozdań.
+        wins: Liczba wygranych gracza.
+        losses: Liczba przegranych gracza.
+        ties: Liczba remisów.
+        mean: Średni wynik gracza na jednostkę zakładu.
+        variance: Wariancja wyniku na jednostkę zakładu.
+        elapsed: Czas symulacji w sekundach.
+    """
+    hands: int
+    wins: int
+    losses: int
+    ties: int
+    mean: float
+    variance: float
+    elapsed: float
+
+    @property
+    def house_edge(self) -> float:
+        """Przewaga kasyna (ujemna oczekiwana wartość gracza)."""
+        return -self.mean
+
+    @property
+    def std_error(self) -> float:
+        """Błąd standardowy średniego wyniku."""
+        return float(np.sqrt(self.variance / self.hands)) if self.hands else 0.0
+
+    @property
+    def hands_per_second(self) -> float:
+        """Przepustowość symulacji."""
+        return self.hands / self.elapsed if self.elapsed > 0 else float("inf")
+
+
+def shuffled_draw_orders(rng: np.random.Generator, num_hands: int) -> np.ndarray:
+    """
+    Generuje potasowane talie w kolejności dobierania kart.
+
+    Args:
+        rng: Generator liczb losowych.
+        num_hands: Liczba talii (jedna na rozdanie).
+
+    Returns:
+        np.ndarray: Tablica ``(num_hands, 52)`` indeksów kart.
+    """
+    base = np.tile(np.arange(len(CARDS), dtype=np.int8), (num_hands, 1))
+    return rng.permuted(base, axis=1)
+
+
+def play_hands(draw_orders: np.ndarray, strategy: Strategy) -> np.ndarray:
+    """
+    Rozgrywa paczkę rozdań i zwraca ich wyniki.
+
+    Kolejność dobierania odpowiada ``BlackjackGame``: dwie karty gracza,
+    dwie karty krupiera (druga jest odkryta), potem karty gracza
+    i na końcu krupiera.
+
+    Args:
+        draw_orders: Tablica ``(n, k)`` indeksów kart w kolejności dobierania.
+        strategy: Strategia gracza.
+
+    Returns:
+        np.ndarray: Wyniki rozdań (``PLAYER_WON``, ``DEALER_WON`` lub ``TIE``).
+    """
+    hard = HARD_VALUES[draw_orders]
+    is_ace = hard == 1
+    n = hard.shape[0]
+
+    p_hard = hard[:, 0] + hard[:, 1]
+    p_aces = is_ace[:, 0].astype(np.int16) + is_ace[:, 1]
+    d_hard = hard[:, 2] + hard[:, 3]
+    d_aces = is_ace[:, 2].astype(np.int16) + is_ace[:, 3]
+    upcard = np.where(is_ace[:, 3], 11, hard[:, 3])
+
+    p_cards = np.full(n, 2, dtype=np.int16)
+    d_cards = np.full(n, 2, dtype=np.int16)
+    position = np.full(n, 4, dtype=np.int64)
+
+    p_score = _score(p_hard, p_aces)
+    d_score = _score(d_hard, d_aces)
+    p_blackjack = p_score == 21
+    d_blackjack = d_score == 21
+
+    active = ~(p_blackjack | d_blackjack)
+    stood = np.zeros(n, dtype=bool)
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        hit = np.asarray(strategy(p_score[idx], p_score[idx] != p_hard[idx],
+                                  upcard[idx], p_cards[idx]), dtype=bool)
+
+        standing = idx[~hit]
+        stood[standing] = True
+        active[standing] = False
+
+        idx = idx[hit]
+        card = hard[idx, position[idx]]
+        position[idx] += 1
+        p_hard[idx] += card
+        p_aces[idx] += card == 1
+        p_cards[idx] += 1
+        p_score[idx] = _score(p_hard[idx], p_aces[idx])
+        active[idx[p_score[idx] > 21]] = False
+
+    drawing = stood & (d_score < DEALER_STAND_VALUE)
+    while drawing.any():
+        idx = np.flatnonzero(drawing)
+        card = hard[idx, position[idx]]
+        position[idx] += 1
+        d_hard[idx] += card
+        d_aces[idx] += card == 1
+        d_cards[idx] += 1
+        d_score[idx] = _score(d_hard[idx], d_aces[idx])
+        drawing[idx] = d_score[idx] < DEALER_STAND_VALUE
+
+    p_blackjack = (p_cards == 2) & (p_score == 21)
+    d_blackjack = (d_cards == 2) & (d_score == 21)
+
+    # Reguły determine_winner nakładane od najniższego priorytetu.
+    outcome = np.sign(p_score - d_score).astype(np.int8)
+    outcome[p_blackjack & d_blackjack] = TIE
+    outcome[d_blackjack & ~p_blackjack] = DEALER_WON
+    outcome[p_blackjack & ~d_blackjack] = PLAYER_WON
+    outcome[d_score > 21] = PLAYER_WON
+    outcome[p_score > 21] = DEALER_WON
+    return outcome
+
+
+def run_simulation(num_hands: int = 1_000_000,
+                   strategy: Optional[Strategy] = None,
+                   batch_size: int = 200_000,
+                   seed: Optional[int] = None) -> SimulationResult:
+    """
+    Uruchamia symulację Monte Carlo.
+
+    Args:
+        num_hands: Liczba rozdań do rozegrania.
+        strategy: Strategia gracza (domyślnie ``basic_strategy``).
+        batch_size: Liczba rozdań w jednej paczce.
+        seed: Ziarno generatora liczb losowych.
+
+    Returns:
+        SimulationResult: Statystyki symulacji.
+    """
+    strategy = strategy or basic_strategy
+    rng = np.random.default_rng(seed)
+
+    wins = losses = ties = 0
+    start = time.perf_counter()
+
+    remaining = num_hands
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        outcome = play_hands(shuffled_draw_orders(rng, size), strategy)
+        wins += int(np.count_nonzero(outcome == PLAYER_WON))
+        losses += int(np.count_nonzero(outcome == DEALER_WON))
+        remaining -= size
+
+    elapsed = time.perf_counter() - start
+    ties = num_hands - wins - losses
+
+    mean = (wins - losses) / num_hands if num_hands else 0.0
+    variance = (wins + losses) / num_hands - mean ** 2 if num_hands else 0.0
+
+    return SimulationResult(
+        hands=num_hands,
+        wins=wins,
+        losses=losses,
+        ties=ties,
+        mean=mean,
+        variance=variance,
+        elapsed=elapsed
+    )
+
+
+def main() -> None:
+    """Punkt wejścia wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Symulacja Monte Carlo zasad Blackjacka")
+    parser.add_argument("--hands", type=int, default=1_000_000, help="Liczba rozdań")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="basic",
+                        help="Strategia gracza")
+    parser.add_argument("--batch-size", type=int, default=200_000, help="Rozmiar paczki")
+    parser.add_argument("--seed", type=int, default=None, help="Ziarno generatora")
+    args = parser.parse_args()
+
+    result = run_simulation(args.hands, STRATEGIES[args.strategy],
+                            args.batch_size, args.seed)
+
+    print(f"Rozdania:        {result.hands}")
+    print(f"Wygrane/remisy/przegrane: {result.wins}/{result.ties}/{result.losses}")
+    print(f"Przewaga kasyna: {result.house_edge * 100:.3f}% "
+          f"(± {result.std_error * 100:.3f}%)")
+    print(f"Wariancja:       {result.variance:.4f}")
+    print(f"Rozdań/s:        {result.hands_per_second:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Kolejka zapisów obsługiwana przez jeden wątek piszący (group commit).
+
+SQLite dopuszcza jednego piszącego naraz, więc zapisy z wielu żądań
+rywalizujące o blokadę bazy czekają na siebie i ponawiają transakcje.
+Zamiast tego każda operacja zapisu (funkcja ``crud``) trafia do kolejki,
+a jeden wątek pobiera z niej naraz wszystkie oczekujące operacje
+(do ``config.DB_WRITE_BATCH_SIZE``) i wykonuje je w jednej transakcji.
+Wynik operacji (future) jest ustawiany dopiero po zatwierdzeniu tej
+transakcji - trwałość każdego żądania jest taka sama jak przy osobnych
+transakcjach, ale koszt zatwierdzenia dzieli cała grupa.
+
+Każda operacja działa w osobnym punkcie zapisu (SAVEPOINT): błąd jednej
+operacji wycofuje tylko jej zmiany w bazie i jej odroczone efekty
+(liczniki, magazyn gier), a pozostałe operacje grupy są zatwierdzane.
+Błąd zatwierdzenia całej transakcji jest zgłaszany wszystkim operacjom
+grupy.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from . import config
+from .database import (CommitCounter, SessionLocal, current_commit_counter, is_lock_error,
+                       lock_retry_delays, writer_engine)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class WriteRequest:
+    """
+    Operacja zapisu czekająca w kolejce.
+
+    Attributes:
+        work: Funkcja ``work(session, *args)`` wykonująca zmiany.
+        args: Argumenty ``work``.
+        future: Wynik operacji, ustawiany po zatwierdzeniu transakcji.
+        counter: Licznik zatwierdzeń żądania, które zleciło operację.
+    """
+
+    work: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+    counter: Optional[CommitCounter] = None
+
+
+def _merge_info(target: Dict, source: Dict) -> None:
+    """
+    Dołącza odroczone efekty operacji do efektów grupy (``Session.info``).
+
+    Listy są łączone, słowniki liczb sumowane, pozostałe wartości zastępowane.
+    """
+    for key, value in source.items():
+        current = target.get(key)
+        if isinstance(current, list):
+            current.extend(value)
+        elif isinstance(current, dict):
+            for name, delta in value.items():
+                current[name] = current.get(name, 0) + delta
+        else:
+            target[key] = value
+
+
+class WriteQueue:
+    """
+    Kolejka operacji zapisu wykonywanych grupami przez jeden wątek.
+
+    Wątek jest uruchamiany przy pierwszym zleceniu operacji.
+
+    Attributes:
+        batch_size: Maksymalna liczba operacji w jednej transakcji.
+        bind: Silnik bazy danych wątku piszącego (``database.enable_explicit_begin``).
+    """
+
+    def __init__(self, batch_size: int, bind: Engine = writer_engine) -> None:
+        """
+        Inicjalizuje pustą kolejkę.
+
+        Args:
+            batch_size: Maksymalna liczba operacji w jednej transakcji.
+            bind: Silnik bazy danych wątku piszącego.
+        """
+        self.batch_size = batch_size
+        self.bind = bind
+        self._queue: "queue.Queue[Optional[WriteRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._writes = 0
+        self._failures = 0
+        self._max_batch = 0
+
+    def submit(self, work: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Zleca operację zapisu.
+
+        Args:
+            work: Funkcja ``work(session, *args)`` wykonująca zmiany. Może
+                zostać przerwana (wycofana) i nie może mieć skutków ubocznych
+                poza sesją innych niż odroczone do zatwierdzenia. Zwracane
+                obiekty ORM zachowują wczytane atrybuty po zamknięciu sesji.
+            *args: Argumenty ``work``.
+
+        Returns:
+            Future: Wynik ``work`` po zatwierdzeniu transakcji lub jej wyjątek.
+        """
+        self.start()
+        request = WriteRequest(work, args, counter=current_commit_counter())
+        self._queue.put(request)
+        return request.future
+
+    def _take_batch(self) -> List[Optional[WriteRequest]]:
+        """Czeka na pierwszą operację i dobiera pozostałe oczekujące."""
+        batch = [self._queue.get()]
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _begin(self, db: Session) -> None:
+        """Otwiera transakcję, ponawiając ją po trafieniu na blokadę."""
+        for delay in lock_retry_delays():
+            try:
+                db.connection()
+                return
+            except OperationalError as exc:
+                if not is_lock_error(exc):
+                    raise
+            db.rollback()
+            time.sleep(delay)
+        db.connection()
+
+    def _execute(self, db: Session, request: WriteRequest) -> Any:
+        """
+        Wykonuje jedną operację w punkcie zapisu.
+
+        Procedury obsługi zdarzeń sesji (liczniki, magazyn gier) pomijają
+        punkty zapisu, więc odroczone efekty operacji są zbierane osobno
+        i dołączane do efektów grupy dopiero po jej powodzeniu. Po błędzie
+        są odrzucane przez wywołanie procedur ``after_rollback`` tak, jak
+        przy wycofaniu całej transakcji.
+        """
+        batch_info = dict(db.info)
+        db.info.clear()
+        savepoint = db.begin_nested()
+        try:
+            result = request.work(db, *request.args)
+            savepoint.commit()
+        except BaseException:
+            savepoint.rollback()
+            db.dispatch.after_rollback(db)
+            db.info.clear()
+            db.info.update(batch_info)
+            raise
+        _merge_info(batch_info, db.info)
+        db.info.clear()
+        db.info.update(batch_info)
+        return result
+
+    def _write_batch(self, batch: List[WriteRequest]) -> None:
+        """Wykonuje grupę operacji w jednej transakcji i ustawia ich wyniki."""
+        done = []
+        db = SessionLocal(bind=self.bind, expire_on_commit=False)
+        try:
+            self._begin(db)
+            for request in batch:
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    done.append((request, self._execute(db, request)))
+                except Exception as exc:
+                    request.future.set_exception(exc)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Zatwierdzenie grupy zapisów nie powiodło się")
+            with self._stats_lock:
+                self._failures += 1
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        finally:
+            db.close()
+
+        with self._stats_lock:
+            self._batches += 1
+            self._writes += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+        for request, result in done:
+            if request.counter is not None:
+                request.counter.commits += 1
+            request.future.set_result(result)
+
+    def _run(self) -> None:
+        """Pętla wątku piszącego."""
+        while True:
+            batch = self._take_batch()
+            requests = [request for request in batch if request is not None]
+            if requests:
+                self._write_batch(requests)
+            if len(requests) < len(batch):
+                return
+
+    def start(self) -> None:
+        """Uruchamia wątek piszący (jeśli jeszcze nie działa)."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Zatrzymuje wątek po wykonaniu operacji zleconych wcześniej."""
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Zwraca statystyki kolejki.
+
+        Returns:
+            Dict: Liczba oczekujących operacji, zatwierdzonych grup i operacji,
+            średni i największy rozmiar grupy oraz liczba nieudanych zatwierdzeń.
+        """
+        with self._stats_lock:
+            return {
+                "pending": self._queue.qsize(),
+                "batches": self._batches,
+                "writes": self._writes,
+                "avg_batch": round(self._writes / self._batches, 2) if self._batches else 0.0,
+                "max_batch": self._max_batch,
+                "failures": self._failures
+            }
+
+
+write_queue = WriteQueue(config.DB_WRITE_BATCH_SIZE)
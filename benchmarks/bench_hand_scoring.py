@@ -0,0 +1,95 @@
+"""
+Mikro-benchmark obliczania wyniku ręki.
+
+Porównuje inkrementalne liczenie punktów w ``Hand`` z poprzednią
+implementacją, która przy każdym wywołaniu przechodziła dwukrotnie
+po wszystkich kartach. Symulowany jest typowy przebieg ``stand``:
+wielokrotne sprawdzanie wyniku, bust i Blackjacka.
+
+Uruchomienie:
+    python -m benchmarks.bench_hand_scoring
+"""
+
+import random
+import timeit
+from typing import List
+
+from app.game_logic import Card, Deck, Hand
+
+
+class LegacyHand:
+    """Poprzednia implementacja ręki - wynik liczony od zera przy każdym wywołaniu."""
+    
+    def __init__(self) -> None:
+        self.cards: List[Card] = []
+    
+    def add_card(self, card: Card) -> None:
+        self.cards.append(card)
+    
+    def calculate_score(self) -> int:
+        score = sum(card.value for card in self.cards)
+        aces = sum(1 for card in self.cards if card.rank == "A")
+        
+        while score > 21 and aces > 0:
+            score -= 10
+            aces -= 1
+        
+        return score
+    
+    def is_blackjack(self) -> bool:
+        return len(self.cards) == 2 and self.calculate_score() == 21
+    
+    def is_bust(self) -> bool:
+        return self.calculate_score() > 21
+
+
+def play_dealer_round(hand_cls, cards: List[Card]) -> int:
+    """
+    Odtwarza wzorzec wywołań z jednej tury krupiera i rozstrzygnięcia gry.
+    
+    Args:
+        hand_cls: Klasa ręki (``Hand`` lub ``LegacyHand``).
+        cards: Karty do dobierania.
+        
+    Returns:
+        int: Końcowy wynik ręki.
+    """
+    hand = hand_cls()
+    remaining = iter(cards)
+    while hand.calculate_score() < 17:
+        hand.add_card(next(remaining))
+    hand.is_bust()
+    hand.is_blackjack()
+    hand.calculate_score()
+    hand.is_bust()
+    hand.is_blackjack()
+    return hand.calculate_score()
+
+
+def main(rounds: int = 20000) -> None:
+    """Uruchamia benchmark i wypisuje wyniki."""
+    rng = random.Random(1234)
+    decks = []
+    for _ in range(200):
+        deck = Deck()
+        rng.shuffle(deck.cards)
+        decks.append(deck.cards)
+    
+    for deck in decks:
+        assert play_dealer_round(Hand, deck) == play_dealer_round(LegacyHand, deck)
+    
+    results = {}
+    for hand_cls in (LegacyHand, Hand):
+        def run() -> None:
+            for i in range(rounds):
+                play_dealer_round(hand_cls, decks[i % len(decks)])
+        
+        best = min(timeit.repeat(run, number=1, repeat=5))
+        results[hand_cls.__name__] = best
+        print(f"{hand_cls.__name__:<12} {best / rounds * 1e6:8.2f} us/runda")
+    
+    print(f"Przyspieszenie: {results['LegacyHand'] / results['Hand']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
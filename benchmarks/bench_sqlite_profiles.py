@@ -0,0 +1,135 @@
+"""
+Benchmark przepustowości zapisu dla profili SQLite.
+
+Dla każdego profilu z ``database.SQLITE_PROFILES`` tworzy nowy plik bazy
+i uruchamia kilka wątków, z których każdy wykonuje krótkie transakcje
+zapisu (nowy gracz i aktualizacja salda jednego z istniejących graczy),
+tak jak współbieżne żądania API. Transakcje trafiające na blokadę są
+ponawiane z losowym opóźnieniem (``database.lock_retry_delays``).
+Profil ``memory`` jest mierzony na bazie w pamięci (``config.STORAGE``).
+
+Uruchomienie:
+    python -m benchmarks.bench_sqlite_profiles
+"""
+
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app import database, models
+
+
+def write_transaction(session_factory, thread_id: int, i: int) -> int:
+    """
+    Wykonuje jedną transakcję zapisu, ponawiając ją po trafieniu na blokadę.
+
+    Returns:
+        int: Liczba ponowień.
+    """
+    retries = 0
+    delays = database.lock_retry_delays(retries=20)
+    while True:
+        db = session_factory()
+        try:
+            db.execute(insert(models.Player).values(username=f"bench-{thread_id}-{i}"))
+            db.execute(
+                update(models.Player)
+                .where(models.Player.id == i % 50 + 1)
+                .values(balance=models.Player.balance + 1)
+            )
+            db.commit()
+            return retries
+        except OperationalError as exc:
+            db.rollback()
+            if not database.is_lock_error(exc):
+                raise
+            retries += 1
+            time.sleep(next(delays))
+        finally:
+            db.close()
+
+
+def run_profile(profile: str, threads: int, transactions: int) -> Dict[str, float]:
+    """
+    Mierzy przepustowość zapisu dla jednego profilu.
+
+    Args:
+        profile: Nazwa profilu.
+        threads: Liczba wątków piszących.
+        transactions: Liczba transakcji na wątek.
+
+    Returns:
+        Dict[str, float]: Transakcje na sekundę, opóźnienie p50/p99 (ms)
+        i liczba ponowień.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if profile == "memory":
+            url = "sqlite:///file:bench?mode=memory&cache=shared&uri=true"
+        else:
+            url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False},
+                               poolclass=QueuePool, pool_size=threads)
+        database.apply_sqlite_profile(engine, profile)
+        if profile == "memory":
+            database.enable_lock_wait(engine, database.MEMORY_LOCK_TIMEOUT)
+        database.Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(models.Player),
+                               [{"username": f"seed-{i}"} for i in range(50)])
+
+        latencies: List[float] = []
+        retries: List[int] = []
+        lock = threading.Lock()
+
+        def worker(thread_id: int) -> None:
+            local_latencies, local_retries = [], 0
+            for i in range(transactions):
+                start = time.perf_counter()
+                local_retries += write_transaction(session_factory, thread_id, i)
+                local_latencies.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local_latencies)
+                retries.append(local_retries)
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "tps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "retries": sum(retries)
+    }
+
+
+def main(threads: int = 8, transactions: int = 200) -> None:
+    """Uruchamia benchmark i wypisuje wyniki."""
+    results = {}
+    for profile in database.SQLITE_PROFILES:
+        result = run_profile(profile, threads, transactions)
+        results[profile] = result
+        print(f"{profile:<10} {result['tps']:8.0f} transakcji/s  "
+              f"p50 {result['p50']:6.2f} ms  p99 {result['p99']:7.2f} ms  "
+              f"ponowienia {result['retries']:.0f}")
+
+    print(f"Przyspieszenie balanced/legacy: {results['balanced']['tps'] / results['legacy']['tps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
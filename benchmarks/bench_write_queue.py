@@ -0,0 +1,135 @@
+"""
+Benchmark kolejki zapisów z jednym wątkiem piszącym (group commit).
+
+Porównuje dwa sposoby obsługi współbieżnych zapisów z pętli zdarzeń
+(jak endpointy ``async def``) na nowym pliku bazy:
+
+- ``direct`` - każde żądanie wykonuje zapis we własnej sesji
+  asynchronicznej i własnej transakcji, ponawiając go po trafieniu
+  na blokadę (``database.run_sync_with_retry``),
+- ``queue`` - każde żądanie zleca zapis ``WriteQueue`` i czeka na jego
+  zatwierdzenie.
+
+Każdy zapis to nowy gracz i aktualizacja salda jednego z istniejących graczy.
+
+Uruchomienie:
+    python -m benchmarks.bench_write_queue
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import config, database, models
+from app.write_queue import WriteQueue
+
+
+def write(db: Session, client_id: int, i: int) -> None:
+    """Jeden zapis: nowy gracz i aktualizacja salda istniejącego gracza."""
+    db.execute(insert(models.Player).values(username=f"bench-{client_id}-{i}"))
+    db.execute(
+        update(models.Player)
+        .where(models.Player.id == i % 50 + 1)
+        .values(balance=models.Player.balance + 1)
+    )
+
+
+async def _measure(clients: int, transactions: int,
+                   run: Callable[[int, int], Awaitable[None]]) -> Dict[str, float]:
+    """Uruchamia zapisy współbieżnych klientów i mierzy przepustowość oraz opóźnienia."""
+    latencies: List[float] = []
+
+    async def client(client_id: int) -> None:
+        for i in range(transactions):
+            start = time.perf_counter()
+            await run(client_id, i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "tps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+async def run_mode(mode: str, clients: int, transactions: int) -> Dict[str, float]:
+    """
+    Mierzy przepustowość zapisu dla jednego sposobu obsługi zapisów.
+
+    Args:
+        mode: 'direct' lub 'queue'.
+        clients: Liczba współbieżnych klientów.
+        transactions: Liczba zapisów na klienta.
+
+    Returns:
+        Dict[str, float]: Transakcje na sekundę i opóźnienie p50/p99 (ms).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        database.apply_sqlite_profile(engine, config.SQLITE_PROFILE)
+        database.Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(models.Player),
+                               [{"username": f"seed-{i}"} for i in range(50)])
+        engine.dispose()
+
+        if mode == "direct":
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            database.apply_sqlite_profile(async_engine.sync_engine, config.SQLITE_PROFILE)
+            session_factory = async_sessionmaker(async_engine)
+
+            async def run(client_id: int, i: int) -> None:
+                async with session_factory() as db:
+                    await database.run_sync_with_retry(db, write, client_id, i)
+                    await db.commit()
+
+            result = await _measure(clients, transactions, run)
+            await async_engine.dispose()
+        else:
+            writer_engine = create_engine(f"sqlite:///{path}",
+                                          connect_args={"check_same_thread": False},
+                                          pool_size=1, max_overflow=0)
+            database.apply_sqlite_profile(writer_engine, config.SQLITE_PROFILE)
+            database.enable_explicit_begin(writer_engine)
+            write_queue = WriteQueue(config.DB_WRITE_BATCH_SIZE, bind=writer_engine)
+
+            async def run(client_id: int, i: int) -> None:
+                await asyncio.wrap_future(write_queue.submit(write, client_id, i))
+
+            result = await _measure(clients, transactions, run)
+            result["avg_batch"] = write_queue.stats()["avg_batch"]
+            write_queue.stop()
+            writer_engine.dispose()
+    return result
+
+
+def main(clients: int = 32, transactions: int = 100) -> None:
+    """Uruchamia benchmark i wypisuje wyniki."""
+    results = {}
+    for mode in ("direct", "queue"):
+        result = asyncio.run(run_mode(mode, clients, transactions))
+        results[mode] = result
+        line = (f"{mode:<7} {result['tps']:8.0f} transakcji/s  "
+                f"p50 {result['p50']:7.2f} ms  p99 {result['p99']:8.2f} ms")
+        if "avg_batch" in result:
+            line += f"  średnia grupa {result['avg_batch']:.1f}"
+        print(line)
+
+    print(f"Przyspieszenie queue/direct: {results['queue']['tps'] / results['direct']['tps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
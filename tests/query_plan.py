@@ -0,0 +1,93 @@
+"""
+Pomocnik testów sprawdzający plany zapytań SQLite.
+
+``QueryPlanRecorder`` przechwytuje wszystkie zapytania wykonywane przez
+silniki (synchroniczny i asynchroniczny), uruchamia dla każdego
+``EXPLAIN QUERY PLAN`` i zapamiętuje pełne skany dużych tabel.
+"""
+
+import re
+from typing import Iterable, List, Sequence, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LARGE_TABLES: Tuple[str, ...] = ("games", "game_events", "players", "shoes")
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+_EXPLAINED = ("SELECT", "UPDATE", "DELETE")
+
+
+class QueryPlanRecorder:
+    """
+    Menedżer kontekstu zbierający plany zapytań.
+
+    Attributes:
+        plans: Lista par (zapytanie, kroki planu).
+    """
+
+    def __init__(self, *engines: Union[Engine, AsyncEngine],
+                 tables: Sequence[str] = LARGE_TABLES) -> None:
+        """
+        Inicjalizuje rejestrator.
+
+        Args:
+            engines: Silniki bazy danych SQLite.
+            tables: Tabele, których pełny skan jest błędem.
+        """
+        self.engines = [getattr(engine, "sync_engine", engine) for engine in engines]
+        self.tables = tuple(tables)
+        self.plans: List[Tuple[str, List[str]]] = []
+
+    def _explain(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """Uruchamia EXPLAIN QUERY PLAN dla przechwyconego zapytania."""
+        if executemany or not statement.lstrip().upper().startswith(_EXPLAINED):
+            return
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        self.plans.append((statement, [row[-1] for row in rows]))
+
+    def __enter__(self) -> "QueryPlanRecorder":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._explain)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._explain)
+
+    def full_scans(self, allow: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """
+        Zwraca pełne skany dużych tabel.
+
+        Args:
+            allow: Fragmenty zapytań, dla których skan jest dopuszczalny.
+
+        Returns:
+            List[Tuple[str, str]]: Pary (krok planu, zapytanie).
+        """
+        allow = tuple(allow)
+        scans = []
+        for statement, steps in self.plans:
+            if any(fragment in statement for fragment in allow):
+                continue
+            for step in steps:
+                match = _SCAN.match(step)
+                if match and match.group(1) in self.tables:
+                    scans.append((step, statement))
+        return scans
+
+    def assert_no_full_scans(self, allow: Iterable[str] = ()) -> None:
+        """
+        Sprawdza, że żadne zapytanie nie skanuje całej dużej tabeli.
+
+        Args:
+            allow: Fragmenty zapytań, dla których skan jest dopuszczalny.
+
+        Raises:
+            AssertionError: Jeśli znaleziono pełny skan.
+        """
+        scans = self.full_scans(allow)
+        assert not scans, "Pełny skan tabeli:\n" + "\n".join(
+            f"{step}: {statement}" for step, statement in scans
+        )
@@ -2,18 +2,33 @@
 Testy API dla aplikacji Blackjack.
 """
 
+import asyncio
+import csv
+import io
+import json
+
+import httpx
 import pytest
+from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
-from app.main import app
-from app.database import Base, engine
+from sqlalchemy import event
+from app.main import app, status_broadcaster
+from app.database import MEMORY, Base, SessionLocal, engine
+from app.game_store import game_store
+from app.broadcaster import StatusBroadcaster
+from app import counters, crud, export, models, schemas
 
 
 @pytest.fixture(autouse=True)
 def setup_database():
     """Przygotowuje bazę danych przed każdym testem."""
     Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
     yield
     Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
 
 
 client = TestClient(app)
@@ -49,6 +64,42 @@ class TestPlayerAPI:
         data = response.json()
         assert len(data) >= 2
     
+    def test_get_players_cursor_pagination(self):
+        """Testuje stronicowanie kursorowe listy graczy."""
+        for i in range(5):
+            client.post("/players/", json={"username": f"page{i}"})
+        
+        usernames = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/players/", params=params)
+            assert response.status_code == 200
+            usernames += [player["username"] for player in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        
+        assert usernames == [f"page{i}" for i in range(5)]
+    
+    def test_get_players_skip_compatibility(self):
+        """Testuje, że parametr skip nadal działa."""
+        for i in range(3):
+            client.post("/players/", json={"username": f"skip{i}"})
+        
+        response = client.get("/players/", params={"skip": 1, "limit": 1})
+        assert [player["username"] for player in response.json()] == ["skip1"]
+        
+        next_page = client.get("/players/", params={"cursor": response.headers["X-Next-Cursor"]})
+        assert [player["username"] for player in next_page.json()] == ["skip2"]
+    
+    def test_get_players_invalid_cursor(self):
+        """Testuje błąd przy nieprawidłowym kursorze."""
+        response = client.get("/players/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+    
     def test_get_player(self):
         """Testuje pobieranie gracza po ID."""
         create_response = client.post("/players/", json={"username": "gettest"})
@@ -113,6 +164,20 @@ class TestGameAPI:
         })
         assert response.status_code == 400
     
+    def test_get_games_cursor_pagination(self):
+        """Testuje stronicowanie kursorowe listy gier."""
+        player_id = client.post("/players/", json={"username": "gamepages"}).json()["id"]
+        game_ids = [
+            client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()["id"]
+            for _ in range(3)
+        ]
+        
+        first = client.get("/games/", params={"limit": 2})
+        second = client.get("/games/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+        
+        assert [game["id"] for game in first.json() + second.json()] == game_ids
+        assert "X-Next-Cursor" not in second.headers
+    
     def test_get_game(self):
         """Testuje pobieranie gry."""
         player_response = client.post("/players/", json={"username": "getgame"})
@@ -165,6 +230,118 @@ class TestGameAPI:
             assert response.status_code == 200
             assert response.json()["status"] != "in_progress"
     
+    def test_game_settlement(self):
+        """Testuje rozliczenie salda i statystyk po zakończeniu gry."""
+        player_response = client.post("/players/", json={
+            "username": "settleplayer",
+            "initial_balance": 100
+        })
+        player_id = player_response.json()["id"]
+        
+        game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 10}).json()
+        if game["status"] == "in_progress":
+            game = client.post(f"/games/{game['id']}/action", json={
+                "action": "stand",
+                "player_id": player_id
+            }).json()
+        
+        expected_balance = {"player_won": 110, "dealer_won": 90, "tie": 100}[game["status"]]
+        player = client.get(f"/players/{player_id}").json()
+        assert player["balance"] == expected_balance
+        assert player["games_played"] == 1
+        assert player["games_won"] == (1 if game["status"] == "player_won" else 0)
+    
+    def test_game_settled_once(self):
+        """Testuje, że zakończonej gry nie można rozliczyć ponownie."""
+        player_response = client.post("/players/", json={"username": "settleonce"})
+        player_id = player_response.json()["id"]
+        game_id = client.post("/games/", json={"player1_id": player_id}).json()["id"]
+        
+        db = SessionLocal()
+        try:
+            db_game = db.get(models.Game, game_id)
+            if db_game.status == "in_progress":
+                crud.settle_game(db, db_game, "tie")
+                db.commit()
+            with pytest.raises(ValueError):
+                crud.settle_game(db, db.get(models.Game, game_id), "player_won")
+        finally:
+            db.close()
+        
+        assert client.get(f"/players/{player_id}").json()["games_played"] == 1
+    
+    def test_single_commit_per_request(self):
+        """Testuje, że każde żądanie zatwierdza transakcję co najwyżej raz."""
+        player_response = client.post("/players/", json={"username": "commitplayer"})
+        assert player_response.headers["X-DB-Commits"] == "1"
+        player_id = player_response.json()["id"]
+        
+        game_response = client.post("/games/", json={"player1_id": player_id})
+        assert game_response.headers["X-DB-Commits"] == "1"
+        
+        if game_response.json()["status"] == "in_progress":
+            action_response = client.post(f"/games/{game_response.json()['id']}/action", json={
+                "action": "stand",
+                "player_id": player_id
+            })
+            assert action_response.headers["X-DB-Commits"] == "1"
+    
+    def test_failed_request_rolls_back(self):
+        """Testuje wycofanie zmian, gdy żądanie kończy się błędem."""
+        response = client.post("/games/", json={"player1_id": 99999})
+        assert response.status_code == 400
+        assert response.headers["X-DB-Commits"] == "0"
+    
+    def test_game_advice(self):
+        """Testuje podpowiedź dla trwającej gry."""
+        player_response = client.post("/players/", json={"username": "adviceplayer"})
+        player_id = player_response.json()["id"]
+        
+        game_response = client.post("/games/", json={
+            "player1_id": player_id,
+            "bet_amount": 10
+        })
+        game = game_response.json()
+        
+        response = client.get(f"/games/{game['id']}/advice")
+        if game["status"] == "in_progress":
+            assert response.status_code == 200
+            data = response.json()
+            assert data["player_score"] == game["player_score"]
+            assert data["dealer_upcard"] == game["dealer_hand"][1]
+            assert data["recommendation"] in ("hit", "stand")
+        else:
+            assert response.status_code == 400
+    
+    def test_game_advice_not_found(self):
+        """Testuje błąd podpowiedzi gdy gra nie istnieje."""
+        response = client.get("/games/99999/advice")
+        assert response.status_code == 404
+    
+    def test_games_share_shoe(self):
+        """Testuje, że kolejne gry gracza dobierają karty z jednego sabotu."""
+        player_response = client.post("/players/", json={"username": "shoeplayer"})
+        player_id = player_response.json()["id"]
+        
+        game_ids = [
+            client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()["id"]
+            for _ in range(2)
+        ]
+        
+        db = SessionLocal()
+        try:
+            games = [db.get(models.Game, game_id) for game_id in game_ids]
+            assert games[0].shoe_id is not None
+            assert games[0].shoe_id == games[1].shoe_id
+            assert games[0].deck is None
+            shoe = games[0].shoe
+            dealt = sum(len(g.player_hand) + len(g.dealer_hand) for g in games)
+            assert shoe.order is None
+            assert shoe.seed is not None
+            assert shoe.position == dealt
+        finally:
+            db.close()
+    
     def test_delete_game(self):
         """Testuje usuwanie gry."""
         player_response = client.post("/players/", json={"username": "deletegame"})
@@ -180,6 +357,300 @@ class TestGameAPI:
         assert response.status_code == 200
 
 
+class TestCounts:
+    """Testy zliczania graczy i aktywnych gier."""
+    
+    def test_count_players_above_page_limit(self):
+        """Testuje, że liczba graczy nie jest ograniczona domyślnym limitem listy."""
+        db = SessionLocal()
+        try:
+            for i in range(105):
+                crud.create_player(db, schemas.PlayerCreate(username=f"count{i:03d}"))
+            db.commit()
+            assert crud.count_players(db) == 105
+        finally:
+            db.close()
+    
+    def test_count_active_games(self):
+        """Testuje zliczanie aktywnych gier."""
+        player_id = client.post("/players/", json={"username": "countgames"}).json()["id"]
+        statuses = [
+            client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()["status"]
+            for _ in range(3)
+        ]
+        
+        db = SessionLocal()
+        try:
+            assert crud.count_active_games(db) == statuses.count("in_progress")
+        finally:
+            db.close()
+
+
+class TestGameExport:
+    """Testy strumieniowego eksportu gier."""
+    
+    def _create_games(self, username, count):
+        """Tworzy gracza i kilka jego gier."""
+        player_id = client.post("/players/", json={"username": username}).json()["id"]
+        for _ in range(count):
+            client.post("/games/", json={"player1_id": player_id, "bet_amount": 1})
+        return player_id
+    
+    def test_export_ndjson(self):
+        """Testuje eksport w formacie NDJSON."""
+        self._create_games("exportjson", 3)
+        
+        response = client.get("/games/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+        assert len(rows) == 3
+        assert len(rows[0]["player_hand"]) >= 2
+    
+    def test_export_csv(self):
+        """Testuje eksport w formacie CSV."""
+        self._create_games("exportcsv", 2)
+        
+        response = client.get("/games/export", params={"format": "csv"})
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert json.loads(rows[0]["dealer_hand"])
+    
+    def test_export_filters(self):
+        """Testuje filtry eksportu."""
+        first_id = self._create_games("exportfirst", 2)
+        self._create_games("exportsecond", 1)
+        
+        by_player = client.get("/games/export", params={"player_id": first_id})
+        assert len(by_player.text.splitlines()) == 2
+        
+        active = client.get("/games/export", params={"status": "in_progress"})
+        assert all(json.loads(line)["status"] == "in_progress"
+                   for line in active.text.splitlines())
+        
+        future = client.get("/games/export", params={"since": "2999-01-01T00:00:00"})
+        assert future.text == ""
+    
+    def test_export_invalid_parameters(self):
+        """Testuje błędy przy nieprawidłowym formacie lub statusie."""
+        assert client.get("/games/export", params={"format": "xml"}).status_code == 400
+        assert client.get("/games/export", params={"status": "unknown"}).status_code == 400
+    
+    def test_export_streams_in_chunks(self):
+        """Testuje, że serializacja jest leniwa i dzielona na porcje."""
+        player_id = self._create_games("exportchunks", 3)
+        
+        original = export.CHUNK_ROWS
+        export.CHUNK_ROWS = 1
+        try:
+            chunks = list(export.stream_games("ndjson", player_id=player_id))
+        finally:
+            export.CHUNK_ROWS = original
+        assert len(chunks) == 3
+
+
+class TestLiveCounters:
+    """Testy liczników utrzymywanych przyrostowo."""
+    
+    def _counters(self):
+        """Zwraca liczniki z endpointu /health."""
+        return client.get("/health").json()["counters"]
+    
+    def test_counters_follow_changes(self):
+        """Testuje aktualizację liczników przy tworzeniu i usuwaniu rekordów."""
+        assert self._counters() == {
+            "active_games": 0, "finished_games": 0,
+            "total_players": 0, "total_wagered": 0
+        }
+        
+        player_id = client.post("/players/", json={"username": "livecount"}).json()["id"]
+        games = [
+            client.post("/games/", json={"player1_id": player_id, "bet_amount": 5}).json()
+            for _ in range(3)
+        ]
+        active = [g for g in games if g["status"] == "in_progress"]
+        if active:
+            client.post(f"/games/{active[0]['id']}/action", json={"action": "stand", "player_id": player_id})
+        client.delete(f"/games/{games[0]['id']}")
+        
+        db = SessionLocal()
+        try:
+            assert self._counters() == counters.compute_from_source(db)
+            assert counters.compute_from_source(db)[counters.TOTAL_WAGERED] == 10
+        finally:
+            db.close()
+    
+    def test_counters_unchanged_on_rollback(self):
+        """Testuje, że wycofana transakcja nie zmienia liczników."""
+        self._counters()
+        client.post("/players/", json={"username": "rollbackcount"})
+        client.post("/players/", json={"username": "rollbackcount"})
+        assert self._counters()["total_players"] == 1
+    
+    def test_repair_rebuilds_counters(self):
+        """Testuje odbudowę liczników z tabel źródłowych."""
+        client.post("/players/", json={"username": "repaircount"})
+        self._counters()
+        
+        db = SessionLocal()
+        try:
+            db.query(models.Stat).update({models.Stat.value: 999})
+            db.commit()
+        finally:
+            db.close()
+        
+        assert counters.repair()[counters.TOTAL_PLAYERS] == 1
+        assert self._counters()["total_players"] == 1
+    
+    def test_counter_beyond_int32(self):
+        """Testuje licznik o wartości przekraczającej zakres 32-bitowej liczby całkowitej."""
+        player_id = client.post("/players/", json={"username": "bigcount"}).json()["id"]
+        self._counters()
+        
+        db = SessionLocal()
+        try:
+            db.query(models.Stat).filter(models.Stat.key == counters.TOTAL_WAGERED).update(
+                {models.Stat.value: 5_000_000_000}
+            )
+            db.commit()
+        finally:
+            db.close()
+        counters.reset()
+        client.post("/games/", json={"player1_id": player_id, "bet_amount": 5})
+        
+        assert self._counters()["total_wagered"] == 5_000_000_005
+    
+    def test_counters_load_skips_concurrent_commit(self):
+        """Testuje, że zmiana zatwierdzona w trakcie wczytywania liczników nie przepada."""
+        client.post("/players/", json={"username": "loadcount1"})
+        self._counters()
+        counters.reset()
+        
+        def commit_player(conn, cursor, statement, parameters, context, executemany):
+            if "FROM stats" in statement and not committed:
+                committed.append(True)
+                db = SessionLocal()
+                try:
+                    crud.create_player(db, schemas.PlayerCreate(username="loadcount2"))
+                    db.commit()
+                finally:
+                    db.close()
+        
+        committed = []
+        # Baza w pamięci nie ma izolacji migawkowej - odczyt widzi już nowego gracza.
+        snapshot = 2 if MEMORY else 1
+        db = SessionLocal()
+        event.listen(engine, "after_cursor_execute", commit_player)
+        try:
+            assert counters.get_counters(db)[counters.TOTAL_PLAYERS] == snapshot
+        finally:
+            event.remove(engine, "after_cursor_execute", commit_player)
+            db.close()
+        
+        assert committed
+        assert self._counters()["total_players"] == 2
+        assert self._counters()["total_players"] == 2
+    
+    def test_rebuild_does_not_commit_caller_session(self):
+        """Testuje odbudowę liczników w osobnej transakcji."""
+        client.post("/players/", json={"username": "rebuildcount"})
+        db = SessionLocal()
+        try:
+            db.query(models.Stat).delete()
+            db.commit()
+            commits = []
+            event.listen(db, "after_commit", commits.append)
+            
+            assert counters.get_counters(db)[counters.TOTAL_PLAYERS] == 1
+            assert commits == []
+        finally:
+            db.close()
+        assert self._counters()["total_players"] == 1
+
+
+class TestAsyncDatabase:
+    """Testy asynchronicznej warstwy bazy danych."""
+    
+    def test_routes_are_async(self):
+        """Testuje, że endpointy korzystające z bazy nie używają puli wątków."""
+        sync_routes = {"/games/export", "/games/{game_id}/advice", "/", "/api"}
+        for route in app.routes:
+            if isinstance(route, APIRoute) and route.path not in sync_routes:
+                assert asyncio.iscoroutinefunction(route.endpoint), route.path
+    
+    def test_concurrent_requests(self):
+        """Testuje wiele równoległych żądań obsługiwanych w jednej pętli zdarzeń."""
+        async def play(http, i):
+            player = (await http.post("/players/", json={"username": f"asyncplayer{i}"})).json()
+            game = (await http.post("/games/", json={"player1_id": player["id"],
+                                                     "bet_amount": 10})).json()
+            if game["status"] == "in_progress":
+                game = (await http.post(f"/games/{game['id']}/action",
+                                        json={"action": "stand", "player_id": player["id"]})).json()
+            return game
+        
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await asyncio.gather(*(play(http, i) for i in range(20)))
+        
+        games = asyncio.run(run())
+        
+        assert all(game["status"] != "in_progress" for game in games)
+        assert len({game["id"] for game in games}) == 20
+        assert self._finished_games() == 20
+    
+    def _finished_games(self):
+        """Zwraca licznik zakończonych gier."""
+        return client.get("/health").json()["counters"]["finished_games"]
+
+
+class TestStatusWebSocket:
+    """Testy dla WebSocket ze statusem serwera."""
+    
+    def test_status_message(self):
+        """Testuje komunikat ze statusem serwera."""
+        client.post("/players/", json={"username": "wsplayer"})
+        
+        with TestClient(app) as ws_client:
+            with ws_client.websocket_connect("/ws/status") as websocket:
+                data = websocket.receive_json()
+        
+        assert data["status"] == "online"
+        assert data["total_players"] == 1
+        assert data["active_games"] >= 0
+    
+    def test_status_shared_between_clients(self):
+        """Testuje, że wszyscy klienci dostają ten sam komunikat."""
+        with TestClient(app) as ws_client:
+            with ws_client.websocket_connect("/ws/status") as first:
+                with ws_client.websocket_connect("/ws/status") as second:
+                    assert first.receive_text() == second.receive_text()
+                    assert status_broadcaster.subscriber_count == 2
+    
+    def test_broadcaster_survives_compute_error(self):
+        """Testuje, że błąd obliczenia statusu pomija takt, a nie kończy nadawania."""
+        calls = []
+        
+        def compute():
+            calls.append(None)
+            if len(calls) == 1:
+                raise RuntimeError("baza niedostępna")
+            return "ok"
+        
+        async def run():
+            broadcaster = StatusBroadcaster(compute, interval=0.01)
+            subscriber = broadcaster.subscribe()
+            try:
+                return await asyncio.wait_for(subscriber.queue.get(), 5), broadcaster.failures
+            finally:
+                await broadcaster.stop()
+        
+        assert asyncio.run(run()) == ("ok", 1)
+
+
 class TestHealthEndpoints:
     """Testy dla endpointów informacyjnych."""
     
@@ -202,3 +673,4 @@ class TestHealthEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
+        assert {"depth", "capacity", "refill_rate"} <= set(data["deck_pool"])
@@ -0,0 +1,173 @@
+"""
+Testy archiwizacji zakończonych gier.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+from app import archiver as archiver_module
+from app import counters, models
+from app.archiver import Archiver
+from app.database import DIALECT, Base, SessionLocal, engine
+from app.game_store import game_store
+from app.main import app
+from app.write_queue import write_queue
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Przygotowuje bazę danych przed każdym testem."""
+    Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+
+
+client = TestClient(app)
+
+
+def _player(name):
+    """Tworzy gracza i zwraca jego ID."""
+    return client.post("/players/", json={"username": name}).json()["id"]
+
+
+def _finished_game(player_id):
+    """Rozgrywa grę do końca i zwraca jej stan."""
+    game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 10}).json()
+    if game["status"] == "in_progress":
+        game = client.post(f"/games/{game['id']}/action",
+                           json={"action": "stand", "player_id": player_id}).json()
+    return game
+
+
+def _age(game_ids, days=40):
+    """Przesuwa datę zakończenia gier w przeszłość."""
+    db = SessionLocal()
+    try:
+        db.execute(update(models.Game).where(models.Game.id.in_(game_ids))
+                   .values(finished_at=datetime.utcnow() - timedelta(days=days)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _count(model, *where):
+    """Liczy wiersze tabeli."""
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(model).where(*where))
+    finally:
+        db.close()
+
+
+class TestArchiver:
+    """Testy przenoszenia gier do archiwum."""
+
+    def test_archives_old_finished_games(self):
+        """Testuje przeniesienie starych gier bez zmiany ich odczytu przez API."""
+        player_id = _player("archived")
+        old = [_finished_game(player_id) for _ in range(3)]
+        recent = _finished_game(player_id)
+        _age([game["id"] for game in old])
+        before = {game["id"]: client.get(f"/games/{game['id']}").json() for game in old}
+
+        assert Archiver(3600, 30, 500).run_once() == 3
+
+        assert _count(models.Game) == 1
+        assert _count(models.GameArchive) == 3
+        assert _count(models.GameEvent, models.GameEvent.game_id.in_(before)) == 0
+        assert _count(models.GameEvent, models.GameEvent.game_id == recent["id"]) > 0
+        for game_id, game in before.items():
+            assert client.get(f"/games/{game_id}").json() == game
+        assert client.get(f"/games/{old[0]['id']}/events").status_code == 404
+
+    def test_in_progress_and_recent_games_kept(self):
+        """Testuje, że trwające i niedawno zakończone gry zostają w tabeli gier."""
+        player_id = _player("kept")
+        _finished_game(player_id)
+        _finished_game(player_id)
+        client.post("/games/", json={"player1_id": player_id, "bet_amount": 10})
+
+        assert Archiver(3600, 30, 500).run_once() == 0
+        assert _count(models.Game) == 3
+        assert _count(models.GameArchive) == 0
+
+    def test_archives_in_batches(self):
+        """Testuje przenoszenie gier partiami zlecanymi wątkowi piszącemu."""
+        player_id = _player("batched")
+        _age([_finished_game(player_id)["id"] for _ in range(5)])
+        archiver = Archiver(3600, 30, 2)
+        writes = write_queue.stats()["writes"]
+
+        assert archiver.run_once() == 5
+        assert write_queue.stats()["writes"] - writes == 3
+        assert archiver.stats() == {"runs": 1, "batches": 3, "archived_games": 5, "failures": 0}
+        assert _count(models.GameArchive) == 5
+
+    def test_counters_include_archive(self):
+        """Testuje, że archiwizacja nie zmienia liczników gier."""
+        player_id = _player("counted")
+        _age([_finished_game(player_id)["id"] for _ in range(3)])
+        before = client.get("/health").json()["counters"]
+
+        Archiver(3600, 30, 500).run_once()
+
+        assert client.get("/health").json()["counters"] == before
+        counters.reset()
+        assert counters.repair() == {
+            counters.ACTIVE_GAMES: before["active_games"],
+            counters.FINISHED_GAMES: before["finished_games"],
+            counters.TOTAL_PLAYERS: before["total_players"],
+            counters.TOTAL_WAGERED: before["total_wagered"]
+        }
+
+    def test_compact_hands(self):
+        """Testuje kodowanie rąk jako indeksów kart."""
+        hand = [{"suit": "hearts", "rank": "A", "value": 11},
+                {"suit": "spades", "rank": "10", "value": 10}]
+
+        encoded = archiver_module.encode_hand(hand)
+
+        assert len(encoded) == 2
+        assert archiver_module.decode_hand(encoded) == hand
+        assert archiver_module.encode_hand(None) == b""
+
+    def test_settlement_clears_deck(self):
+        """Testuje usunięcie talii z wiersza rozliczonej gry."""
+        player_id = _player("nodeck")
+        game = _finished_game(player_id)
+
+        assert _count(models.Game, models.Game.id == game["id"], models.Game.deck.is_(None)) == 1
+
+    def test_background_failure_counted(self, monkeypatch):
+        """Testuje, że błąd przebiegu w tle jest liczony i nie przerywa wątku."""
+        def fail(db, cutoff, batch_size):
+            raise RuntimeError("archiwum niedostępne")
+
+        monkeypatch.setattr(archiver_module, "archive_batch", fail)
+        archiver = Archiver(3600, 30, 500)
+
+        archiver._archive_in_background()
+
+        assert archiver.stats()["failures"] == 1
+
+    @pytest.mark.skipif(DIALECT != "postgresql", reason="blokady wierszy PostgreSQL")
+    def test_locked_rows_skipped(self):
+        """Testuje pominięcie gier zablokowanych przez inną transakcję."""
+        player_id = _player("lockedarchive")
+        games = [_finished_game(player_id)["id"] for _ in range(2)]
+        _age(games)
+        db = SessionLocal()
+        try:
+            db.execute(select(models.Game).where(models.Game.id == games[0]).with_for_update())
+
+            assert Archiver(3600, 30, 500).run_once() == 1
+        finally:
+            db.close()
+        assert _count(models.Game) == 1
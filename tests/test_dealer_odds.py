@@ -0,0 +1,162 @@
+"""
+Testy dokładnych prawdopodobieństw wyniku krupiera.
+"""
+
+import itertools
+import random
+import time
+import timeit
+from collections import Counter
+
+import pytest
+
+from app.advisor import (
+    MAX_TRUE_COUNT, advise, bucket_composition, precompute_common_states, true_count
+)
+from app.dealer_odds import (
+    BUST, FULL_DECK, composition_from_cards, dealer_outcome_distribution
+)
+from app.game_logic import BlackjackGame, Card, Deck, Hand, Shoe
+
+
+def brute_force_distribution(upcard, cards):
+    """Liczy rozkład przez rozegranie tury krupiera dla każdej permutacji kart."""
+    outcomes = Counter()
+    permutations = list(itertools.permutations(cards))
+    for order in permutations:
+        deck = Deck.from_list([])
+        deck.cards = list(reversed(order))
+        game = BlackjackGame(deck=deck, dealer_hand=Hand([upcard]))
+        game.dealer_hand.add_card(game.deck.draw())
+        game._dealer_play()
+        score = game.dealer_hand.calculate_score()
+        outcomes[BUST if score > 21 else score] += 1
+    return {key: count / len(permutations) for key, count in outcomes.items()}
+
+
+class TestDealerOdds:
+    """Testy dla modułu dealer_odds."""
+    
+    def test_full_deck_composition(self):
+        """Testuje skład pełnej talii."""
+        assert FULL_DECK == (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+    
+    @pytest.mark.parametrize("rank", ["A", "2", "6", "10"])
+    def test_distribution_sums_to_one(self, rank):
+        """Testuje, że prawdopodobieństwa sumują się do 1."""
+        distribution = dealer_outcome_distribution(Card("hearts", rank))
+        assert sum(distribution.values()) == pytest.approx(1.0)
+        assert set(distribution) >= {17, 18, 19, 20, 21, BUST}
+    
+    @pytest.mark.parametrize("upcard, ranks", [
+        (Card("hearts", "6"), ["2", "3", "5", "10", "A", "7", "4"]),
+        (Card("hearts", "A"), ["A", "5", "6", "10", "K", "2", "3"]),
+        (Card("hearts", "10"), ["A", "2", "2", "3", "9", "4", "6"]),
+    ])
+    def test_matches_brute_force(self, upcard, ranks):
+        """Testuje zgodność z rozegraniem wszystkich permutacji kart."""
+        cards = [Card(suit, rank) for suit, rank in zip(itertools.cycle(
+            ["clubs", "spades", "diamonds"]), ranks)]
+        expected = brute_force_distribution(upcard, cards)
+        distribution = dealer_outcome_distribution(upcard, composition_from_cards(cards))
+        
+        for key in set(expected) | set(distribution):
+            assert distribution.get(key, 0.0) == pytest.approx(expected.get(key, 0.0))
+    
+    def test_exclude_blackjack(self):
+        """Testuje pominięcie Blackjacka krupiera."""
+        distribution = dealer_outcome_distribution(
+            Card("hearts", "A"), exclude_blackjack=True
+        )
+        full = dealer_outcome_distribution(Card("hearts", "A"))
+        assert sum(distribution.values()) == pytest.approx(1.0)
+        assert distribution[21] < full[21]
+    
+    def test_cached_query_is_fast(self):
+        """Testuje, że powtórne zapytanie korzysta z pamięci podręcznej."""
+        upcard = Card("spades", "7")
+        dealer_outcome_distribution(upcard)
+        elapsed = min(timeit.repeat(lambda: dealer_outcome_distribution(upcard),
+                                    number=1000, repeat=3)) / 1000
+        assert elapsed < 1e-4
+
+
+class TestAdvisor:
+    """Testy dla doradcy decyzji hit/stand."""
+    
+    @staticmethod
+    def unseen(*seen):
+        """Zwraca karty pełnej talii bez podanych kart."""
+        return [card for card in Deck().cards if card not in seen]
+    
+    def test_stand_on_20(self):
+        """Testuje zalecenie pasowania przy 20 punktach."""
+        player = [Card("hearts", "K"), Card("spades", "Q")]
+        upcard = Card("clubs", "6")
+        advice = advise(player, upcard, self.unseen(*player, upcard))
+        assert advice.player_score == 20
+        assert advice.recommendation == "stand"
+        assert advice.stand_ev > advice.hit_ev
+    
+    def test_hit_on_low_total(self):
+        """Testuje zalecenie dobrania przy niskim wyniku."""
+        player = [Card("hearts", "2"), Card("spades", "3")]
+        upcard = Card("clubs", "10")
+        advice = advise(player, upcard, self.unseen(*player, upcard))
+        assert advice.recommendation == "hit"
+        assert -1.0 <= advice.stand_ev <= 1.0
+        assert -1.0 <= advice.hit_ev <= 1.0
+    
+    def test_stand_ev_matches_dealer_distribution(self):
+        """Testuje zgodność EV pasowania z rozkładem wyniku krupiera dla składu przedziału."""
+        player = [Card("hearts", "10"), Card("spades", "8")]
+        upcard = Card("clubs", "9")
+        unseen = self.unseen(*player, upcard)
+        composition = bucket_composition(true_count(composition_from_cards(unseen)))
+        distribution = dealer_outcome_distribution(upcard, composition, exclude_blackjack=True)
+        expected = distribution[BUST] + distribution[17] - sum(
+            distribution[score] for score in (19, 20, 21)
+        )
+        assert advise(player, upcard, unseen).stand_ev == pytest.approx(expected)
+    
+    def test_true_count_buckets(self):
+        """Testuje przedziały prawdziwej liczby i ich składy wzorcowe."""
+        full = tuple(count * 6 for count in FULL_DECK)
+        rich = full[:1] + tuple(count - 2 for count in full[1:6]) + full[6:]
+        
+        assert true_count(full) == 0
+        assert true_count(rich) == 2
+        assert true_count(rich[:9] + (0,)) == -MAX_TRUE_COUNT
+        for count in range(-MAX_TRUE_COUNT, MAX_TRUE_COUNT + 1):
+            assert true_count(bucket_composition(count)) == count
+    
+    def test_advice_follows_count(self):
+        """Testuje, że sabot bogaty w wysokie karty zmienia zalecenie dla 12 przeciw 3."""
+        player = [Card("hearts", "10"), Card("spades", "2")]
+        upcard = Card("clubs", "3")
+        low = [Card("diamonds", rank) for rank in ("2", "3", "4", "5", "6")]
+        
+        neutral = advise(player, upcard, Shoe(6).cards)
+        rich = advise(player, upcard, [card for card in Shoe(6).cards if card not in low])
+        
+        assert neutral.recommendation == "hit"
+        assert rich.recommendation == "stand"
+    
+    def test_cold_path_latency(self):
+        """Testuje czas zapytania dla stanów z prawdziwych sabotów po obliczeniu stanów przy starcie."""
+        precompute_common_states()
+        rng = random.Random(5)
+        timings = []
+        for _ in range(300):
+            shoe = Shoe(6)
+            shoe.shuffle(rng.randrange(1 << 30))
+            for _ in range(rng.randrange(230)):
+                shoe.draw()
+            player = [shoe.draw(), shoe.draw()]
+            upcard = shoe.draw()
+            unseen = shoe.cards + [shoe.draw()]
+            start = time.perf_counter()
+            advise(player, upcard, unseen)
+            timings.append(time.perf_counter() - start)
+        
+        assert sorted(timings)[int(len(timings) * 0.99)] < 0.002
@@ -0,0 +1,48 @@
+"""
+Testy puli sabotów tasowanych w tle.
+"""
+
+import time
+
+from app.deck_pool import DeckPool
+from app.game_logic import Shoe
+
+
+class TestDeckPool:
+    """Testy dla klasy DeckPool."""
+    
+    def test_take_from_empty_pool(self):
+        """Testuje pobieranie z pustej puli."""
+        pool = DeckPool(num_decks=1, capacity=2)
+        assert pool.take() is None
+        assert pool.stats()["misses"] == 1
+    
+    def test_fill_and_take(self):
+        """Testuje wypełnianie puli i pobieranie sabotów."""
+        pool = DeckPool(num_decks=2, capacity=3)
+        pool.fill()
+        assert pool.stats()["depth"] == 3
+        
+        seed, order = pool.take()
+        assert len(order) == 104
+        assert sorted(Shoe.from_bytes(order).cards, key=lambda c: c.index) == \
+            sorted(Shoe(num_decks=2).cards, key=lambda c: c.index)
+        assert Shoe.from_seed(seed, num_decks=2).order == order
+        
+        stats = pool.stats()
+        assert stats["depth"] == 2
+        assert stats["taken"] == 1
+        assert stats["refill_rate"] > 0
+    
+    def test_background_refill(self):
+        """Testuje uzupełnianie puli przez wątek w tle."""
+        pool = DeckPool(num_decks=1, capacity=4)
+        pool.start()
+        try:
+            deadline = time.monotonic() + 2
+            while pool.stats()["depth"] < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert pool.stats()["depth"] == 4
+            assert pool.take() is not None
+        finally:
+            pool.stop()
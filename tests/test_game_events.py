@@ -0,0 +1,215 @@
+"""
+Testy dziennika zdarzeń gier i migawek.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base, SessionLocal, engine
+from app.game_store import game_store
+from app.game_logic import Card, Hand
+from app import config, counters, game_events, models, replay_verify
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Przygotowuje bazę danych przed każdym testem."""
+    Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+
+
+client = TestClient(app)
+
+
+def _play_to_end(username):
+    """Rozgrywa grę do końca (hit przy wyniku poniżej 12, potem stand)."""
+    player_id = client.post("/players/", json={"username": username}).json()["id"]
+    game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()
+    while game["status"] == "in_progress":
+        action = "hit" if game["player_score"] < 12 else "stand"
+        game = client.post(f"/games/{game['id']}/action",
+                           json={"action": action, "player_id": player_id}).json()
+    return game
+
+
+class TestGameEvents:
+    """Testy dziennika zdarzeń gier."""
+
+    def test_events_log(self):
+        """Testuje kompletny dziennik zdarzeń zakończonej gry."""
+        game = _play_to_end("eventplayer")
+
+        events = client.get(f"/games/{game['id']}/events").json()
+
+        assert [event["seq"] for event in events] == list(range(1, len(events) + 1))
+        assert events[0]["type"] == "created"
+        assert len(events[0]["cards"]) == 4
+        assert events[-1]["type"] == "settled"
+        assert events[-1]["detail"] == game["status"]
+        drawn = sum(len(event["cards"]) for event in events)
+        assert drawn == len(game["player_hand"]) + len(game["dealer_hand"])
+
+    def test_events_not_found(self):
+        """Testuje błąd gdy gra nie istnieje."""
+        assert client.get("/games/99999/events").status_code == 404
+
+    def test_replay_matches_game(self):
+        """Testuje, że odtworzenie zdarzeń od początku daje stan z wiersza gry."""
+        for i in range(5):
+            game = _play_to_end(f"replayplayer{i}")
+            db = SessionLocal()
+            try:
+                replayed = game_events.replay(game_events.get_events(db, game["id"]))
+            finally:
+                db.close()
+            assert replayed.player_hand.to_list() == game["player_hand"]
+            assert replayed.dealer_hand.to_list() == game["dealer_hand"]
+            assert replayed.determine_winner() == game["status"]
+
+    def test_pending_events_listed(self):
+        """Testuje, że dziennik zawiera zdarzenia czekające na zapis w tle."""
+        player_id = client.post("/players/", json={"username": "pendingplayer"}).json()["id"]
+        for _ in range(50):
+            game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()
+            if game["status"] == "in_progress" and game["player_score"] < 12:
+                break
+        else:
+            pytest.skip("Nie udało się uzyskać trwającej gry")
+
+        client.post(f"/games/{game['id']}/action", json={"action": "hit", "player_id": player_id})
+        events = client.get(f"/games/{game['id']}/events").json()
+
+        assert [event["type"] for event in events] == ["created", "hit"]
+        assert events[1]["created_at"] is None
+
+    def test_snapshot_bounds_replay(self, monkeypatch):
+        """Testuje odświeżanie migawki i odtwarzanie stanu od migawki."""
+        monkeypatch.setattr(config, "GAME_SNAPSHOT_INTERVAL", 1)
+        player_id = client.post("/players/", json={"username": "snapplayer"}).json()["id"]
+        for _ in range(50):
+            game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()
+            if game["status"] == "in_progress" and game["player_score"] < 12:
+                break
+        else:
+            pytest.skip("Nie udało się uzyskać trwającej gry")
+
+        hit = client.post(f"/games/{game['id']}/action",
+                          json={"action": "hit", "player_id": player_id}).json()
+        game_store.flush()
+
+        db = SessionLocal()
+        try:
+            db_game = db.get(models.Game, game["id"])
+            assert db_game.snapshot_seq == 2
+            assert db_game.player_hand == hit["player_hand"]
+            assert game_events.get_events(db, game["id"], db_game.snapshot_seq) == []
+        finally:
+            db.close()
+
+
+class TestReplay:
+    """Testy odtwarzania gry ze zdarzeń."""
+
+    def _event(self, seq, event_type, cards=(), detail=None):
+        """Tworzy zdarzenie w pamięci."""
+        return models.GameEvent(**game_events.make_event(1, seq, event_type, cards, detail))
+
+    def test_replay_from_snapshot(self):
+        """Testuje odtworzenie gry z migawki i późniejszych zdarzeń."""
+        ten, six, nine, seven = (Card("hearts", "10"), Card("spades", "6"),
+                                 Card("clubs", "9"), Card("diamonds", "7"))
+        player_hand = Hand([ten, six])
+        dealer_hand = Hand([nine, seven])
+
+        game = game_events.replay(
+            [self._event(2, "hit", [Card("clubs", "4")]),
+             self._event(3, "stand", [Card("hearts", "2")]),
+             self._event(4, "settled", detail="player_won")],
+            player_hand, dealer_hand
+        )
+
+        assert game.player_hand.calculate_score() == 20
+        assert game.dealer_hand.calculate_score() == 18
+        assert game.determine_winner() == "player_won"
+
+    def test_replay_rejects_inconsistent_events(self):
+        """Testuje wykrycie zdarzeń niespójnych z przebiegiem gry."""
+        with pytest.raises(ValueError):
+            game_events.replay(
+                [self._event(2, "stand", [Card("hearts", "2"), Card("hearts", "3")])],
+                Hand([Card("hearts", "10"), Card("spades", "7")]),
+                Hand([Card("clubs", "10"), Card("clubs", "8")])
+            )
+
+
+class TestReplayCode:
+    """Testy zwięzłego kodu odtworzenia gry."""
+
+    def test_replay_code_matches_game(self):
+        """Testuje odtworzenie zakończonych gier z kodu."""
+        for i in range(5):
+            game = _play_to_end(f"codeplayer{i}")
+            response = client.get(f"/games/{game['id']}/replay")
+            assert response.status_code == 200
+            code = response.json()["code"]
+            assert len(code) < 64
+
+            replayed = game_events.replay_code(code)
+            assert replayed.player_hand.to_list() == game["player_hand"]
+            assert replayed.dealer_hand.to_list() == game["dealer_hand"]
+            assert replayed.determine_winner() == game["status"]
+
+    def test_replay_code_roundtrip(self):
+        """Testuje zapis i odczyt kodu odtworzenia."""
+        events = [models.GameEvent(**game_events.make_event(1, 1, "created", position=0)),
+                  models.GameEvent(**game_events.make_event(1, 2, "hit", position=9)),
+                  models.GameEvent(**game_events.make_event(1, 3, "settled", detail="tie"))]
+
+        code = game_events.encode_replay(123, 6, events)
+
+        assert code == "v1.123.6.c0,h9"
+        assert game_events.decode_replay(code) == (123, 6, [("created", 0), ("hit", 9)])
+
+    def test_replay_code_invalid(self):
+        """Testuje odrzucenie nieprawidłowego kodu i zdarzeń bez pozycji."""
+        for code in ("", "v2.1.6.c0", "v1.x.6.c0", "v1.1.6.x0"):
+            with pytest.raises(ValueError):
+                game_events.decode_replay(code)
+        with pytest.raises(ValueError):
+            game_events.encode_replay(1, 6, [models.GameEvent(**game_events.make_event(1, 1, "created"))])
+
+    def test_replay_not_found(self):
+        """Testuje błąd gdy gra nie istnieje."""
+        assert client.get("/games/99999/replay").status_code == 404
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_verify_games(self, workers):
+        """Testuje masową weryfikację zakończonych gier."""
+        for i in range(4):
+            _play_to_end(f"verifyplayer{i}")
+
+        result = replay_verify.verify_games(workers=workers, batch_size=3)
+
+        assert result.checked == 4
+        assert result.skipped == 0
+        assert result.mismatched == []
+
+    def test_verify_detects_mismatch(self):
+        """Testuje wykrycie gry niezgodnej z kodem odtworzenia."""
+        game = _play_to_end("tamperplayer")
+        db = SessionLocal()
+        try:
+            db.get(models.Game, game["id"]).player_hand = [{"suit": "hearts", "rank": "A"}]
+            db.commit()
+        finally:
+            db.close()
+
+        result = replay_verify.verify_games(workers=1)
+
+        assert result.mismatched == [game["id"]]
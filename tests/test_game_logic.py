@@ -3,7 +3,7 @@ Testy jednostkowe dla logiki gry Blackjack.
 """
 
 import pytest
-from app.game_logic import Card, Deck, Hand, BlackjackGame
+from app.game_logic import Card, Deck, Hand, Shoe, BlackjackGame, splitmix64
 
 
 class TestCard:
@@ -49,6 +49,24 @@ class TestCard:
         card = Card.from_dict(data)
         assert card.suit == "diamonds"
         assert card.rank == "7"
+    
+    def test_card_interned(self):
+        """Testuje, że ta sama karta jest zawsze tą samą instancją."""
+        assert Card("hearts", "A") is Card("hearts", "A")
+        assert Card.from_dict({"suit": "hearts", "rank": "A"}) is Card("hearts", "A")
+    
+    def test_card_immutable(self):
+        """Testuje niezmienność karty."""
+        card = Card("clubs", "5")
+        with pytest.raises(AttributeError):
+            card.rank = "6"
+    
+    def test_card_index_roundtrip(self):
+        """Testuje konwersję karty do indeksu 0-51 i z powrotem."""
+        indices = {card.index for card in Deck().cards}
+        assert indices == set(range(52))
+        for index in range(52):
+            assert Card.from_index(index).index == index
 
 
 class TestDeck:
@@ -68,6 +86,15 @@ class TestDeck:
         cards2 = [str(c) for c in deck2.cards]
         assert cards1 != cards2
     
+    def test_deck_shuffle_seed(self):
+        """Testuje powtarzalność tasowania z tym samym ziarnem."""
+        deck1 = Deck()
+        deck2 = Deck()
+        deck1.shuffle(seed=42)
+        deck2.shuffle(seed=42)
+        assert deck1.seed == 42
+        assert deck1.cards == deck2.cards
+    
     def test_deck_draw(self):
         """Testuje dobieranie karty."""
         deck = Deck()
@@ -98,6 +125,76 @@ class TestDeck:
         assert len(deck2) == 52
 
 
+class TestShoe:
+    """Testy dla klasy Shoe."""
+    
+    def test_shoe_creation(self):
+        """Testuje tworzenie sabotu z kilku talii."""
+        shoe = Shoe(num_decks=6, penetration=0.75)
+        assert len(shoe) == 312
+        assert shoe.cut_card == 78
+        assert shoe.needs_shuffle() is False
+    
+    def test_shoe_cut_card(self):
+        """Testuje dojście do karty odcięcia."""
+        shoe = Shoe(num_decks=1, penetration=0.5)
+        for _ in range(25):
+            shoe.draw()
+        assert shoe.needs_shuffle() is False
+        shoe.draw()
+        assert shoe.needs_shuffle() is True
+    
+    def test_shoe_invalid_parameters(self):
+        """Testuje błąd dla nieprawidłowych parametrów sabotu."""
+        with pytest.raises(ValueError):
+            Shoe(num_decks=0)
+        with pytest.raises(ValueError):
+            Shoe(penetration=1.5)
+    
+    def test_shoe_from_list(self):
+        """Testuje odtwarzanie sabotu z listy."""
+        shoe = Shoe(num_decks=2)
+        restored = Shoe.from_list(shoe.to_list(), shoe.num_decks, shoe.cut_card)
+        assert len(restored) == 104
+        assert restored.cut_card == shoe.cut_card
+    
+    def test_shoe_from_bytes(self):
+        """Testuje odtwarzanie sabotu z kolejności kart i kursora."""
+        shoe = Shoe(num_decks=1)
+        shoe.shuffle()
+        drawn = [shoe.draw() for _ in range(5)]
+        
+        restored = Shoe.from_bytes(shoe.order, shoe.position, shoe.num_decks, shoe.cut_card)
+        assert len(shoe.order) == 52
+        assert len(restored) == 47
+        assert restored.draw() is shoe.draw()
+        assert Shoe.from_bytes(shoe.order).cards[:5] == drawn
+    
+    def test_shoe_from_seed(self):
+        """Testuje odtwarzanie sabotu z ziarna tasowania."""
+        shoe = Shoe(num_decks=6)
+        shoe.shuffle()
+        assert shoe.seed is not None
+        
+        restored = Shoe.from_seed(shoe.seed, 10, shoe.num_decks, shoe.cut_card)
+        assert restored.order == shoe.order
+        assert len(restored) == 302
+        assert sorted(restored.order) == sorted(Shoe(num_decks=6).order)
+    
+    def test_splitmix64_reference(self):
+        """Testuje generator na wektorze referencyjnym SplitMix64."""
+        numbers = splitmix64(1234567)
+        assert [next(numbers) for _ in range(5)] == [
+            6457827717110365317, 3203168211198807973, 9817491932198370423,
+            4593380528125082431, 16408922859458223821
+        ]
+    
+    def test_shoe_shuffle_golden(self):
+        """Testuje niezmienność kolejności kart dla znanego ziarna (format kodu odtworzenia)."""
+        assert list(Shoe.from_seed(42, 0, 1).order[:12]) == [6, 28, 12, 39, 40, 0, 26, 25, 22, 4, 46, 36]
+        assert list(Shoe.from_seed(42, 0, 6).order[:12]) == [45, 51, 14, 11, 6, 32, 2, 32, 5, 19, 45, 16]
+
+
 class TestHand:
     """Testy dla klasy Hand."""
     
@@ -136,6 +233,24 @@ class TestHand:
         hand.add_card(Card("clubs", "8"))
         assert hand.calculate_score() == 21
     
+    def test_hand_is_soft(self):
+        """Testuje rozpoznawanie miękkiej ręki."""
+        hand = Hand([Card("hearts", "A"), Card("spades", "6")])
+        assert hand.calculate_score() == 17
+        assert hand.is_soft() is True
+        hand.add_card(Card("clubs", "10"))
+        assert hand.calculate_score() == 17
+        assert hand.is_soft() is False
+    
+    def test_hand_from_list_score(self):
+        """Testuje wynik ręki odtworzonej z listy."""
+        hand = Hand.from_list([
+            {"suit": "hearts", "rank": "A"},
+            {"suit": "spades", "rank": "A"},
+            {"suit": "clubs", "rank": "9"}
+        ])
+        assert hand.calculate_score() == 21
+    
     def test_hand_is_blackjack(self):
         """Testuje sprawdzanie Blackjacka."""
         hand = Hand()
@@ -185,7 +300,9 @@ class TestBlackjackGame:
     
     def test_game_player_hit(self):
         """Testuje dobieranie karty przez gracza."""
-        game = BlackjackGame()
+        deck = Deck()
+        deck.shuffle(seed=2)
+        game = BlackjackGame(deck=deck)
         game.deal_initial_cards()
         initial_count = len(game.player_hand)
         card = game.player_hit()
@@ -194,7 +311,9 @@ class TestBlackjackGame:
     
     def test_game_player_stand(self):
         """Testuje pasowanie gracza."""
-        game = BlackjackGame()
+        deck = Deck()
+        deck.shuffle(seed=1)
+        game = BlackjackGame(deck=deck)
         game.deal_initial_cards()
         game.player_stand()
         assert game.player_stood is True
@@ -0,0 +1,282 @@
+"""
+Testy magazynu trwających gier w pamięci.
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.main import app
+from app.database import Base, SessionLocal, async_engine, engine
+from app import game_store as game_store_module
+from app.game_store import game_store
+from app import counters, crud, game_events, models
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Przygotowuje bazę danych przed każdym testem."""
+    Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+
+
+client = TestClient(app)
+
+
+def _hit_in_progress_game(username):
+    """Tworzy grę i dobiera kartę tak, by gra nadal trwała."""
+    player_id = client.post("/players/", json={"username": username}).json()["id"]
+    for _ in range(50):
+        game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 1}).json()
+        if game["status"] != "in_progress":
+            continue
+        hit = client.post(f"/games/{game['id']}/action",
+                          json={"action": "hit", "player_id": player_id}).json()
+        if hit["status"] == "in_progress":
+            return player_id, hit
+    pytest.fail("Nie udało się uzyskać trwającej gry")
+
+
+def _db_game(game_id):
+    """Pobiera wiersz gry bezpośrednio z bazy."""
+    db = SessionLocal()
+    try:
+        return db.get(models.Game, game_id)
+    finally:
+        db.close()
+
+
+class TestGameStore:
+    """Testy magazynu gier z zapisem w tle."""
+
+    def test_action_served_from_memory(self):
+        """Testuje, że akcja w trwającej grze nie czyta wiersza gry."""
+        player_id, game = _hit_in_progress_game("hotplayer")
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = client.post(f"/games/{game['id']}/action",
+                                   json={"action": "hit", "player_id": player_id})
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        if response.json()["status"] == "in_progress":
+            assert not any("FROM games" in statement for statement in statements)
+
+    def test_write_behind_flush(self):
+        """Testuje zapis zmian w tle."""
+        _, game = _hit_in_progress_game("flushplayer")
+        assert len(game["player_hand"]) == 3
+        assert len(_db_game(game["id"]).player_hand) == 2
+        assert client.get(f"/games/{game['id']}").json()["player_hand"] == game["player_hand"]
+
+        assert game_store.flush() >= 1
+        db = SessionLocal()
+        try:
+            player_hand, _, seq = game_events.load_hands(db, db.get(models.Game, game["id"]))
+        finally:
+            db.close()
+        assert player_hand.to_list() == game["player_hand"]
+        assert seq == 2
+        assert game_store.stats()["dirty_games"] == 0
+
+    def test_settlement_is_synchronous(self):
+        """Testuje, że rozliczenie jest zapisywane od razu."""
+        player_id, game = _hit_in_progress_game("settleplayer")
+
+        result = client.post(f"/games/{game['id']}/action",
+                             json={"action": "stand", "player_id": player_id}).json()
+
+        assert result["status"] != "in_progress"
+        assert game_store.get(game["id"]) is None
+        db_game = _db_game(game["id"])
+        assert db_game.status == result["status"]
+        assert db_game.player_hand == game["player_hand"]
+
+    def test_flush_does_not_overwrite_settlement(self):
+        """Testuje, że zapis w tle nie nadpisuje rozliczonej gry ani nie cofa sabotu."""
+        player_id, game = _hit_in_progress_game("guardplayer")
+        db = SessionLocal()
+        try:
+            shoe = db.get(models.Game, game["id"]).shoe
+            shoe_id = shoe.id
+        finally:
+            db.close()
+
+        client.post(f"/games/{game['id']}/action",
+                    json={"action": "stand", "player_id": player_id})
+        db = SessionLocal()
+        try:
+            settled_position = db.get(models.Shoe, shoe_id).position
+        finally:
+            db.close()
+
+        game_store.flush()
+        db = SessionLocal()
+        try:
+            assert db.get(models.Shoe, shoe_id).position == settled_position
+            assert db.get(models.Game, game["id"]).status != "in_progress"
+        finally:
+            db.close()
+
+    def test_recover_after_restart(self):
+        """Testuje wczytanie trwających gier z bazy po restarcie."""
+        player_id, game = _hit_in_progress_game("recoverplayer")
+        game_store.flush()
+        game_store.clear()
+
+        assert game_store.recover() >= 1
+        recovered = game_store.get(game["id"])
+        assert recovered is not None
+        assert recovered.game.player_hand.to_list() == game["player_hand"]
+
+        response = client.post(f"/games/{game['id']}/action",
+                               json={"action": "stand", "player_id": player_id})
+        assert response.status_code == 200
+        assert response.json()["status"] != "in_progress"
+
+    def test_wrong_player_rejected(self):
+        """Testuje odrzucenie akcji innego gracza w grze z pamięci."""
+        _, game = _hit_in_progress_game("ownerplayer")
+        response = client.post(f"/games/{game['id']}/action",
+                               json={"action": "hit", "player_id": 99999})
+        assert response.status_code == 400
+
+    def test_delete_evicts_game(self):
+        """Testuje usunięcie gry z magazynu przy usuwaniu gry."""
+        _, game = _hit_in_progress_game("deleteplayer")
+        assert client.delete(f"/games/{game['id']}").status_code == 200
+        assert game_store.get(game["id"]) is None
+        assert client.get(f"/games/{game['id']}").status_code == 404
+
+    def test_flush_failure_keeps_pending_changes(self, monkeypatch):
+        """Testuje, że błąd zapisu w tle nie gubi zmian ani nie zatrzymuje zapisu."""
+        _, game = _hit_in_progress_game("failplayer")
+
+        def fail(work):
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(game_store_module, "run_in_transaction", fail)
+        game_store._flush_in_background()
+
+        stats = game_store.stats()
+        assert stats["flush_failures"] == 1
+        assert stats["dirty_games"] == 1
+
+        monkeypatch.undo()
+        game_store._flush_in_background()
+        assert game_store.stats()["dirty_games"] == 0
+        db = SessionLocal()
+        try:
+            player_hand, _, _ = game_events.load_hands(db, db.get(models.Game, game["id"]))
+        finally:
+            db.close()
+        assert player_hand.to_list() == game["player_hand"]
+
+    def test_failed_settlement_restores_game(self, monkeypatch):
+        """Testuje, że wycofane rozliczenie nie gubi akcji i można je dokończyć."""
+        player_id, game = _hit_in_progress_game("rollbackplayer")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("Błąd rozliczenia")
+
+        monkeypatch.setattr(crud, "settle_game", fail)
+        with pytest.raises(RuntimeError):
+            client.post(f"/games/{game['id']}/action",
+                        json={"action": "stand", "player_id": player_id})
+
+        hot = game_store.get(game["id"])
+        assert hot is not None
+        assert not hot.closed
+        assert [event["type"] for event in hot.events] == ["hit", "stand"]
+        assert _db_game(game["id"]).status == "in_progress"
+
+        monkeypatch.undo()
+        result = client.post(f"/games/{game['id']}/action",
+                             json={"action": "stand", "player_id": player_id}).json()
+
+        assert result["status"] != "in_progress"
+        assert game_store.get(game["id"]) is None
+        events = client.get(f"/games/{game['id']}/events").json()
+        assert [event["type"] for event in events] == ["created", "hit", "stand", "settled"]
+        assert result["dealer_hand"] == events[0]["cards"][2:] + events[2]["cards"]
+
+    def test_advice_rejected_for_finished_game(self, monkeypatch):
+        """Testuje odmowę podpowiedzi dla gry zakończonej w pamięci, ale jeszcze nierozliczonej."""
+        player_id, game = _hit_in_progress_game("advicefinished")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("Błąd rozliczenia")
+
+        monkeypatch.setattr(crud, "settle_game", fail)
+        with pytest.raises(RuntimeError):
+            client.post(f"/games/{game['id']}/action",
+                        json={"action": "stand", "player_id": player_id})
+
+        assert game_store.get(game["id"]).game.game_over
+        response = client.get(f"/games/{game['id']}/advice")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Gra jest już zakończona"
+
+    def test_settlement_does_not_block_event_loop_during_flush(self, monkeypatch):
+        """Testuje, że rozliczenie w trakcie zapisu w tle nie blokuje pętli zdarzeń."""
+        player_id, game = _hit_in_progress_game("latencyplayer")
+        flushing = threading.Event()
+        real_run_in_transaction = game_store_module.run_in_transaction
+
+        def slow_write(work):
+            def hold_lock(db):
+                work(db)
+                flushing.set()
+                time.sleep(1.0)
+            return real_run_in_transaction(hold_lock)
+
+        monkeypatch.setattr(game_store_module, "run_in_transaction", slow_write)
+        flusher = threading.Thread(target=game_store.flush)
+        flusher.start()
+        assert flushing.wait(5)
+
+        async def heartbeat(stop):
+            longest, last = 0.0, time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                longest, last = max(longest, now - last), now
+            return longest
+
+        async def run():
+            stop = asyncio.Event()
+            ticker = asyncio.create_task(heartbeat(stop))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                settled = await http.post(
+                    f"/games/{game['id']}/action",
+                    json={"action": "stand", "player_id": player_id}
+                )
+            stop.set()
+            return await ticker, settled
+
+        latency, settled = asyncio.run(run())
+        flusher.join()
+
+        assert latency < 0.3
+        assert settled.status_code == 200
+        assert settled.json()["status"] != "in_progress"
+        events = client.get(f"/games/{game['id']}/events").json()
+        assert [event["type"] for event in events] == ["created", "hit", "stand", "settled"]
@@ -0,0 +1,193 @@
+"""
+Testy aktualizacji schematu baz danych utworzonych przez starsze wersje.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from app import migrations, models
+from app.database import Base
+from app.game_store import load_shoe
+
+BASELINE_SCHEMA = """
+CREATE TABLE players (
+    id INTEGER NOT NULL,
+    username VARCHAR(50) NOT NULL,
+    balance INTEGER NOT NULL,
+    games_played INTEGER NOT NULL,
+    games_won INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_players_username ON players (username);
+CREATE INDEX ix_players_id ON players (id);
+CREATE TABLE games (
+    id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    player_id INTEGER NOT NULL,
+    bet_amount INTEGER NOT NULL,
+    player_hand JSON,
+    dealer_hand JSON,
+    deck JSON,
+    player_score INTEGER NOT NULL,
+    dealer_score INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    finished_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(player_id) REFERENCES players (id)
+);
+CREATE INDEX ix_games_id ON games (id);
+"""
+"""Schemat bazy utworzonej przez pierwszą wersję aplikacji (bez sabotów)."""
+
+CARDS_SHOES_SCHEMA = BASELINE_SCHEMA + """
+CREATE TABLE shoes (
+    id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    num_decks INTEGER NOT NULL,
+    cut_card INTEGER NOT NULL,
+    cards JSON,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(player_id) REFERENCES players (id)
+);
+CREATE INDEX ix_shoes_id ON shoes (id);
+INSERT INTO players VALUES (1, 'legacy', 1000, 0, 0, '2024-01-01 00:00:00');
+INSERT INTO shoes VALUES (1, 1, 1, 1, '[{"suit": "hearts", "rank": "2", "value": 2}, {"suit": "spades", "rank": "K", "value": 10}, {"suit": "clubs", "rank": "A", "value": 11}]', '2024-01-01 00:00:00');
+"""
+"""Sabot z pozostałymi kartami zapisanymi jako JSON."""
+
+ORDER_SHOES_SCHEMA = BASELINE_SCHEMA + """
+CREATE TABLE shoes (
+    id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    num_decks INTEGER NOT NULL,
+    cut_card INTEGER NOT NULL,
+    "order" BLOB NOT NULL,
+    position INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(player_id) REFERENCES players (id)
+);
+CREATE INDEX ix_shoes_id ON shoes (id);
+INSERT INTO players VALUES (1, 'legacy', 1000, 0, 0, '2024-01-01 00:00:00');
+INSERT INTO shoes VALUES (1, 1, 1, 1, X'0001020304', 2, '2024-01-01 00:00:00');
+"""
+"""Sabot z kolejnością kart zapisaną jako bajty, bez ziarna tasowania."""
+
+LEGACY_GAME = """
+INSERT INTO players VALUES (1, 'legacy', 990, 0, 0, '2024-01-01 00:00:00');
+INSERT INTO games VALUES (1, 'in_progress', 1, 10,
+    '[{"suit": "hearts", "rank": "10", "value": 10}, {"suit": "clubs", "rank": "7", "value": 7}]',
+    '[{"suit": "spades", "rank": "10", "value": 10}, {"suit": "diamonds", "rank": "6", "value": 6}]',
+    '[{"suit": "hearts", "rank": "2", "value": 2}, {"suit": "clubs", "rank": "9", "value": 9}]',
+    17, 16, '2024-01-01 00:00:00', NULL);
+"""
+"""Gracz i trwająca gra z własną talią, zapisani przez pierwszą wersję aplikacji."""
+
+LEGACY_APP_SCRIPT = """
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    print(client.get("/games/1").status_code)
+    response = client.post("/games/1/action", json={"action": "stand", "player_id": 1})
+    print(response.status_code, response.json()["status"] != "in_progress")
+"""
+
+
+def legacy_database(path, schema=BASELINE_SCHEMA):
+    """Tworzy plik bazy ze starszym schematem."""
+    connection = sqlite3.connect(path)
+    connection.executescript(schema)
+    connection.close()
+    return path
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """Silnik bazy ze schematem pierwszej wersji aplikacji, po ``create_all``."""
+    test_engine = create_engine(f"sqlite:///{legacy_database(tmp_path / 'legacy.db')}")
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+def _columns(target, table):
+    """Zwraca nazwy kolumn tabeli."""
+    return {column["name"] for column in inspect(target).get_columns(table)}
+
+
+class TestUpgradeSchema:
+    """Testy uzupełniania schematu starszych baz."""
+
+    def test_adds_missing_columns(self, legacy_engine):
+        """Testuje dodanie kolumn brakujących w tabelach pierwszej wersji."""
+        assert "shoe_id" not in _columns(legacy_engine, "games")
+
+        changes = migrations.upgrade_schema(legacy_engine)
+
+        assert changes[:2] == ["games.shoe_id", "games.snapshot_seq"]
+        assert _columns(legacy_engine, "games") == set(Base.metadata.tables["games"].c.keys())
+
+    def test_creates_missing_indexes(self, legacy_engine):
+        """Testuje utworzenie indeksów dodanych do istniejących tabel."""
+        changes = migrations.upgrade_schema(legacy_engine)
+
+        for table in ("games", "shoes"):
+            indexes = {index["name"] for index in inspect(legacy_engine).get_indexes(table)}
+            assert indexes == {index.name for index in Base.metadata.tables[table].indexes}
+        assert {"ix_games_status", "ix_games_player_id_created_at",
+                "ix_games_finished_at"} <= set(changes)
+
+    def test_idempotent(self, legacy_engine):
+        """Testuje, że aktualny schemat nie jest zmieniany."""
+        migrations.upgrade_schema(legacy_engine)
+
+        assert migrations.upgrade_schema(legacy_engine) == []
+
+    @pytest.mark.parametrize("schema, cards", [
+        (CARDS_SHOES_SCHEMA, [("clubs", "A"), ("spades", "K"), ("hearts", "2")]),
+        (ORDER_SHOES_SCHEMA, [("hearts", "4"), ("hearts", "5"), ("hearts", "6")])
+    ], ids=["cards", "order"])
+    def test_rebuilds_legacy_shoes(self, tmp_path, schema, cards):
+        """Testuje przebudowę tabeli sabotów ze starszych wersji."""
+        test_engine = create_engine(f"sqlite:///{legacy_database(tmp_path / 'shoes.db', schema)}")
+        try:
+            Base.metadata.create_all(bind=test_engine)
+
+            assert "shoes (przebudowa)" in migrations.upgrade_schema(test_engine)
+
+            columns = {column["name"]: column for column in inspect(test_engine).get_columns("shoes")}
+            assert set(columns) == set(Base.metadata.tables["shoes"].c.keys())
+            assert columns["order"]["nullable"]
+            with Session(test_engine) as db:
+                shoe = load_shoe(db.get(models.Shoe, 1))
+            drawn = [shoe.draw() for _ in range(3)]
+            assert [(card.suit, card.rank) for card in drawn] == cards
+            assert shoe.draw() is None
+            assert migrations.upgrade_schema(test_engine) == []
+        finally:
+            test_engine.dispose()
+
+
+class TestLegacyStartup:
+    """Testy startu aplikacji na bazie z pierwszej wersji."""
+
+    def test_app_serves_legacy_game(self, tmp_path):
+        """Testuje obsługę trwającej gry z bazy sprzed sabotów i dziennika zdarzeń."""
+        path = legacy_database(tmp_path / "legacy.db", BASELINE_SCHEMA + LEGACY_GAME)
+        env = dict(os.environ, BLACKJACK_DATABASE_URL=f"sqlite:///{path}",
+                   PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env.pop("BLACKJACK_STORAGE", None)
+        result = subprocess.run([sys.executable, "-c", LEGACY_APP_SCRIPT], cwd=tmp_path,
+                                env=env, capture_output=True, text=True, timeout=60)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["200", "200", "True"]
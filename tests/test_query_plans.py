@@ -0,0 +1,125 @@
+"""
+Testy planów zapytań - operacje CRUD nie mogą skanować całych tabel.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.main import app
+from app.database import DIALECT, Base, SessionLocal, async_engine, engine
+from app.game_store import game_store
+from app import counters, crud, models
+from app.archiver import archive_batch
+from tests.query_plan import QueryPlanRecorder
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Przygotowuje bazę danych przed każdym testem."""
+    Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+
+
+pytestmark = pytest.mark.skipif(DIALECT != "sqlite", reason="plany zapytań SQLite")
+
+client = TestClient(app)
+
+
+class TestQueryPlans:
+    """Testy planów zapytań operacji CRUD."""
+
+    def test_api_crud_queries_use_indexes(self):
+        """Testuje, że zapytania wykonywane przez API korzystają z indeksów."""
+        client.get("/health")
+
+        with QueryPlanRecorder(engine, async_engine) as recorder:
+            player_id = client.post("/players/", json={"username": "planplayer"}).json()["id"]
+            other_id = client.post("/players/", json={"username": "planother"}).json()["id"]
+            client.get(f"/players/{player_id}")
+            client.put(f"/players/{player_id}", json={"balance": 5000})
+            client.get("/players/")
+            cursor = client.get("/players/?limit=1").headers["X-Next-Cursor"]
+            client.get(f"/players/?limit=1&cursor={cursor}")
+
+            games = [
+                client.post("/games/", json={"player1_id": player_id, "bet_amount": 10}).json()
+                for _ in range(3)
+            ]
+            for game in games:
+                client.get(f"/games/{game['id']}")
+                if game["status"] == "in_progress":
+                    client.get(f"/games/{game['id']}/advice")
+                    client.post(f"/games/{game['id']}/action", json={"action": "stand", "player_id": player_id})
+            client.get("/games/")
+            cursor = client.get("/games/?limit=1").headers["X-Next-Cursor"]
+            client.get(f"/games/?limit=1&cursor={cursor}")
+            client.delete(f"/games/{games[0]['id']}")
+            client.delete(f"/players/{other_id}")
+            client.get("/health")
+
+        assert recorder.plans
+        recorder.assert_no_full_scans()
+
+    def test_report_queries_use_indexes(self):
+        """Testuje zapytania o aktywne gry, historię gracza i zakres dat."""
+        player_id = client.post("/players/", json={"username": "reportplayer"}).json()["id"]
+        client.post("/games/", json={"player1_id": player_id, "bet_amount": 10})
+        since = datetime.utcnow() - timedelta(days=1)
+
+        db = SessionLocal()
+        try:
+            with QueryPlanRecorder(engine) as recorder:
+                crud.get_active_games(db)
+                crud.count_active_games(db)
+                db.scalars(
+                    select(models.Game)
+                    .where(models.Game.player_id == player_id,
+                           models.Game.created_at >= since)
+                    .order_by(models.Game.created_at.desc())
+                ).all()
+                db.scalars(
+                    select(models.Game).where(models.Game.finished_at >= since)
+                ).all()
+        finally:
+            db.close()
+
+        recorder.assert_no_full_scans()
+
+    def test_archive_queries_use_indexes(self):
+        """Testuje, że archiwizacja wybiera i usuwa gry po indeksach."""
+        player_id = client.post("/players/", json={"username": "archiveplayer"}).json()["id"]
+        for _ in range(3):
+            game = client.post("/games/", json={"player1_id": player_id, "bet_amount": 10}).json()
+            if game["status"] == "in_progress":
+                client.post(f"/games/{game['id']}/action", json={"action": "stand", "player_id": player_id})
+
+        db = SessionLocal()
+        try:
+            with QueryPlanRecorder(engine) as recorder:
+                archive_batch(db, datetime.utcnow() + timedelta(days=1), 2)
+            db.rollback()
+        finally:
+            db.close()
+
+        assert recorder.plans
+        recorder.assert_no_full_scans()
+
+    def test_detects_full_scan(self):
+        """Testuje, że pomocnik wykrywa pełny skan tabeli."""
+        db = SessionLocal()
+        try:
+            with QueryPlanRecorder(engine) as recorder:
+                db.scalars(select(models.Game).where(models.Game.bet_amount > 5)).all()
+        finally:
+            db.close()
+
+        with pytest.raises(AssertionError):
+            recorder.assert_no_full_scans()
@@ -0,0 +1,69 @@
+"""
+Testy wektorowej symulacji Monte Carlo.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.game_logic import BlackjackGame, Deck
+from app.simulation import (
+    OUTCOME_NAMES, STRATEGIES, play_hands, run_simulation
+)
+
+
+def play_reference_game(deck: Deck, strategy) -> str:
+    """Rozgrywa rozdanie obiektem BlackjackGame tak jak robi to API."""
+    game = BlackjackGame(deck=deck)
+    game.deal_initial_cards()
+    upcard = game.dealer_hand.cards[1].value
+    
+    while not game.game_over:
+        hand = game.player_hand
+        hit = strategy(np.array([hand.calculate_score()]), np.array([hand.is_soft()]),
+                       np.array([upcard]), np.array([len(hand)]))
+        if hit[0]:
+            game.player_hit()
+        else:
+            game.player_stand()
+    
+    return game.determine_winner()
+
+
+class TestSimulation:
+    """Testy dla modułu symulacji."""
+    
+    @pytest.mark.parametrize("strategy_name", sorted(STRATEGIES))
+    def test_matches_blackjack_game(self, strategy_name):
+        """Testuje zgodność wyników z BlackjackGame dla tych samych talii."""
+        strategy = STRATEGIES[strategy_name]
+        rng = random.Random(42)
+        decks = []
+        for _ in range(3000):
+            deck = Deck()
+            rng.shuffle(deck.cards)
+            decks.append(deck)
+        
+        draw_orders = np.array([[card.index for card in reversed(deck.cards)]
+                                for deck in decks], dtype=np.int8)
+        outcomes = play_hands(draw_orders, strategy)
+        
+        expected = [play_reference_game(deck, strategy) for deck in decks]
+        assert [OUTCOME_NAMES[int(o)] for o in outcomes] == expected
+    
+    def test_run_simulation(self):
+        """Testuje statystyki zwracane przez symulację."""
+        result = run_simulation(50_000, batch_size=20_000, seed=7)
+        assert result.hands == 50_000
+        assert result.wins + result.losses + result.ties == 50_000
+        assert -0.2 < result.house_edge < 0.2
+        assert 0 < result.variance <= 1
+        assert result.hands_per_second > 0
+    
+    def test_run_simulation_seeded(self):
+        """Testuje powtarzalność symulacji przy tym samym ziarnie."""
+        first = run_simulation(10_000, seed=3)
+        second = run_simulation(10_000, seed=3)
+        assert (first.wins, first.losses) == (second.wins, second.losses)
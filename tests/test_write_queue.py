@@ -0,0 +1,149 @@
+"""
+Testy kolejki zapisów z jednym wątkiem piszącym (group commit).
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.database import Base, SessionLocal, engine
+from app.game_store import game_store
+from app.write_queue import WriteQueue
+from app import counters, crud, models, schemas
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Przygotowuje bazę danych przed każdym testem."""
+    Base.metadata.create_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    counters.reset()
+    game_store.clear()
+
+
+@pytest.fixture
+def writer():
+    """Osobna kolejka zapisów zatrzymywana po teście."""
+    write_queue = WriteQueue(batch_size=64)
+    yield write_queue
+    write_queue.stop()
+
+
+@pytest.fixture
+def commits():
+    """Zbiera zatwierdzenia transakcji sesji aplikacji (bez punktów zapisu)."""
+    committed = []
+
+    def record(session):
+        if not session.in_nested_transaction():
+            committed.append(session)
+
+    event.listen(SessionLocal, "after_commit", record)
+    yield committed
+    event.remove(SessionLocal, "after_commit", record)
+
+
+client = TestClient(app)
+
+
+def _player(name):
+    """Dane nowego gracza."""
+    return schemas.PlayerCreate(username=name)
+
+
+def _usernames():
+    """Zwraca nazwy graczy zapisanych w bazie."""
+    db = SessionLocal()
+    try:
+        return sorted(player.username for player in db.query(models.Player))
+    finally:
+        db.close()
+
+
+def _blocked(writer):
+    """Zajmuje wątek piszący do czasu ustawienia zwróconego zdarzenia."""
+    started, release = threading.Event(), threading.Event()
+
+    def wait(db):
+        started.set()
+        release.wait(5)
+
+    writer.submit(wait)
+    assert started.wait(5)
+    return release
+
+
+class TestWriteQueue:
+    """Testy grupowania zapisów."""
+
+    def test_writes_grouped_in_one_commit(self, writer, commits):
+        """Testuje zatwierdzenie oczekujących zapisów jedną transakcją."""
+        release = _blocked(writer)
+        futures = [writer.submit(crud.create_player, _player(f"group{i}")) for i in range(10)]
+        release.set()
+
+        players = [future.result(5) for future in futures]
+
+        assert [player.username for player in players] == [f"group{i}" for i in range(10)]
+        assert len({player.id for player in players}) == 10
+        assert len(commits) == 2
+        assert writer.stats()["max_batch"] == 10
+        assert _usernames() == sorted(f"group{i}" for i in range(10))
+
+    def test_failed_write_isolated(self, writer):
+        """Testuje, że błąd jednej operacji nie wycofuje pozostałych z grupy."""
+        client.post("/players/", json={"username": "taken"})
+        release = _blocked(writer)
+        first = writer.submit(crud.create_player, _player("first"))
+        duplicate = writer.submit(crud.create_player, _player("taken"))
+        last = writer.submit(crud.create_player, _player("last"))
+        release.set()
+
+        assert first.result(5).username == "first"
+        with pytest.raises(ValueError):
+            duplicate.result(5)
+        assert last.result(5).username == "last"
+        assert _usernames() == ["first", "last", "taken"]
+
+    def test_failed_write_discards_deferred_effects(self, writer):
+        """Testuje odrzucenie zmian liczników wycofanej operacji."""
+        assert client.get("/health").json()["counters"]["total_players"] == 0
+        release = _blocked(writer)
+
+        def create_and_fail(db):
+            crud.create_player(db, _player("rolledback"))
+            raise RuntimeError("błąd po zmianie licznika")
+
+        failed = writer.submit(create_and_fail)
+        created = writer.submit(crud.create_player, _player("kept"))
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            failed.result(5)
+        created.result(5)
+        assert _usernames() == ["kept"]
+        assert client.get("/health").json()["counters"]["total_players"] == 1
+
+    def test_concurrent_requests(self):
+        """Testuje równoległe żądania zapisu przez kolejkę aplikacji."""
+        results = []
+
+        def create(i):
+            results.append(client.post("/players/", json={"username": f"parallel{i}"}))
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(response.status_code == 200 for response in results)
+        assert all(response.headers["X-DB-Commits"] == "1" for response in results)
+        assert len(_usernames()) == 20
+        assert client.get("/health").json()["write_queue"]["writes"] >= 20